@@ -0,0 +1,246 @@
+"""
+BENCHMARK HARNESS
+Runs the workloads of workloads.py over growing sizes and records wall
+time, peak memory and throughput into JSON, then draws scaling curves of
+one run and compares two runs for regressions.  Only the standard library
+and NumPy are used, so it runs offline.
+
+Every (workload, size) case runs in a fresh interpreter, so its peak
+resident memory (ru_maxrss) is its own: the case builds its inputs with a
+fixed seed, calls the workload repeat times and prints one JSON line with
+    seconds : fastest call, mean_seconds : mean of the calls
+    items, throughput : units of work per call, and per second of the
+                        fastest call
+    peak_kb, base_kb : peak resident memory after the calls, and after
+                       the imports before the inputs were built
+A case that fails or runs past CASE_TIMEOUT is recorded with its error.
+
+curves fits log(seconds) = slope log(size) + c by least squares for each
+workload, slope 1 for linear work and 2 for quadratic, and draws the
+times against the sizes on a log scale.  compare matches the cases of two
+runs and reports the ratio new/old of time and memory, marking those
+above 1 + tolerance as regressions (times only when also NOISE_SECONDS
+slower), and exits with status 1 if any.
+
+TO RUN:
+$ python bench.py run results.json                  # every workload
+$ python bench.py run quick.json quick gcd perm_compose
+$ python bench.py curves results.json
+$ python bench.py compare old.json new.json 0.25    # tolerance, default 0.2
+"""
+
+from __future__ import print_function
+import json
+import math
+import os
+import platform
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+import numpy as np
+from workloads import WORKLOADS
+
+#calls timed per case
+REPEAT = 3
+
+#seed of every workload's inputs
+SEED = 152
+
+#seconds a case may run, setup included
+CASE_TIMEOUT = 600
+
+#time differences below this are noise, never regressions
+NOISE_SECONDS = 0.005
+
+#width of the bars drawn by curves
+WIDTH = 40
+
+def peak_kb():
+    """
+    returns peak resident memory of this process in KB (Linux units)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def run_case(name, size, repeat = REPEAT, seed = SEED):
+    """
+    returns dict of one case timed in this process
+    """
+    spec = WORKLOADS[name]
+    base = peak_kb()
+    run, items = spec["workload"](size, seed)
+    times = []
+    for _ in xrange(repeat):
+        start = time.time()
+        run()
+        times.append(time.time() - start)
+    best = min(times)
+    return {"workload": name, "module": spec["module"], "size": size, "repeat": repeat,
+            "seconds": best, "mean_seconds": sum(times) / len(times), "items": items,
+            "throughput": items / best if best > 0 else None, "peak_kb": peak_kb(), "base_kb": base}
+
+def spawn_case(name, size, repeat = REPEAT, seed = SEED, timeout = CASE_TIMEOUT):
+    """
+    returns dict of one case run in a fresh interpreter, with an error
+    instead of timings if it fails or times out
+    """
+    command = [sys.executable, os.path.abspath(__file__), "case", name, str(size), str(repeat), str(seed)]
+    #files rather than pipes, which a child writing much would fill and block on
+    out, err = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    child = subprocess.Popen(command, stdout=out, stderr=err)
+    deadline = time.time() + timeout
+    while child.poll() is None and time.time() < deadline:
+        time.sleep(0.05)
+    if child.poll() is None:
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+        error = "timed out after %d s" % timeout
+    else:
+        out.seek(0)
+        err.seek(0)
+        if child.returncode == 0:
+            return json.loads(out.read().strip().splitlines()[-1])
+        lines = err.read().strip().splitlines()
+        error = lines[-1] if lines else "exit status %d" % child.returncode
+    return {"workload": name, "module": WORKLOADS[name]["module"], "size": size, "error": error}
+
+def select(names):
+    """
+    returns workload names matching names, workload or module names, all
+    for none
+    raises ValueError for a name matching neither
+    """
+    if not names:
+        return list(WORKLOADS)
+    for name in names:
+        if name not in WORKLOADS and not any(s["module"] == name for s in WORKLOADS.values()):
+            raise ValueError("No workload or module %r" % name)
+    return [w for w, s in WORKLOADS.items() if w in names or s["module"] in names]
+
+def run(names = None, quick = False, repeat = REPEAT, out = sys.stdout):
+    """
+    returns dict of a whole run: meta data and the list of cases,
+    printing each case as it finishes
+    """
+    cases = []
+    for name in select(names):
+        spec = WORKLOADS[name]
+        for size in spec["quick"] if quick else spec["sizes"]:
+            case = spawn_case(name, size, repeat)
+            cases.append(case)
+            print(format_case(case), file=out)
+            out.flush()
+    meta = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(), "machine": platform.machine(),
+            "quick": quick, "repeat": repeat, "seed": SEED}
+    return {"meta": meta, "cases": cases}
+
+def format_case(case):
+    """
+    returns one line describing a case
+    """
+    head = "%-18s %10s" % (case["workload"], case["size"])
+    if "error" in case:
+        return head + "  error: " + case["error"]
+    unit = WORKLOADS[case["workload"]]["items"] if case["workload"] in WORKLOADS else "items"
+    return head + "  %10.6f s  %12.1f %s/s  %8d KB" % (case["seconds"], case["throughput"] or 0, unit,
+                                                       case["peak_kb"])
+
+def slope(sizes, seconds):
+    """
+    returns least squares slope of log(seconds) against log(size), None
+    for fewer than two points
+    """
+    if len(sizes) < 2:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+def curves(results, out = sys.stdout):
+    """
+    returns (key, value) of workload : slope, drawing each workload's
+    times on a log scale
+    """
+    slopes = {}
+    by_workload = OrderedDict()
+    for case in results["cases"]:
+        if "error" not in case and case["seconds"] > 0:
+            by_workload.setdefault(case["workload"], []).append(case)
+    for name, cases in by_workload.items():
+        cases.sort(key=lambda c: c["size"])
+        sizes = [c["size"] for c in cases]
+        seconds = [c["seconds"] for c in cases]
+        slopes[name] = slope(sizes, seconds)
+        unit = WORKLOADS[name]["size"] if name in WORKLOADS else "size"
+        print("%s by %s, slope %s" % (name, unit, "-" if slopes[name] is None else "%.2f" % slopes[name]),
+              file=out)
+        low, high = math.log(min(seconds)), math.log(max(seconds))
+        for size, t in zip(sizes, seconds):
+            bar = 1 + int(round((WIDTH - 1) * (math.log(t) - low) / (high - low))) if high > low else 1
+            print("%12s %12.6f s |%s" % (size, t, "#" * bar), file=out)
+        print(file=out)
+    return slopes
+
+def compare(old, new, tolerance = 0.2, out = sys.stdout):
+    """
+    returns list of (workload, size, what, ratio) regressions of new
+    against old, over the cases both ran, printing every ratio
+    """
+    before = dict(((c["workload"], c["size"]), c) for c in old["cases"] if "error" not in c)
+    regressions = []
+    print("%-18s %10s %10s %10s" % ("workload", "size", "time", "memory"), file=out)
+    for case in new["cases"]:
+        key = (case["workload"], case["size"])
+        if key not in before or "error" in case:
+            continue
+        old_case = before[key]
+        ratios = [("time", case["seconds"] / old_case["seconds"] if old_case["seconds"] else 1.0),
+                  ("memory", float(case["peak_kb"]) / old_case["peak_kb"] if old_case["peak_kb"] else 1.0)]
+        slower = case["seconds"] - old_case["seconds"] > NOISE_SECONDS
+        marks = []
+        for what, ratio in ratios:
+            if ratio > 1 + tolerance and (what != "time" or slower):
+                regressions.append(key + (what, ratio))
+                marks.append(what)
+        print("%-18s %10s %9.2fx %9.2fx%s" % (key + tuple(r for _, r in ratios) +
+                                              ("  REGRESSION " + ", ".join(marks) if marks else "",)), file=out)
+    print("%d regression(s) beyond %d%%" % (len(regressions), round(100 * tolerance)), file=out)
+    return regressions
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main(argv):
+    usage = "usage: python bench.py run [OUT.json] [quick] [WORKLOAD|MODULE ...] | curves RUN.json" \
+            " | compare OLD.json NEW.json [TOLERANCE]"
+    if not argv:
+        print(usage, file=sys.stderr)
+        return 2
+    command, args = argv[0], argv[1:]
+    if command == "case":
+        print(json.dumps(run_case(args[0], int(args[1]), int(args[2]), int(args[3]))))
+    elif command == "run":
+        paths = [a for a in args if a.endswith(".json")]
+        names = [a for a in args if not a.endswith(".json") and a != "quick"]
+        results = run(names, "quick" in args)
+        if paths:
+            with open(paths[0], "w") as f:
+                json.dump(results, f, indent=1, sort_keys=True)
+            print("wrote", paths[0])
+        print()
+        curves(results)
+    elif command == "curves" and len(args) == 1:
+        curves(load(args[0]))
+    elif command == "compare" and len(args) in (2, 3):
+        tolerance = float(args[2]) if len(args) == 3 else 0.2
+        return 1 if compare(load(args[0]), load(args[1]), tolerance) else 0
+    else:
+        print(usage, file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,195 @@
+"""
+BENCHMARK WORKLOADS
+Non-interactive workloads for the hot path of every module, each built
+from a seed so that runs are reproducible.
+
+A workload is a function of (size, seed) that builds its inputs and
+returns (run, items): run() does the timed work and items is how many
+units of work one call does, for throughput.  Setup is not timed.
+WORKLOADS lists them with their module, the sizes a full run and a
+quick run go through and the unit of size and items:
+
+    finite_fields   field_mult          random elements of GF(q), by q
+                    poly_mult           polynomials mod 998244353, by length
+    cycle_products  perm_compose        random permutations, by degree
+                    perm_cycle_types
+    euler_walks     euler_walk          random Eulerian multigraphs, by edges
+    gcd             gcd, xgcd           random operands, by bit length
+                    crt                 random 62-bit prime moduli, by count
+    coprimes        totients            sieve up to N
+                    unit_orders         all units mod n, by n
+    group_iso       sl3_elements        SL(3, q), by q
+                    psl2_projective     PSL(2, q) on P^1(F_q), by q
+
+Every module is imported from its own directory, as its scripts are run.
+
+EXAMPLES:
+
+>>> from workloads import WORKLOADS
+>>> run, items = WORKLOADS["perm_compose"]["workload"](64, seed=1)
+>>> items
+256
+>>> run().shape
+(256, 64)
+"""
+
+from __future__ import print_function
+import os
+import random
+import sys
+from collections import OrderedDict
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+#permutations per batch
+PERM_ROWS = 256
+
+#field elements multiplied per call
+FIELD_ELEMENTS = 1 << 20
+
+#operand pairs per gcd call
+GCD_PAIRS = 100
+
+def use(module):
+    """
+    puts a module directory first on sys.path
+    """
+    path = os.path.join(ROOT, module)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+def field_mult(q, seed = None):
+    use("finite_fields")
+    from field_array import field_array
+    F = field_array(str(q))
+    np.random.seed(seed)
+    a, b = F.random(FIELD_ELEMENTS), F.random(FIELD_ELEMENTS)
+    return (lambda: F.mult(a, b)), FIELD_ELEMENTS
+
+def poly_mult(n, seed = None):
+    use("finite_fields")
+    from poly_ring import poly_ring
+    R = poly_ring(998244353)
+    rng = random.Random(seed)
+    a = [rng.randrange(R.p) for _ in xrange(n)]
+    b = [rng.randrange(R.p) for _ in xrange(n)]
+    return (lambda: R.mult(a, b)), n
+
+def perm_compose(n, seed = None):
+    use("cycle_products")
+    from perm_batch import random as random_perms, compose
+    k = PERM_ROWS
+    A, B = random_perms(k, n, seed), random_perms(k, n, None if seed is None else seed + 1)
+    return (lambda: compose(A, B, False)), k
+
+def perm_cycle_types(n, seed = None):
+    use("cycle_products")
+    from perm_batch import random as random_perms, cycle_types
+    k = PERM_ROWS
+    P = random_perms(k, n, seed)
+    return (lambda: cycle_types(P, False)), k
+
+def eulerian_edges(m, seed = None):
+    """
+    returns (u, v, V) of a random closed walk of m >= 3 edges on
+    V = max(m // 8, 3) vertices, without loops, so every vertex has even
+    degree and the edges are connected
+    """
+    rng = np.random.RandomState(seed)
+    V = max(m // 8, 3)
+    walk = np.cumsum(rng.randint(1, V, size=m)) % V
+    #the closing edge walk[-1] - walk[0] must not be a loop either
+    if walk[-1] == walk[0]:
+        walk[-1] = next(x for x in xrange(V) if x != walk[0] and x != walk[-2])
+    return walk, np.roll(walk, -1), V
+
+def euler_walk(m, seed = None):
+    use("euler_walks")
+    from euler_walk import euler_walk as walker
+    from edge_list import csr_graph
+    u, v, V = eulerian_edges(m, seed)
+    walk = walker()
+    return (lambda: walk.walk_csr(csr_graph.from_edges(u, v, num_vertices=V))), m
+
+def operands(bits, seed = None):
+    """
+    returns GCD_PAIRS pairs of random integers of exactly bits bits
+    """
+    rng = random.Random(seed)
+    return [(rng.getrandbits(bits) | 1 << (bits - 1), rng.getrandbits(bits) | 1 << (bits - 1))
+            for _ in xrange(GCD_PAIRS)]
+
+def gcd(bits, seed = None):
+    use("gcd")
+    from gcd import gcd as gcd_
+    pairs = operands(bits, seed)
+    return (lambda: [gcd_(a, b) for a, b in pairs]), GCD_PAIRS
+
+def xgcd(bits, seed = None):
+    use("gcd")
+    from gcd import xgcd as xgcd_
+    pairs = operands(bits, seed)
+    return (lambda: [xgcd_(a, b) for a, b in pairs]), GCD_PAIRS
+
+def crt(k, seed = None):
+    use("gcd")
+    from crt import crt as crt_
+    rng = random.Random(seed)
+    moduli = []
+    while len(moduli) < k:
+        m = rng.getrandbits(62) | 1 << 61 | 1
+        if pow(2, m - 1, m) == 1 and m not in moduli:
+            moduli.append(m)
+    residues = [rng.randrange(m) for m in moduli]
+    return (lambda: crt_(residues, moduli)), k
+
+def totients(N, seed = None):
+    use("coprimes")
+    from totient import totients as totients_
+    return (lambda: totients_(N)), N
+
+def unit_orders(n, seed = None):
+    use("coprimes")
+    from unit_group import unit_orders as unit_orders_, totient
+    return (lambda: unit_orders_(n)), totient(n)
+
+def sl3_elements(q, seed = None):
+    use("group_iso")
+    from linear_groups import linear_group
+    G = linear_group("SL", 3, q)
+    return (lambda: sum(len(block) for block in G.blocks())), G.order()
+
+def psl2_projective(q, seed = None):
+    use("group_iso")
+    from linear_groups import linear_group
+    from projective import projective_action
+    X = projective_action(linear_group("PSL", 2, q))
+    return (lambda: X.summary()), X.group.order()
+
+def entry(module, workload, sizes, quick, size, items):
+    return {"module": module, "workload": workload, "sizes": sizes, "quick": quick,
+            "size": size, "items": items}
+
+WORKLOADS = OrderedDict([
+    ("field_mult", entry("finite_fields", field_mult, [4, 16, 256, 4096, 65536], [4, 256],
+                         "field order q", "products")),
+    ("poly_mult", entry("finite_fields", poly_mult, [256, 1024, 4096, 16384, 65536], [256, 1024],
+                        "coefficients", "coefficients")),
+    ("perm_compose", entry("cycle_products", perm_compose, [8, 64, 512, 4096, 32768], [8, 512],
+                           "degree", "permutations")),
+    ("perm_cycle_types", entry("cycle_products", perm_cycle_types, [8, 64, 512, 4096, 32768], [8, 512],
+                               "degree", "permutations")),
+    ("euler_walk", entry("euler_walks", euler_walk, [1000, 10000, 100000, 1000000], [1000, 10000],
+                         "edges", "edges")),
+    ("gcd", entry("gcd", gcd, [256, 1024, 4096, 16384, 65536], [256, 1024], "bits", "pairs")),
+    ("xgcd", entry("gcd", xgcd, [256, 1024, 4096, 16384], [256, 1024], "bits", "pairs")),
+    ("crt", entry("gcd", crt, [16, 64, 256, 1024], [16, 64], "moduli", "moduli")),
+    ("totients", entry("coprimes", totients, [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7], [10 ** 4, 10 ** 5],
+                       "N", "integers")),
+    ("unit_orders", entry("coprimes", unit_orders, [1000, 10007, 100000, 1000003], [1000, 10007],
+                          "modulus", "units")),
+    ("sl3_elements", entry("group_iso", sl3_elements, [2, 3, 4, 5], [2, 3], "q", "elements")),
+    ("psl2_projective", entry("group_iso", psl2_projective, [5, 11, 23, 47, 71], [5, 11],
+                              "q", "elements")),
+])
@@ -1,28 +1,31 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from collections import Counter
 
+#the gcd engines live in ../gcd
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gcd"))
+from lehmer import lehmer_gcd, LEHMER_CUTOFF
+from totient import coprime_residues, multiplication_table
+from unit_group import multiplicative_order, unit_orders, primitive_root, invariant_factors
+
 def gcd(a, q):
-    r = a%q
-    if r == 0:
-        return q
-    return gcd(q, r)
+    if max(abs(a), abs(q)).bit_length() >= LEHMER_CUTOFF:
+        return lehmer_gcd(a, q)
+    while q:
+        a, q = q, a%q
+    return abs(a)
 
 def order(a, i):
-    n = 0
-    flag = True
-    while flag:
-        n += 1
-        if (i**n)%a == 1:
-            flag = False
-    return n
+    return multiplicative_order(i, a)
 
 if __name__ == "__main__":
     a = int(raw_input("a: "))
 
-    co_prime = [i for i in xrange(1, a) if gcd(a, i) == 1]
+    co_prime = coprime_residues(a).tolist()
 
-    table = np.array([[(i*j)%a for i in co_prime] for j in co_prime])
+    table = multiplication_table(a)
     header = [str(i) for i in co_prime]
 
     print
@@ -38,5 +41,14 @@ if __name__ == "__main__":
     print "*** ELEMENT ORDER FOR COPRIME ELEMENT OF %d ***" % a
     print "***********************************************"
 
-    orders = np.array([[order(a, i)] for i in co_prime])
-    print pd.DataFrame(orders, index = co_prime, columns=["Order"])
\ No newline at end of file
+    orders = unit_orders(a)[1][:, None]
+    print pd.DataFrame(orders, index = co_prime, columns=["Order"])
+
+    print
+    print "***********************************************"
+    print "*** STRUCTURE OF UNIT GROUP OF %d ***" % a
+    print "***********************************************"
+    invariants = invariant_factors(a)
+    print "Invariant factors:", " x ".join("C%d" % d for d in invariants) or "trivial"
+    print "Cyclic:", len(invariants) <= 1
+    print "Least primitive root:", primitive_root(a)
\ No newline at end of file
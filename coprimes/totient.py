@@ -0,0 +1,163 @@
+"""
+TOTIENT SIEVE
+Coprime residues, Euler's totient and multiplication tables of the unit
+groups (Z/nZ)^x, with NumPy instead of one gcd per residue.
+
+* smallest_prime_factors(N) sieves the least prime factor of every
+  n <= N, crossing out multiples of each prime p <= sqrt(N) from p^2 on;
+  the sieve is cached and only recomputed for a larger N
+* totients(N) gives phi(n) for all n <= N in one pass over the primes:
+  phi(n) = n prod (1 - 1/p), so each prime p takes phi[p::p] // p off
+  its multiples
+* coprime_residues(n) crosses out the multiples of the prime factors of n
+* multiplication_table(n) is np.outer(r, r) % n over the residues r,
+  built CHUNK_ENTRIES entries at a time, into an array or straight into a
+  memory-mapped .npy file for tables larger than memory (phi(n)^2 entries:
+  40 GB at 4 bytes each for n near 10^5)
+
+Table entries use the smallest unsigned type holding n - 1.
+
+TO RUN:
+$ python totient.py 100003 table.npy       # writes the table of 100003
+
+EXAMPLES:
+
+>>> from totient import totients, coprime_residues, multiplication_table
+>>> totients(12).tolist()
+[0, 1, 1, 2, 2, 4, 2, 6, 4, 6, 4, 10, 4]
+>>> coprime_residues(12).tolist()
+[1, 5, 7, 11]
+>>> multiplication_table(12)
+array([[ 1,  5,  7, 11],
+       [ 5,  1, 11,  7],
+       [ 7, 11,  1,  5],
+       [11,  7,  5,  1]], dtype=uint8)
+"""
+
+from __future__ import print_function
+import sys
+import numpy as np
+
+#table entries computed per block, bounding the int64 scratch space
+CHUNK_ENTRIES = 1 << 24
+
+_spf = np.zeros(0, dtype=np.int64)
+
+def smallest_prime_factors(N):
+    """
+    returns (N+1,) array of the smallest prime factor of every n <= N,
+    with 0 and 1 mapped to themselves
+    """
+    global _spf
+    if len(_spf) > N:
+        return _spf[:N + 1]
+    spf = np.arange(max(N + 1, 2), dtype=np.int64)
+    for p in xrange(2, int(N ** 0.5) + 1):
+        if spf[p] == p:
+            multiples = spf[p * p::p]
+            multiples[multiples == np.arange(p * p, N + 1, p)] = p
+    _spf = spf
+    return spf[:N + 1]
+
+def primes(N):
+    """
+    returns primes up to N
+    """
+    spf = smallest_prime_factors(N)
+    return np.nonzero(spf[2:] == np.arange(2, N + 1))[0] + 2
+
+def totients(N):
+    """
+    returns (N+1,) array of phi(n) for all n <= N, phi(0) = 0
+    """
+    phi = np.arange(N + 1, dtype=np.int64)
+    for p in primes(N).tolist():
+        phi[p::p] -= phi[p::p] // p
+    return phi
+
+def prime_factors(n):
+    """
+    returns distinct prime factors of n, by the sieve for n it covers and
+    trial division otherwise
+    """
+    factors = []
+    if n < len(_spf):
+        while n > 1:
+            p = int(_spf[n])
+            factors.append(p)
+            while n % p == 0:
+                n //= p
+        return factors
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            factors.append(p)
+            while n % p == 0:
+                n //= p
+        p += 1 if p == 2 else 2
+    if n > 1:
+        factors.append(n)
+    return factors
+
+def coprime_residues(n):
+    """
+    returns residues 1...n-1 coprime to n ([0] for n = 1)
+    """
+    if n == 1:
+        return np.zeros(1, dtype=np.int64)
+    coprime = np.ones(n, dtype=bool)
+    coprime[0] = False
+    for p in prime_factors(n):
+        coprime[::p] = False
+    return np.nonzero(coprime)[0]
+
+def table_dtype(n):
+    """
+    returns smallest unsigned dtype holding residues mod n
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+def table_chunks(n, residues = None):
+    """
+    returns generator of (start, rows) blocks of the multiplication table
+    mod n, rows[i] being the products of residues[start+i]
+    raises ValueError if products mod n overflow int64
+    """
+    if (n - 1) ** 2 >= 2 ** 63:
+        raise ValueError("Products mod %d overflow int64" % n)
+    if residues is None:
+        residues = coprime_residues(n)
+    residues = np.asarray(residues, dtype=np.int64)
+    step = max(CHUNK_ENTRIES // max(len(residues), 1), 1)
+    dtype = table_dtype(n)
+    for start in xrange(0, len(residues), step):
+        yield start, (np.outer(residues[start:start + step], residues) % n).astype(dtype)
+
+def multiplication_table(n, path = None, residues = None):
+    """
+    returns (phi(n), phi(n)) multiplication table of the residues coprime
+    to n (or of the given residues), written to a memory-mapped .npy file
+    when path is given
+    """
+    if residues is None:
+        residues = coprime_residues(n)
+    shape = (len(residues), len(residues))
+    if path is None:
+        table = np.empty(shape, dtype=table_dtype(n))
+    else:
+        table = np.lib.format.open_memmap(path, mode="w+", dtype=table_dtype(n), shape=shape)
+    for start, rows in table_chunks(n, residues):
+        table[start:start + len(rows)] = rows
+    if path is not None:
+        table.flush()
+    return table
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python totient.py MODULUS TABLE.npy", file=sys.stderr)
+        sys.exit(2)
+    n = int(sys.argv[1])
+    table = multiplication_table(n, sys.argv[2])
+    print("phi(%d) = %d, table %s written to %s" % (n, len(table), table.shape, sys.argv[2]))
@@ -0,0 +1,252 @@
+"""
+UNIT GROUP STRUCTURE
+Orders of elements, primitive roots and the invariant factors of the unit
+group (Z/nZ)^x.
+
+The order of i divides the exponent of the group, Carmichael's lambda(n)
+(which divides phi(n)), so it is found from one factorization of lambda(n)
+instead of trying i, i^2, i^3, ...: starting from e = lambda(n), each prime
+p of lambda(n) is divided out of e for as long as pow(i, e/p, n) stays 1,
+a few modular powers per element.  Factorizations divide by the primes up
+to the square root, taken from the cached sieve of totient.py, so single
+queries work up to n = 10^12 and beyond.
+
+(Z/nZ)^x is cyclic exactly for n = 1, 2, 4, p^k and 2p^k, p an odd prime;
+g is then a primitive root when g^(phi(n)/q) != 1 for every prime q of
+phi(n).  In general it is the product of cyclic groups of order
+p^(k-1)(p-1) over the odd prime powers p^k of n, times C2 x C(2^(k-2)) for
+2^k, k >= 3 (C2 for 4), and regrouping the prime power parts gives the
+invariant factors d_1 | d_2 | ... | d_r = lambda(n).
+
+unit_orders finds the orders of all units at once with NumPy, for moduli
+around 10^6: by discrete logarithms when the group is cyclic (g^k has order
+phi(n) / gcd(k, phi(n)), and one pass over the powers of g labels every
+unit with its k), and otherwise by the same trimming as above with the
+modular powers vectorized over all units.
+
+EXAMPLES:
+
+>>> from unit_group import multiplicative_order, primitive_root, invariant_factors, unit_orders
+>>> multiplicative_order(2, 10 ** 12 + 39)
+500000000019
+>>> primitive_root(10 ** 12 + 39), primitive_root(8)
+(3, None)
+>>> invariant_factors(8), invariant_factors(720)
+([2, 2], [2, 2, 4, 12])
+>>> residues, orders = unit_orders(15)
+>>> dict(zip(residues.tolist(), orders.tolist()))
+{1: 1, 2: 4, 4: 2, 7: 4, 8: 4, 11: 2, 13: 4, 14: 2}
+"""
+
+from __future__ import print_function
+import numpy as np
+from totient import coprime_residues, primes
+
+#largest prime the factorizations divide by, enough for n < 10^14
+SIEVE_LIMIT = 10 ** 7
+
+_primes = np.zeros(0, dtype=np.int64)
+_limit = 0
+
+def prime_table(limit):
+    """
+    returns primes up to at least limit, from a cached sieve
+    """
+    global _primes, _limit
+    if limit > _limit:
+        _limit = max(limit, 1000)
+        _primes = primes(_limit)
+    return _primes
+
+def factorize(n):
+    """
+    returns list of (p, k) with n = prod p^k, p increasing
+    raises ValueError if n has two prime factors above SIEVE_LIMIT
+    """
+    if n < 1:
+        raise ValueError("Only positive integers are factored")
+    limit = min(int(n ** 0.5) + 1, SIEVE_LIMIT)
+    table = prime_table(limit)
+    table = table[:np.searchsorted(table, limit, side="right")]
+    if n < 2 ** 63:
+        candidates = table[n % table == 0].tolist()
+    else:
+        candidates = [p for p in table.tolist() if n % p == 0]
+    factors = []
+    for p in candidates:
+        k = 0
+        while n % p == 0:
+            n //= p
+            k += 1
+        factors.append((p, k))
+    if n > 1:
+        #every prime up to limit is divided out, so a cofactor below limit^2 is prime
+        if n >= limit * limit:
+            raise ValueError("%d has no prime factor up to %d" % (n, limit))
+        factors.append((n, 1))
+    return factors
+
+def totient(n, factors = None):
+    """
+    returns phi(n)
+    """
+    phi = 1
+    for p, k in factors or factorize(n):
+        phi *= p ** (k - 1) * (p - 1)
+    return phi
+
+def cyclic_factors(n, factors = None):
+    """
+    returns orders of the cyclic groups (Z/p^kZ)^x, with 2^k, k >= 3,
+    split into 2 and 2^(k-2), whose product is (Z/nZ)^x
+    """
+    orders = []
+    for p, k in factors or factorize(n):
+        if p == 2:
+            orders += [2, 2 ** (k - 2)] if k >= 3 else ([2] if k == 2 else [])
+        else:
+            orders.append(p ** (k - 1) * (p - 1))
+    return orders
+
+def invariant_factors(n):
+    """
+    returns invariant factors d_1 | d_2 | ... of (Z/nZ)^x, [] if trivial
+    """
+    #prime power parts of every cyclic factor, largest first for each prime
+    parts = {}
+    for order in cyclic_factors(n):
+        for q, k in factorize(order) if order > 1 else []:
+            parts.setdefault(q, []).append(q ** k)
+    for powers in parts.values():
+        powers.sort(reverse=True)
+    invariants = []
+    for i in xrange(max([len(powers) for powers in parts.values()] or [0])):
+        d = 1
+        for powers in parts.values():
+            if i < len(powers):
+                d *= powers[i]
+        invariants.append(d)
+    return invariants[::-1]
+
+def carmichael(n):
+    """
+    returns lambda(n), the exponent of (Z/nZ)^x
+    """
+    invariants = invariant_factors(n)
+    return invariants[-1] if invariants else 1
+
+def is_cyclic(n):
+    """
+    returns True if (Z/nZ)^x is cyclic
+    """
+    return len(invariant_factors(n)) <= 1
+
+def trim(i, n, exponent, factors):
+    """
+    returns order of i mod n given a multiple exponent of it and the
+    factors of exponent
+    """
+    for p, k in factors:
+        for _ in xrange(k):
+            if pow(i, exponent // p, n) != 1:
+                break
+            exponent //= p
+    return exponent
+
+def multiplicative_order(i, n):
+    """
+    returns least e >= 1 with i^e = 1 mod n
+    raises ValueError if i is not a unit mod n
+    """
+    if n == 1:
+        return 1
+    a, b = i % n, n
+    while b:
+        a, b = b, a % b
+    if a != 1:
+        raise ValueError("%d is not a unit mod %d" % (i, n))
+    exponent = carmichael(n)
+    return trim(i % n, n, exponent, factorize(exponent))
+
+def primitive_root(n):
+    """
+    returns least primitive root mod n, None if (Z/nZ)^x is not cyclic
+    """
+    if not is_cyclic(n):
+        return None
+    if n <= 2:
+        return n - 1
+    phi = totient(n)
+    tests = [phi // q for q, _ in factorize(phi)]
+    g = 1
+    while True:
+        g += 1
+        if all(pow(g, e, n) != 1 for e in tests) and pow(g, phi, n) == 1:
+            return g
+
+def primitive_roots(n):
+    """
+    returns sorted array of all primitive roots mod n, g^k for the k
+    coprime to phi(n)
+    """
+    g = primitive_root(n)
+    if g is None:
+        return np.zeros(0, dtype=np.int64)
+    phi = totient(n)
+    powers = power_table(g, n, phi)
+    exponents = coprime_residues(phi) if phi > 1 else np.zeros(1, dtype=np.int64)
+    return np.sort(powers[exponents])
+
+def power_table(g, n, count):
+    """
+    returns g^0 ... g^(count-1) mod n, doubling the filled prefix each step
+    """
+    powers = np.full(count, 1 % n, dtype=np.int64)
+    filled, step = 1, g % n
+    while filled < count:
+        size = min(filled, count - filled)
+        powers[filled:filled + size] = powers[:size] * step % n
+        filled += size
+        step = step * step % n
+    return powers
+
+def power_mod(x, e, n):
+    """
+    returns x^e mod n elementwise for arrays x and e, by square and multiply
+    """
+    result = np.ones(len(x), dtype=np.int64)
+    base = x % n
+    e = e.copy()
+    while e.any():
+        odd = (e & 1).astype(bool)
+        result[odd] = result[odd] * base[odd] % n
+        base = base * base % n
+        e >>= 1
+    return result
+
+def unit_orders(n):
+    """
+    returns (residues, orders) of all units mod n
+    raises ValueError if products mod n overflow int64
+    """
+    if (n - 1) ** 2 >= 2 ** 63:
+        raise ValueError("Products mod %d overflow int64" % n)
+    residues = coprime_residues(n)
+    if n <= 2:
+        return residues, np.ones(len(residues), dtype=np.int64)
+    g = primitive_root(n)
+    if g is not None:
+        #logs[x] = k with g^k = x, one pass over the powers of g
+        phi = len(residues)
+        logs = np.zeros(n, dtype=np.int64)
+        logs[power_table(g, n, phi)] = np.arange(phi)
+        return residues, phi // np.gcd(logs[residues], phi)
+    exponent = carmichael(n)
+    orders = np.full(len(residues), exponent, dtype=np.int64)
+    for p, k in factorize(exponent):
+        for _ in xrange(k):
+            divisible = np.nonzero(orders % p == 0)[0]
+            trimmed = orders[divisible] // p
+            ones = power_mod(residues[divisible], trimmed, n) == 1
+            orders[divisible[ones]] = trimmed[ones]
+    return residues, orders
@@ -0,0 +1,240 @@
+"""
+
+==================
+CONJUGACY CLASSES
+==================
+
+Conjugacy classes, centralizer orders and conjugating elements, for the
+symmetric group S_n and for groups given by generators (perm_group).
+
+S_n
+------------------
+Two permutations are conjugate in S_n exactly when they have the same
+cycle type, so classes are the partitions lambda of n.  The centralizer of
+an element of type lambda = 1^m_1 2^m_2 ... has order
+z_lambda = prod k^m_k m_k!, and its class n! / z_lambda elements.  A
+conjugating element lines up the cycles of equal length.
+
+Subgroups
+------------------
+The class of x in G = <S> is the orbit of x under conjugation by S, found
+by breadth first search, and |C_G(x)| = |G| / |class|.  Cycle types are
+conjugacy invariants, so only elements of equal type are compared.
+
+Cycle-type keys are memoized in _cycle_types, keyed by cycle notation
+string, permutation or array row, so a batch repeating permutations costs
+dictionary hits.  The memo keeps the CYCLE_TYPE_CACHE_SIZE most recently
+used keys, so long runs over many distinct elements stay bounded.
+
+Examples
+------------------
+>>> from conjugacy import symmetric_classes, conjugating_element, classes
+>>> [(key, size) for key, rep, size in symmetric_classes(4)]
+[((4,), 6), ((3, 1), 8), ((2, 2), 3), ((2, 1, 1), 6), ((1, 1, 1, 1), 1)]
+>>> print(conjugating_element("(12)(345)", "(154)(23)"))
+(123)(45)
+>>> from perm_group import perm_group
+>>> [size for rep, size, centralizer in classes(perm_group(["(123)", "(234)"]))]
+[1, 3, 4, 4]
+
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import numpy as np
+from permutation import perm
+import perm_batch
+
+#most cycle types memoized
+CYCLE_TYPE_CACHE_SIZE = 1 << 16
+
+#memoized cycle types, (key, value) of cycle notation or image bytes :
+#partition, least recently used first
+_cycle_types = OrderedDict()
+
+def _recall(key):
+    """
+    returns memoized cycle type of key, None if absent, marking it used
+    """
+    value = _cycle_types.pop(key, None)
+    if value is not None:
+        _cycle_types[key] = value
+    return value
+
+def _remember(key, value):
+    """
+    memoizes cycle type value of key, dropping the least recently used
+    keys beyond CYCLE_TYPE_CACHE_SIZE
+    """
+    _cycle_types.pop(key, None)
+    _cycle_types[key] = value
+    while len(_cycle_types) > CYCLE_TYPE_CACHE_SIZE:
+        _cycle_types.popitem(last=False)
+
+def to_perm(g):
+    """
+    returns g of cycle notation or perm as a perm
+    """
+    return g if isinstance(g, perm) else perm.from_cycles(g)
+
+def cycle_type_key(g, degree = None):
+    """
+    returns cycle type of g as a decreasing tuple, fixed points included
+    up to degree (default the degree of g), memoized
+    """
+    #perms equal up to trailing fixed points hash alike, so key by images
+    key = (g if not isinstance(g, perm) else g.images.tostring(), degree)
+    value = _recall(key)
+    if value is None:
+        p = to_perm(g)
+        p = p.extended(degree) if degree is not None else p
+        value = p.cycle_type()
+        _remember(key, value)
+    return value
+
+def cycle_type_keys(P):
+    """
+    returns cycle types of the rows of a (k, n) array, computing only the
+    rows not seen before, in one perm_batch.cycle_types call
+    """
+    P = np.ascontiguousarray(P, dtype=np.int64)
+    keys = [row.tobytes() for row in P]
+    #the batch is answered from found, which evictions cannot touch
+    found, missing = {}, []
+    for i, key in enumerate(keys):
+        if key not in found:
+            found[key] = _recall(key)
+            if found[key] is None:
+                missing.append(i)
+    if missing:
+        H = perm_batch.cycle_types(P[missing])
+        for i, counts in zip(missing, H):
+            found[keys[i]] = tuple(length for length in xrange(len(counts) - 1, 0, -1)
+                                   for _ in xrange(counts[length]))
+            _remember(keys[i], found[keys[i]])
+    return [found[key] for key in keys]
+
+def partitions(n, largest = None):
+    """
+    returns generator of partitions of n as decreasing tuples, in reverse
+    lexicographic order
+    """
+    largest = n if largest is None else largest
+    if n == 0:
+        yield ()
+        return
+    for k in xrange(min(n, largest), 0, -1):
+        for rest in partitions(n - k, k):
+            yield (k,) + rest
+
+def centralizer_order(partition):
+    """
+    returns z_lambda = prod k^m_k m_k!, the order of the centralizer in S_n
+    of an element of cycle type partition
+    """
+    result = 1
+    for k in set(partition):
+        m = partition.count(k)
+        result *= k ** m
+        for i in xrange(2, m + 1):
+            result *= i
+    return result
+
+def class_size(partition):
+    """
+    returns number of elements of S_n of cycle type partition
+    """
+    size = 1
+    for i in xrange(2, sum(partition) + 1):
+        size *= i
+    return size // centralizer_order(partition)
+
+def representative(partition):
+    """
+    returns permutation of cycle type partition with consecutive cycles
+    """
+    images, start = [], 0
+    for k in partition:
+        images.extend(range(start + 1, start + k) + [start])
+        start += k
+    return perm(images)
+
+def symmetric_classes(n):
+    """
+    returns list of (cycle type, representative, class size) for S_n
+    """
+    return [(key, representative(key), class_size(key)) for key in partitions(n)]
+
+def conjugating_element(a, b, group = None):
+    """
+    returns g with g a g^-1 = b (a.conjugate(g) == b), in S_n or in group,
+    None if a and b are not conjugate there
+    """
+    a, b = to_perm(a), to_perm(b)
+    if group is not None:
+        return group_conjugator(group, a, b)
+    n = max(a.degree, b.degree)
+    a, b = a.extended(n), b.extended(n)
+    if cycle_type_key(a) != cycle_type_key(b):
+        return None
+    by_length = lambda p: sorted(p.cycles(fixed = True), key = len)
+    images = [0] * n
+    #g sends the j-th point of each a cycle to the j-th point of the b cycle
+    for c, d in zip(by_length(a), by_length(b)):
+        for i, j in zip(c, d):
+            images[i - 1] = j - 1
+    return perm(images)
+
+def conjugation_orbit(group, a, target = None):
+    """
+    returns (key, value) of x : g with a.conjugate(g) == x over the class
+    of a in group, stopping early once target is reached
+    """
+    conjugators = {a: group.identity}
+    queue = [a]
+    for x in queue:
+        if target is not None and x == target:
+            break
+        g = conjugators[x]
+        for s in group.generators:
+            y = x.conjugate(s)
+            if y not in conjugators:
+                conjugators[y] = s * g
+                queue.append(y)
+    return conjugators
+
+def group_conjugator(group, a, b):
+    """
+    returns g in group with a.conjugate(g) == b, None if there is none
+    """
+    a, b = a.extended(group.degree), b.extended(group.degree)
+    if not (group.contains(a) and group.contains(b)):
+        raise ValueError("Both permutations must lie in the group!")
+    if cycle_type_key(a) != cycle_type_key(b):
+        return None
+    return conjugation_orbit(group, a, b).get(b)
+
+def centralizer_size(group, a):
+    """
+    returns |C_G(a)| = |G| / |class of a|
+    """
+    a = to_perm(a).extended(group.degree)
+    return group.order() // len(conjugation_orbit(group, a))
+
+def classes(group):
+    """
+    returns list of (representative, class size, centralizer order) of the
+    conjugacy classes of group, by conjugation orbits of its elements;
+    representatives are the first element met, identity first
+    """
+    order = group.order()
+    seen = set()
+    result = []
+    for x in group.elements():
+        if x in seen:
+            continue
+        orbit = conjugation_orbit(group, x)
+        seen.update(orbit)
+        result.append((x, len(orbit), order // len(orbit)))
+    result.sort(key = lambda c: (c[1], cycle_type_key(c[0])))
+    return result
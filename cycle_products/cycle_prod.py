@@ -6,17 +6,18 @@ by Vincent Nguyen
 ==================
 
 Computes the product for permutations 'a' and 'b'.  Displays the result of
-'ab', 'ba', 'aba^-1', and 'bab^-1'.  I used dictionaries to indicate mappings.
+'ab', 'ba', 'aba^-1', and 'bab^-1'.  Permutations are permutation.perm
+arrays of images, so any degree works and each product costs O(n).
 
 Inputs
 ------------------
 a: string, default "(I)"
-    Permutation of 1...9 represented in cycle notation with (...)
-    Ex.) (145)(26)
+    Permutation of 1...n represented in cycle notation with (...)
+    Ex.) (145)(26) or (10 12 3)(4 5)
 
 b: string, default "(I)"
-    Permutation of 1...9 represented in cycle notation with (...)
-    Ex.) (145)(26)
+    Permutation of 1...n represented in cycle notation with (...)
+    Ex.) (145)(26) or (10 12 3)(4 5)
 
 Examples
 ------------------
@@ -39,94 +40,35 @@ Error support
 Parentheses to indicate cycle beginning and end
 Checks for duplicate values within cycle
 Only numbers within cycle
+Points separated by spaces or commas may have several digits
 
 """
 
-import re 
+from permutation import perm
 
-#swaps keys and values of dictionary for inverse computation
-def swap(dic):
-    return {v: k for k, v in dic.items()}
-
-#computes dictionary mapping for a single cycle
-def product(cycle):
-    if len("".join(set(cycle))) != len(cycle):
-        raise ValueError("Duplicate values in cycle!")
-    if not cycle.isdigit():
-        raise ValueError("Only numbers permitted in cycle!")
-        
-    mapping = {str(i): str(i) for i in xrange(1, 10)}
-    if cycle != "I":
-        for i in xrange(len(cycle)):
-            n1 = cycle[i]
-            n2 = cycle[i+1] if i+1 != len(cycle) else cycle[0]
-            mapping[n1] = n2
-    return mapping
-
-#goes through final dictionary mapping to identify cycles
-def path(final):
-    lst = []
-    nums = [str(i) for i in xrange(1, 10)]
-    while len(nums) != 0:
-        i, s = nums[0], nums[0]
-        pointer = final[nums[0]]
-        while i != pointer:
-            s += pointer
-            pointer = final[pointer]
-        for c in s:
-            nums.remove(c)
-        if len(s) > 1:
-            lst.append(s)
-    if len(lst) == 0:
-        lst = ["I"]
-    return lst
-
-#returns final dictionary mapping of permutation in simplest form
-def simplify(perm):
-    maps = [product(cycle) for cycle in perm]
-    final = maps[-1]
-    for i in xrange(len(maps)-1):
-        for n in final:
-            final[n] = maps[len(maps) - i - 2][final[n]]
-    return final
+def perm_mult(a = "(I)", b = "(I)"):
+    a = perm.from_cycles(a)
+    b = perm.from_cycles(b)
+    n = max(a.degree, b.degree)
+    a, b = a.extended(n), b.extended(n)
 
-#removes parentheses around input strings and splits accordingly
-def preprocess(perm):
-    if "(" and ")" not in perm:
-        raise ValueError("Use '('' and ')' to denote cycle!")
-    return [", ".join(cycle.split()) for cycle in re.split(r'[()]', perm) if cycle.strip()]
+    a_inv = a.inverse()
+    b_inv = b.inverse()
 
-#prints out final result in cycle notation format with parentheses
-def display(lst):
-    s = ""
-    for i in lst:
-        s += "(" + i + ")"
-    return s.strip()
+    ab = a * b
+    ba = b * a
 
-def perm_mult(a = "(I)", b = "(I)"):
-    map_a = simplify(preprocess(a))
-    map_b = simplify(preprocess(b))
-    
-    a = path(map_a)
-    b = path(map_b)
-    
-    a_inv = path(swap(map_a))
-    b_inv = path(swap(map_b))
-    
-    ab = path(simplify(a+b))
-    ba = path(simplify(b+a))
-    
-    aba_inv = path(simplify(a+b+a_inv))
-    bab_inv = path(simplify(b+a+b_inv))
+    aba_inv = b.conjugate(a)
+    bab_inv = a.conjugate(b)
     print
-    print "a =", display(a)
-    print "b =", display(b)
-    print "a^-1 =", display(a_inv)
-    print "b^-1 =", display(b_inv)
-    print "ab =", display(ab)
-    print "ba =", display(ba)
-    print "aba^-1 =", display(aba_inv)
-    print "bab^-1 =", display(bab_inv)
+    print "a =", a
+    print "b =", b
+    print "a^-1 =", a_inv
+    print "b^-1 =", b_inv
+    print "ab =", ab
+    print "ba =", ba
+    print "aba^-1 =", aba_inv
+    print "bab^-1 =", bab_inv
     
     return ""
 
@@ -0,0 +1,207 @@
+"""
+
+==================
+BATCH PERMUTATIONS
+==================
+
+Permutations of 1...n held as rows of a (k, n) integer array of zero-based
+images (row r maps point i+1 to P[r, i]+1, as in permutation.perm), so k
+pairs are multiplied with one fancy-indexing call instead of k calls to
+perm_mult.
+
+Products follow cycle_prod: compose(A, B) applies B first, then A.
+
+Cycle types come from pointer jumping: after log2(n) squarings every point
+knows the smallest point of its cycle, and one bincount turns those labels
+into a (k, n+1) histogram whose entry [r, L] counts the L-cycles of row r.
+
+Functions taking arrays validate them with checked, as permutation.perm
+does; pass check=False for arrays already known to be permutations.
+
+Examples
+------------------
+>>> import numpy as np
+>>> from perm_batch import from_cycles, compose, cycle_types, to_cycles
+>>> A = from_cycles(["(234)(12354)", "(12)"], 9)
+>>> B = from_cycles(["(123)(456721)(45391)", "(23)"], 9)
+>>> to_cycles(compose(A, B))
+['(12467539)', '(123)']
+>>> cycle_types(A)[:, 1:6].tolist()
+[[4, 0, 0, 0, 1], [7, 1, 0, 0, 0]]
+>>> compose(A, [[0, 0, 1, 2, 3, 4, 5, 6, 7]])
+Traceback (most recent call last):
+    ...
+ValueError: Rows do not form permutations!
+
+"""
+
+from __future__ import print_function
+import numpy as np
+from fractions import gcd
+from permutation import perm
+
+_lcm = np.frompyfunc(lambda a, b: a * b // gcd(a, b), 2, 1)
+
+def checked(P):
+    """
+    returns P as a (k, n) int64 array
+    raises ValueError if some row is not a permutation of 0...n-1
+    """
+    P = np.asarray(P, dtype=np.int64)
+    if P.ndim == 1:
+        P = P[None]
+    if P.ndim != 2:
+        raise ValueError("expected a (k, n) array of permutations")
+    if not np.array_equal(np.sort(P, axis=1), np.broadcast_to(np.arange(P.shape[1]), P.shape)):
+        raise ValueError("Rows do not form permutations!")
+    return P
+
+def from_cycles(strings, degree = None):
+    """
+    returns (k, degree) array of the permutations written in cycle notation
+    degree defaults to the largest point written
+    """
+    perms = [perm.from_cycles(s) for s in strings]
+    if degree is None:
+        degree = max([p.degree for p in perms] or [0])
+    return np.array([p.extended(degree).images for p in perms], dtype=np.int64).reshape(-1, degree)
+
+def to_perms(P):
+    """
+    returns list of permutation.perm, one per row
+    """
+    return [perm(row) for row in np.asarray(P).tolist()]
+
+def to_cycles(P):
+    """
+    returns list of cycle notation strings, one per row
+    """
+    return [str(p) for p in to_perms(P)]
+
+def identity(k, n):
+    """
+    returns k copies of the identity of degree n
+    """
+    return np.repeat(np.arange(n, dtype=np.int64)[None], k, axis=0)
+
+def random(k, n, seed = None):
+    """
+    returns k uniformly random permutations of degree n
+    """
+    rng = np.random.RandomState(seed)
+    return np.argsort(rng.random_sample((k, n)), axis=1)
+
+def compose(A, B, check = True):
+    """
+    returns rowwise products AB, B applied first
+    """
+    if check:
+        A, B = checked(A), checked(B)
+    A, B = np.broadcast_arrays(A, B)
+    return np.take_along_axis(A, B, axis=1)
+
+def inverse(A, check = True):
+    """
+    returns rowwise inverses
+    """
+    A = checked(A) if check else np.asarray(A)
+    inv = np.empty_like(A)
+    np.put_along_axis(inv, A, np.broadcast_to(np.arange(A.shape[1]), A.shape), axis=1)
+    return inv
+
+def conjugate(A, G, check = True):
+    """
+    returns rowwise G A G^-1
+    """
+    if check:
+        A, G = checked(A), checked(G)
+    return compose(compose(G, A, False), inverse(G, False), False)
+
+def commutator(A, B, check = True):
+    """
+    returns rowwise A B A^-1 B^-1
+    """
+    if check:
+        A, B = checked(A), checked(B)
+    return compose(compose(A, B, False), inverse(compose(B, A, False), False), False)
+
+def power(A, e, check = True):
+    """
+    returns rowwise A^e by square and multiply, negative e allowed
+    """
+    A = checked(A) if check else np.asarray(A)
+    base = A if e >= 0 else inverse(A, False)
+    result = identity(*A.shape)
+    e = abs(e)
+    while e:
+        if e & 1:
+            result = compose(result, base, False)
+        base = compose(base, base, False)
+        e >>= 1
+    return result
+
+def perm_mult_batch(A, B, check = True):
+    """
+    returns (key, value) of "ab", "ba", "aba^-1", "bab^-1" : (k, n) arrays,
+    the batch form of cycle_prod.perm_mult
+    """
+    if check:
+        A, B = checked(A), checked(B)
+    ab, ba = compose(A, B, False), compose(B, A, False)
+    return {"ab": ab, "ba": ba,
+            "aba^-1": compose(ab, inverse(A, False), False),
+            "bab^-1": compose(ba, inverse(B, False), False)}
+
+def cycle_labels(P, check = True):
+    """
+    returns (k, n) array holding for each point the smallest point of its cycle
+    """
+    P = checked(P) if check else np.asarray(P)
+    k, n = P.shape
+    #flat indices into the whole stack gather faster than take_along_axis
+    labels = np.broadcast_to(np.arange(n), P.shape).ravel()
+    jump = (P + (np.arange(k) * n)[:, None]).ravel()
+    reach = 1
+    while reach < n:
+        #labels now cover i, P(i), ..., P^(reach-1)(i)
+        labels = np.minimum(labels, labels[jump])
+        jump = jump[jump]
+        reach *= 2
+    return labels.reshape(k, n)
+
+def cycle_types(P, check = True):
+    """
+    returns (k, n+1) histogram, entry [r, L] the number of L-cycles of row r
+    """
+    P = checked(P) if check else np.asarray(P)
+    k, n = P.shape
+    rows = np.arange(k)[:, None]
+    sizes = np.bincount((cycle_labels(P, False) + rows * n).ravel(), minlength=k * n).reshape(k, n)
+    #a cycle is counted at its smallest point, other points have size 0
+    r, leader = np.nonzero(sizes)
+    return np.bincount(r * (n + 1) + sizes[r, leader], minlength=k * (n + 1)).reshape(k, n + 1)
+
+def cycle_counts(P, check = True):
+    """
+    returns number of cycles, fixed points included, of each row
+    """
+    return cycle_types(P, check).sum(axis=1)
+
+def signs(P, check = True):
+    """
+    returns 1 for even and -1 for odd rows
+    """
+    P = checked(P) if check else np.asarray(P)
+    return 1 - 2 * ((P.shape[1] - cycle_counts(P, False)) % 2)
+
+def orders(P, check = True):
+    """
+    returns order of each row, the lcm of its cycle lengths, as an object
+    array since orders outgrow int64 for degrees in the hundreds
+    """
+    H = cycle_types(P, check)
+    result = np.ones(H.shape[0], dtype=object)
+    for length in np.nonzero(H.any(axis=0))[0]:
+        present = H[:, length] > 0
+        result[present] = _lcm(result[present], int(length))
+    return result
@@ -0,0 +1,329 @@
+"""
+
+==================
+PERMUTATION GROUPS
+==================
+
+Groups generated by permutations written in cycle_prod's cycle notation,
+held as a base and strong generating set (BSGS) built by randomized
+Schreier-Sims, so groups far too large to enumerate (S_n subgroups with n
+in the hundreds) cost polynomial time and memory.
+
+Construction
+------------------
+Random elements from product replacement are sifted through the
+stabilizer chain; every residue that fails to sift becomes a new strong
+generator.  The random phase stops once `certainty` elements in a row
+sift.  It stops with proof once the chain reaches the order, when known,
+or the order of the symmetric (alternating for even generators) group on
+the orbits, which covers S_n and A_n.  Otherwise the chain is Monte
+Carlo: it is too small with probability about 2^-certainty, and then only
+the order and membership are off.  verify=True makes it exact by sifting
+every Schreier generator of every level, about n^3 / 3 sifts of degree n
+permutations: B_60 on 120 points takes a third of a second without and
+over three minutes with it, so it is opt-in.
+
+Queries
+------------------
+order, membership (sift to the identity), uniform random elements (one
+random coset representative per level), orbit and point stabilizer.
+
+Examples
+------------------
+>>> from perm_group import perm_group
+>>> G = perm_group(["(1 2 3 4 5 6 7 8 9 10)", "(1 2)"])
+>>> G.order()
+3628800
+>>> G.contains("(1 3)(2 4)"), perm_group(["(123)", "(345)"]).contains("(12)")
+(True, False)
+>>> H = G.stabilizer(1)
+>>> H.order(), H.orbit(2)
+(362880, [2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+"""
+
+from __future__ import print_function
+import random
+from permutation import perm
+
+class perm_group(object):
+    def __init__(self, generators, degree = None, order = None, certainty = 20,
+                 verify = False, seed = None):
+        """
+        generators : list of str or perm
+            generators in cycle notation, or permutation.perm
+        degree : int
+            number of points, defaults to the largest point moved
+        order : int
+            group order when known; construction then stops as soon as the
+            chain reaches it and skips verification
+        certainty : int
+            consecutive successful sifts ending the random phase
+        verify : bool
+            sift every Schreier generator after the random phase, which
+            proves the chain complete at a cost of about degree^3 / 3 sifts
+
+        base : lst
+            zero-based base points b_0, b_1, ...
+        levels : lst
+            per base point: (key, value) of "gens" : strong generators first
+            fixing that point, "transversal" : (key, value) of orbit point :
+            inverse u^-1 of the coset representative u with u(b_i) = point
+        """
+        generators = [g if isinstance(g, perm) else perm.from_cycles(g) for g in generators]
+        if degree is None:
+            degree = max([g.degree for g in generators] or [0])
+        self.degree = degree
+        self.generators = [g.extended(degree) for g in generators if not g.is_identity()]
+        self.identity = perm.identity(degree)
+        self.random_state = random.Random(seed)
+        self.base = []
+        self.levels = []
+        self.schreier_sims(order, certainty, verify)
+
+    def level_gens(self, i):
+        """
+        returns strong generators of the i-th stabilizer, those fixing b_0...b_i-1
+        """
+        return [s for level in self.levels[i:] for s in level["gens"]]
+
+    def grow_transversal(self, i, new_gens):
+        """
+        extends orbit of b_i after new_gens joined the i-th stabilizer, by
+        breadth first search from the points they move out of the orbit
+        """
+        transversal = self.levels[i]["transversal"]
+        queue = []
+        def visit(point, s, s_inv):
+            image = s.images[point]
+            if image not in transversal:
+                #u_image = s u_point
+                transversal[image] = transversal[point] * s_inv
+                queue.append(image)
+        for s in new_gens:
+            s_inv = s.inverse()
+            for point in transversal.keys():
+                visit(point, s, s_inv)
+        if queue:
+            gens = [(s, s.inverse()) for s in self.level_gens(i)]
+            for point in queue:
+                for s, s_inv in gens:
+                    visit(point, s, s_inv)
+
+    def sift(self, g, start = 0):
+        """
+        returns (residue, level) of g stripped through the chain from level
+        start; level == len(base) when every base point was fixed
+        """
+        for i in xrange(start, len(self.levels)):
+            u_inv = self.levels[i]["transversal"].get(g.images[self.base[i]])
+            if u_inv is None:
+                return g, i
+            g = u_inv * g
+        return g, len(self.levels)
+
+    def add_strong_generator(self, h, level):
+        """
+        adds sift residue h, which fixes b_0...b_level-1, to the chain
+        """
+        if level == len(self.levels):
+            moved = next(i for i, j in enumerate(h.images) if i != j)
+            self.base.append(moved)
+            self.levels.append({"gens": [], "transversal": {moved: self.identity}})
+        self.levels[level]["gens"].append(h)
+        for i in xrange(level + 1):
+            self.grow_transversal(i, [h])
+
+    def sift_in(self, g):
+        """
+        sifts g and adds its residue as a strong generator
+        returns True if g was already in the group of the current chain
+        """
+        h, level = self.sift(g)
+        if level == len(self.levels) and h.is_identity():
+            return True
+        self.add_strong_generator(h, level)
+        return False
+
+    def product_replacement(self):
+        """
+        returns generator of random elements by product replacement
+        """
+        rand = self.random_state
+        state = list(self.generators)
+        while len(state) < 10:
+            state.append(state[len(state) % len(self.generators)])
+        accumulator = self.identity
+        step = 0
+        while True:
+            i, j = rand.sample(xrange(len(state)), 2)
+            if rand.random() < 0.5:
+                state[i] = state[i] * state[j]
+                accumulator = accumulator * state[i]
+            else:
+                state[i] = state[j] * state[i]
+                accumulator = state[i] * accumulator
+            step += 1
+            #first products are biased towards the generators
+            if step > 50:
+                yield accumulator
+
+    def order_bound(self):
+        """
+        returns product of |orbit|! over the orbits of the generators, halved
+        when every generator is even: the group can be no larger
+        """
+        bound, seen = 1, set()
+        for point in xrange(1, self.degree + 1):
+            if point not in seen:
+                orbit = self.orbit(point)
+                seen.update(orbit)
+                for k in xrange(2, len(orbit) + 1):
+                    bound *= k
+        if bound > 1 and all(g.sign() == 1 for g in self.generators):
+            bound //= 2
+        return bound
+
+    def schreier_sims(self, order, certainty, verify):
+        """
+        builds the chain: generators, then random sifts, then verification
+        unless the chain already reached the known order or order_bound
+        """
+        for g in self.generators:
+            self.sift_in(g)
+        if not self.generators:
+            return
+        target = order if order is not None else self.order_bound()
+        consecutive = 0
+        for g in self.product_replacement():
+            if self.order() >= target:
+                return
+            if order is None and consecutive >= certainty:
+                break
+            consecutive = consecutive + 1 if self.sift_in(g) else 0
+        if verify:
+            self.verify()
+
+    def verify(self):
+        """
+        sifts all Schreier generators u_(s p)^-1 s u_p, deepest level first,
+        adding any residue, until the chain is complete
+        """
+        i = len(self.levels) - 1
+        while i >= 0:
+            transversal = self.levels[i]["transversal"]
+            gens = self.level_gens(i)
+            size, depth = len(transversal), len(self.levels)
+            for point, u_inv in transversal.items():
+                u = u_inv.inverse()
+                for s in gens:
+                    g = transversal[s.images[point]] * s * u
+                    h, level = self.sift(g, i + 1)
+                    if level < len(self.levels) or not h.is_identity():
+                        self.add_strong_generator(h, level)
+                        break
+                if len(self.levels) != depth or len(transversal) != size or len(self.level_gens(i)) != len(gens):
+                    break
+            else:
+                i -= 1
+                continue
+            #chain changed at or below level i: recheck from the bottom
+            i = len(self.levels) - 1
+
+    def order(self):
+        """
+        returns group order, the product of the basic orbit lengths
+        """
+        result = 1
+        for level in self.levels:
+            result *= len(level["transversal"])
+        return result
+
+    def to_perm(self, g):
+        """
+        returns g of cycle notation or perm as a perm of the group's degree,
+        None if g moves a point beyond it
+        """
+        g = g if isinstance(g, perm) else perm.from_cycles(g)
+        if g.degree > self.degree:
+            if any(g.images[i] != i for i in xrange(self.degree, g.degree)):
+                return None
+            return perm(g.images[:self.degree])
+        return g.extended(self.degree)
+
+    def contains(self, g):
+        """
+        returns True if g is in the group
+        """
+        g = self.to_perm(g)
+        if g is None:
+            return False
+        h, level = self.sift(g)
+        return level == len(self.levels) and h.is_identity()
+
+    def random(self):
+        """
+        returns uniformly random element: u_0 u_1 ... u_k runs over the group
+        once as each u_i runs over its transversal, and so does its inverse
+        """
+        g = self.identity
+        for level in reversed(self.levels):
+            g = g * self.random_state.choice(level["transversal"].values())
+        return g
+
+    def orbit(self, point):
+        """
+        returns sorted orbit of 1-based point
+        """
+        seen = set([point - 1])
+        queue = [point - 1]
+        for p in queue:
+            for s in self.generators:
+                image = s.images[p]
+                if image not in seen:
+                    seen.add(image)
+                    queue.append(image)
+        return sorted(p + 1 for p in seen)
+
+    def stabilizer(self, point):
+        """
+        returns perm_group of elements fixing 1-based point, generated by
+        the Schreier generators of its orbit; the order is known in advance
+        """
+        b = point - 1
+        transversal = {b: self.identity}
+        queue = [b]
+        for p in queue:
+            for s in self.generators:
+                image = s.images[p]
+                if image not in transversal:
+                    transversal[image] = s * transversal[p]
+                    queue.append(image)
+        gens = set()
+        for p, u in transversal.items():
+            for s in self.generators:
+                g = transversal[s.images[p]].inverse() * s * u
+                if not g.is_identity():
+                    gens.add(g)
+        return perm_group(list(gens), self.degree, order = self.order() // len(transversal),
+                          seed = self.random_state.random())
+
+    def strong_generators(self):
+        """
+        returns list of strong generators in cycle notation
+        """
+        return [str(s) for level in self.levels for s in level["gens"]]
+
+    def elements(self):
+        """
+        returns generator over all elements, each once, as products of one
+        coset representative per level
+        """
+        def walk(i, g):
+            if i < 0:
+                yield g
+                return
+            for u_inv in self.levels[i]["transversal"].values():
+                for h in walk(i - 1, g * u_inv):
+                    yield h
+        return walk(len(self.levels) - 1, self.identity)
@@ -0,0 +1,251 @@
+"""
+
+==================
+PERMUTATIONS
+==================
+
+Permutations of 1...n of any degree n, stored as an array('i') of images
+(index i holds the image of point i+1, minus one).
+
+Products follow cycle_prod: ab means apply b first, then a.
+
+Cycle notation
+------------------
+"(145)(26)"        single-digit points may be written without separators
+"(10 12 3)(4, 5)"  multi-digit points are separated by spaces or commas
+"(I)"              identity
+
+Examples
+------------------
+>>> from permutation import perm
+>>> a = perm.from_cycles("(234)(12354)")
+>>> b = perm.from_cycles("(10 12 3)")
+>>> print(a * b)
+(1 3 10 12 5 2 4)
+>>> (a * b).order(), (a * b).sign(), (a * b).degree
+(7, 1, 12)
+
+"""
+
+from __future__ import print_function
+import re
+from array import array
+from fractions import gcd
+
+class perm(object):
+    def __init__(self, images, check = True):
+        """
+        images : sequence of int
+            images[i] is the image of point i+1, zero-based
+            (so images of the identity of degree 3 are [0, 1, 2])
+        check : bool
+            validate images; products of permutations skip it
+        raises ValueError if images is not a permutation of 0...n-1
+        """
+        self.images = array('i', images) if check else images
+        self.degree = len(self.images)
+        if check and sorted(self.images) != range(self.degree):
+            raise ValueError("Images do not form a permutation!")
+
+    @classmethod
+    def identity(cls, degree):
+        """
+        returns identity permutation of degree
+        """
+        return cls(xrange(degree))
+
+    @classmethod
+    def from_cycle(cls, cycle, degree):
+        """
+        returns permutation of a single cycle given as a list of 1-based points
+        """
+        images = array('i', xrange(degree))
+        for i, point in enumerate(cycle):
+            images[point - 1] = cycle[(i + 1) % len(cycle)] - 1
+        return cls(images)
+
+    @classmethod
+    def from_cycles(cls, s, degree = None):
+        """
+        returns product of the cycles written in s, rightmost applied first
+        degree defaults to the largest point written
+        """
+        cycles = parse_cycles(s)
+        largest = max([max(c) for c in cycles if c] or [0])
+        degree = largest if degree is None else degree
+        if degree < largest:
+            raise ValueError("Point %d exceeds degree %d!" % (largest, degree))
+        #result * (p_0 p_1 ... p_k) only changes the images of the p_i:
+        #each takes the image of the next point, p_k that of p_0
+        images = array('i', xrange(degree))
+        for cycle in cycles:
+            if cycle:
+                first = images[cycle[0] - 1]
+                for i in xrange(len(cycle) - 1):
+                    images[cycle[i] - 1] = images[cycle[i + 1] - 1]
+                images[cycle[-1] - 1] = first
+        return cls(images, False)
+
+    def extended(self, degree):
+        """
+        returns same permutation acting on 1...degree, fixing new points
+        """
+        if degree <= self.degree:
+            return self
+        images = array('i', self.images)
+        images.extend(xrange(self.degree, degree))
+        return perm(images, False)
+
+    def __call__(self, point):
+        """
+        returns image of 1-based point
+        """
+        if point > self.degree:
+            return point
+        return self.images[point - 1] + 1
+
+    def __mul__(self, other):
+        """
+        returns composition self after other, O(n)
+        """
+        n = max(self.degree, other.degree)
+        a, b = self.extended(n).images, other.extended(n).images
+        return perm(array('i', [a[i] for i in b]), False)
+
+    def inverse(self):
+        """
+        returns inverse permutation
+        """
+        inv = array('i', self.images)
+        for i, j in enumerate(self.images):
+            inv[j] = i
+        return perm(inv, False)
+
+    def conjugate(self, g):
+        """
+        returns g self g^-1
+        """
+        return g * self * g.inverse()
+
+    def commutator(self, other):
+        """
+        returns self other self^-1 other^-1
+        """
+        return self * other * self.inverse() * other.inverse()
+
+    def __pow__(self, k):
+        """
+        returns self^k by square and multiply, negative k allowed
+        """
+        base = self if k >= 0 else self.inverse()
+        k = abs(k)
+        result = perm.identity(self.degree)
+        while k:
+            if k & 1:
+                result = result * base
+            base = base * base
+            k >>= 1
+        return result
+
+    def __eq__(self, other):
+        n = max(self.degree, other.degree)
+        return self.extended(n).images == other.extended(n).images
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        #trailing fixed points do not change the permutation
+        images = list(self.images)
+        while images and images[-1] == len(images) - 1:
+            images.pop()
+        return hash(tuple(images))
+
+    def cycles(self, fixed = False):
+        """
+        returns list of cycles as tuples of 1-based points, each starting at
+        its smallest point, ordered by that point; fixed points only if fixed
+        """
+        seen = bytearray(self.degree)
+        images = self.images
+        result = []
+        for start in xrange(self.degree):
+            if seen[start]:
+                continue
+            cycle = []
+            i = start
+            while not seen[i]:
+                seen[i] = 1
+                cycle.append(i + 1)
+                i = images[i]
+            if fixed or len(cycle) > 1:
+                result.append(tuple(cycle))
+        return result
+
+    def cycle_type(self):
+        """
+        returns cycle lengths, fixed points included, in decreasing order
+        """
+        return tuple(sorted((len(c) for c in self.cycles(fixed = True)), reverse = True))
+
+    def order(self):
+        """
+        returns order, the lcm of the cycle lengths
+        """
+        result = 1
+        for length in set(self.cycle_type()):
+            result = result * length // gcd(result, length)
+        return result
+
+    def sign(self):
+        """
+        returns 1 for even and -1 for odd permutations
+        """
+        return -1 if (self.degree - len(self.cycles(fixed = True))) % 2 else 1
+
+    def is_identity(self):
+        return all(i == j for i, j in enumerate(self.images))
+
+    def __str__(self):
+        """
+        returns cycle notation, digits run together when every point < 10
+        """
+        cycles = self.cycles()
+        if not cycles:
+            return "(I)"
+        sep = "" if self.degree < 10 else " "
+        return "".join("(" + sep.join(str(i) for i in c) + ")" for c in cycles)
+
+    def __repr__(self):
+        return "perm.from_cycles(%r, %d)" % (str(self), self.degree)
+
+def parse_cycles(s):
+    """
+    returns list of cycles in s as lists of 1-based points
+    raises ValueError for missing parentheses, non-numbers or repeated points
+    """
+    if "(" not in s or ")" not in s:
+        raise ValueError("Use '(' and ')' to denote cycle!")
+    if s.count("(") != s.count(")"):
+        raise ValueError("Unbalanced parentheses!")
+    if re.sub(r'\([^()]*\)', "", s).strip():
+        raise ValueError("Use '(' and ')' to denote cycle!")
+    cycles = []
+    for body in re.findall(r'\(([^()]*)\)', s):
+        body = body.strip()
+        if body in ("I", ""):
+            cycles.append([])
+            continue
+        if re.search(r'[\s,]', body):
+            tokens = [t for t in re.split(r'[\s,]+', body) if t]
+        else:
+            tokens = list(body)
+        if not all(t.isdigit() for t in tokens):
+            raise ValueError("Only numbers permitted in cycle!")
+        points = [int(t) for t in tokens]
+        if 0 in points:
+            raise ValueError("Points are numbered from 1!")
+        if len(set(points)) != len(points):
+            raise ValueError("Duplicate values in cycle!")
+        cycles.append(points)
+    return cycles
@@ -0,0 +1,184 @@
+"""
+BATCH EULER WALKS
+Solves a stream of small independent graphs across a process pool, one
+JSON object per line in and one per line out.
+
+Each input line is a graph, either as an edge list or as the adjacency
+lists euler_walk asks for interactively:
+    {"id": "zone-17", "edges": [["A", "B"], ["B", "C"], ["C", "A"]]}
+    {"id": "zone-18", "adjacency": {"A": ["B", "B"], "B": ["A", "A"]}}
+with "directed": true making the edges (or adjacency lists) arcs.  "id"
+defaults to the line number.  Blank lines are skipped.
+
+Workers are handed the raw text lines, in chunks of chunksize lines per
+task, and parse and index them themselves, so no graph objects are
+pickled on the way in and only a short JSON string per graph on the way
+back.  At most BLOCK_TASKS chunks per worker are read ahead, so inputs
+of any length stream in bounded memory.
+
+Every output line holds
+    id : the graph's id
+    line : line number of the graph in the input, from 1
+    walk : list of vertex labels, null if there is none
+    error : reason the graph has no walk or could not be read, else null
+    edges : number of edges
+    seconds : time spent parsing and walking the graph
+Results come back in input order, or as they complete with unordered,
+which keeps workers busy when a few graphs are much larger than the rest.
+
+TO RUN:
+$ python batch.py zones.jsonl > walks.jsonl
+$ python batch.py zones.jsonl.gz 8 unordered   # 8 processes
+
+EXAMPLES:
+
+>>> from batch import solve_stream
+>>> lines = ['{"id": 1, "edges": [["A", "B"], ["B", "C"], ["C", "A"]]}',
+...          '{"id": 2, "adjacency": {"A": ["B"], "B": ["A", "C"], "C": ["B", "D"], "D": ["C"]}}',
+...          '{"id": 3, "edges": [["A", "B"], ["C", "D"]]}']
+>>> for result in solve_stream(lines, processes=1):
+...     print(result)
+{"id": 1, "line": 1, "walk": ["A", "B", "C", "A"], "error": null, "edges": 3}
+{"id": 2, "line": 2, "walk": ["A", "B", "C", "D"], "error": null, "edges": 3}
+{"id": 3, "line": 3, "walk": null, "error": "Euler walk is not possible: 4 vertices of odd degree: A B C D", "edges": 2}
+
+Empty and malformed graphs get an error on their own line, and the rest
+of the batch goes on:
+
+>>> lines = ['{"id": 1, "edges": []}', '{"edges": [["A"]]}', '[1, 2]', '{oops',
+...          '{"edges": 5}', '{"id": 6, "edges": [["A", "B"]]}']
+>>> for result in solve_stream(lines, processes=2, timed=False):
+...     print(result)
+{"id": 1, "line": 1, "walk": [], "error": null, "edges": 0}
+{"id": 2, "line": 2, "walk": null, "error": "edge [\\"A\\"] does not have two endpoints", "edges": null}
+{"id": 3, "line": 3, "walk": null, "error": "line is not a JSON object", "edges": null}
+{"id": 4, "line": 4, "walk": null, "error": "Expecting property name: line 1 column 2 (char 1)", "edges": null}
+{"id": 5, "line": 5, "walk": null, "error": "'int' object is not iterable", "edges": null}
+{"id": 6, "line": 6, "walk": ["A", "B"], "error": null, "edges": 1}
+"""
+
+from __future__ import print_function
+import itertools
+import json
+from collections import OrderedDict
+import multiprocessing
+import sys
+import time
+import numpy as np
+from edge_list import csr_graph, open_text
+from euler_walk import euler_walk
+
+#chunks read ahead per worker process
+BLOCK_TASKS = 16
+
+#output keys in order; seconds is left out when timing is off
+KEYS = ("id", "line", "walk", "error", "edges", "seconds")
+
+def parse_graph(graph):
+    """
+    returns csr_graph of a decoded input line
+    raises ValueError for a graph without edges or adjacency
+    """
+    directed = bool(graph.get("directed", False))
+    if "adjacency" in graph:
+        adjacency = graph["adjacency"]
+        if not isinstance(adjacency, dict):
+            raise ValueError("adjacency must map vertices to lists")
+        if not directed:
+            return euler_walk().index_graph(adjacency)
+        #every vertex listed, in its own order, then the arcs it starts
+        edges = [(v, w) for v in adjacency for w in adjacency[v]]
+        labels = list(adjacency)
+    elif "edges" in graph:
+        edges = graph["edges"]
+        labels = []
+    else:
+        raise ValueError("graph needs edges or adjacency")
+    index = dict((label, i) for i, label in enumerate(labels))
+    ends = []
+    for edge in edges:
+        if len(edge) != 2:
+            raise ValueError("edge %s does not have two endpoints" % json.dumps(edge))
+        for label in edge:
+            i = index.get(label)
+            if i is None:
+                i = index[label] = len(labels)
+                labels.append(label)
+            ends.append(i)
+    ends = np.array(ends, dtype=np.int64).reshape(-1, 2)
+    build = csr_graph.from_arcs if directed else csr_graph.from_edges
+    return build(ends[:, 0], ends[:, 1], labels, len(labels))
+
+def solve_line(task):
+    """
+    returns JSON output line of the task (line number, text line, timed)
+    """
+    number, text, timed = task
+    begin = time.time()
+    result = {"id": number, "line": number, "walk": None, "error": None, "edges": None}
+    try:
+        #ordered so vertices keep the order they are listed in
+        graph = json.loads(text, object_pairs_hook=OrderedDict)
+        if not isinstance(graph, dict):
+            raise ValueError("line is not a JSON object")
+        result["id"] = graph.get("id", number)
+        G = parse_graph(graph)
+        result["edges"] = G.num_edges
+        result["walk"] = euler_walk().walk_csr(G)
+    except (ValueError, TypeError, KeyError) as error:
+        result["error"] = str(error)
+    except Exception as error:
+        #any other failure stays with its line rather than ending the batch
+        result["error"] = "%s: %s" % (type(error).__name__, error)
+    if timed:
+        result["seconds"] = round(time.time() - begin, 6)
+    return "{%s}" % ", ".join("%s: %s" % (json.dumps(key), json.dumps(result[key]))
+                              for key in KEYS if key in result)
+
+def solve_stream(lines, processes = None, chunksize = 64, ordered = True, timed = None):
+    """
+    returns generator of JSON output lines for an iterable of JSON input
+    lines, solved by a pool of processes (all cores by default; 1 solves
+    in this process), in input order unless ordered is False; timed, on
+    by default except for processes=1, adds seconds to each result
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if timed is None:
+        timed = processes != 1
+    tasks = ((number, text, timed) for number, text in enumerate(lines, 1) if text.strip())
+    if processes == 1:
+        for task in tasks:
+            yield solve_line(task)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        dispatch = pool.imap if ordered else pool.imap_unordered
+        #imap reads its whole input up front, so it is given a block at a time
+        block = chunksize * processes * BLOCK_TASKS
+        while True:
+            tasks_block = list(itertools.islice(tasks, block))
+            if not tasks_block:
+                break
+            for result in dispatch(solve_line, tasks_block, chunksize):
+                yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def main(source, processes = None, ordered = True):
+    f = open_text(source)
+    try:
+        for result in solve_stream(f, processes, ordered=ordered):
+            sys.stdout.write(result + "\n")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python batch.py FILE [PROCESSES] [unordered]", file=sys.stderr)
+        sys.exit(2)
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else None
+    main(sys.argv[1], processes, "unordered" not in sys.argv[2:])
@@ -0,0 +1,297 @@
+"""
+EDGE LISTS AND CSR GRAPHS
+Loads multigraphs from edge lists without per-edge Python objects and
+stores them in compressed sparse row form for euler_walk.
+
+Text edge lists hold one edge per line, two vertex labels separated by
+whitespace; blank lines and lines starting with '#' are skipped, and
+further columns are ignored.  Weighted edge lists (read_weighted_edges)
+add a weight as third column, default 1, and optionally a fourth column
+1 marking an arc u -> v or 0 an undirected edge, for directed and mixed
+graphs.  Files ending in .gz (or starting with the
+gzip magic bytes) are decompressed on the fly, and '-' reads stdin.
+Labels are interned to ints 0...n-1 in order of first appearance, and
+endpoints are streamed into array('l') buffers.
+
+The binary format is a NumPy .npy file of shape (E, 2) holding integer
+endpoints 0...n-1; it is memory-mapped, so loading costs no copy of the
+edge list.
+
+In the CSR form the slots of vertex i are offsets[i]...offsets[i+1]-1;
+slot s leads to targets[s] along edge edge_ids[s].  Every edge fills one
+slot at each endpoint (a loop fills two at its vertex), as in the
+adjacency lists of euler_walk.  A directed csr_graph (from_arcs) only
+fills the slot at the tail of each arc.
+
+EXAMPLES:
+
+>>> import numpy as np
+>>> from edge_list import csr_graph
+>>> G = csr_graph.from_edges(np.array([0, 1, 2]), np.array([1, 2, 0]), ["A", "B", "C"])
+>>> G.degrees().tolist(), G.odd_vertices().tolist(), G.is_connected()
+([2, 2, 2], [], True)
+>>> G.targets[G.offsets[0]:G.offsets[1]].tolist()
+[1, 2]
+"""
+
+from __future__ import print_function
+import gzip
+import sys
+from array import array
+import numpy as np
+
+class csr_graph(object):
+    def __init__(self, offsets, targets, edge_ids, num_edges, labels = None,
+                 weights = None, directed = False):
+        """
+        offsets : np.ndarray
+            (n+1,) slot ranges per vertex
+        targets, edge_ids : np.ndarray
+            (2E,) neighbour and edge id of each slot, (E,) if directed
+        labels : lst
+            vertex labels, defaults to 0...n-1
+        weights : np.ndarray
+            (E,) edge weights, None when unweighted
+        directed : bool
+            slots are out-arcs only
+        """
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_ids = edge_ids
+        self.num_edges = num_edges
+        self.num_vertices = len(offsets) - 1
+        self.labels = labels if labels is not None else range(self.num_vertices)
+        self.weights = weights
+        self.directed = directed
+
+    @staticmethod
+    def check_endpoints(u, v, labels, num_vertices):
+        """
+        returns (u, v, num_vertices) with endpoints as int64 arrays
+        raises ValueError for endpoints outside 0...num_vertices-1
+        """
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        if len(u) != len(v):
+            raise ValueError("Edge endpoint arrays differ in length")
+        if num_vertices is None:
+            num_vertices = len(labels) if labels is not None else (int(max(u.max(), v.max())) + 1 if len(u) else 0)
+        if len(u) and (min(u.min(), v.min()) < 0 or max(u.max(), v.max()) >= num_vertices):
+            raise ValueError("Edge endpoints must lie in 0...%d" % (num_vertices - 1))
+        return u, v, num_vertices
+
+    @staticmethod
+    def slot_order(sources, num_vertices):
+        """
+        returns (offsets, order): slots sorted by source vertex, stable
+        """
+        N = len(sources)
+        if num_vertices * N < 2 ** 62:
+            #sorting unique keys source * N + slot keeps slots in input order and
+            #runs several times faster than a stable argsort
+            keys = sources * N + np.arange(N)
+            keys.sort()
+            order = keys % N if N else keys
+        else:
+            order = np.argsort(sources, kind="mergesort")
+        offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_vertices), out=offsets[1:])
+        return offsets, order
+
+    @classmethod
+    def from_edges(cls, u, v, labels = None, num_vertices = None, weights = None):
+        """
+        returns csr_graph of edges u[e]-v[e]; a vertex lists the edges it
+        starts, then those it ends, each in edge order
+        """
+        u, v, num_vertices = cls.check_endpoints(u, v, labels, num_vertices)
+        E = len(u)
+        offsets, order = cls.slot_order(np.concatenate([u, v]), num_vertices)
+        targets = np.concatenate([v, u])[order]
+        edge_ids = (order % E) if E else order
+        return cls(offsets, targets, edge_ids, E, labels, weights)
+
+    @classmethod
+    def from_arcs(cls, u, v, labels = None, num_vertices = None, weights = None):
+        """
+        returns directed csr_graph of arcs u[e] -> v[e], in arc order
+        """
+        u, v, num_vertices = cls.check_endpoints(u, v, labels, num_vertices)
+        offsets, order = cls.slot_order(u, num_vertices)
+        return cls(offsets, v[order], order, len(u), labels, weights, directed = True)
+
+    def edges(self):
+        """
+        returns (u, v) endpoint arrays indexed by edge id
+        """
+        sources = np.repeat(np.arange(self.num_vertices), self.degrees())
+        u = np.empty(self.num_edges, dtype=np.int64)
+        v = np.empty(self.num_edges, dtype=np.int64)
+        if self.directed:
+            u[self.edge_ids] = sources
+            v[self.edge_ids] = self.targets
+        else:
+            #an edge's first slot is at u, second at v (both at a loop vertex)
+            first = np.ones(len(self.edge_ids), dtype=bool)
+            order = np.argsort(self.edge_ids, kind="mergesort")
+            first[order[1::2]] = False
+            u[self.edge_ids[first]] = sources[first]
+            v[self.edge_ids[first]] = self.targets[first]
+        return u, v
+
+    def in_degrees(self):
+        """
+        returns in-degree of every vertex of a directed graph
+        """
+        return np.bincount(self.targets, minlength=self.num_vertices)
+
+    def degrees(self):
+        """
+        returns degree of every vertex, loops counted twice; out-degree if
+        directed
+        """
+        return np.diff(self.offsets)
+
+    def odd_vertices(self):
+        """
+        returns vertices of odd degree
+        """
+        return np.nonzero(self.degrees() % 2)[0]
+
+    def reachable(self, start):
+        """
+        returns bool mask of vertices reachable from start, by breadth first
+        search one whole frontier at a time
+        """
+        visited = np.zeros(self.num_vertices, dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        while len(frontier):
+            starts = self.offsets[frontier]
+            counts = self.offsets[frontier + 1] - starts
+            total = counts.sum()
+            if not total:
+                break
+            #slot indices of all frontier vertices, concatenated
+            shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            neighbours = self.targets[np.arange(total) + shift]
+            frontier = np.unique(neighbours[~visited[neighbours]])
+            visited[frontier] = True
+        return visited
+
+    def is_connected(self):
+        """
+        returns True if all edges lie in one connected component
+        """
+        degrees = self.degrees()
+        active = np.nonzero(degrees)[0]
+        if not len(active):
+            return True
+        return bool(self.reachable(active[0])[active].all())
+
+    def rows(self):
+        """
+        returns (offsets, targets, edge_ids) as array('l'), which index to
+        plain ints far faster than NumPy arrays inside a Python loop
+        """
+        return tuple(array('l', np.asarray(a, dtype=np.int64).astype(np.dtype('l')).tostring())
+                     for a in (self.offsets, self.targets, self.edge_ids))
+
+def open_text(source):
+    """
+    returns file object of source: '-' for stdin, gzip when compressed
+    """
+    if source == "-":
+        return sys.stdin
+    if hasattr(source, "read"):
+        return source
+    with open(source, "rb") as f:
+        magic = f.read(2)
+    if source.endswith(".gz") or magic == b"\x1f\x8b":
+        return gzip.open(source, "rb")
+    return open(source, "rb")
+
+def scan_edges(source, weighted = False, directed = False):
+    """
+    returns (ends, weights, arcs, labels) of a text edge list: interned
+    endpoints in an array('l'), and if weighted the weights in an array('d')
+    and the direction flags (default directed) in a bytearray
+    raises ValueError for a line with fewer than two labels, or a malformed
+    weight or direction
+    """
+    index = {}
+    labels = []
+    ends = array('l')
+    weights = array('d')
+    arcs = bytearray()
+    f = open_text(source)
+    try:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            if len(fields) < 2:
+                raise ValueError("Line %d: expected two vertex labels" % number)
+            for label in fields[:2]:
+                i = index.get(label)
+                if i is None:
+                    i = index[label] = len(labels)
+                    labels.append(label)
+                ends.append(i)
+            if weighted:
+                try:
+                    weights.append(float(fields[2]) if len(fields) > 2 else 1.0)
+                except ValueError:
+                    raise ValueError("Line %d: weight %r is not a number" % (number, fields[2]))
+                if len(fields) > 3 and fields[3] not in ("0", "1"):
+                    raise ValueError("Line %d: direction must be 0 or 1, not %r" % (number, fields[3]))
+                arcs.append(fields[3] == "1" if len(fields) > 3 else directed)
+    finally:
+        if f is not sys.stdin and f is not source:
+            f.close()
+    return ends, weights, arcs, labels
+
+def read_edges(source):
+    """
+    returns (u, v, labels) of a text edge list, endpoints as int64 arrays
+    raises ValueError for a line with fewer than two labels
+    """
+    ends, _, _, labels = scan_edges(source)
+    pairs = np.frombuffer(ends, dtype=np.dtype('l')).astype(np.int64).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1], labels
+
+def read_weighted_edges(source, directed = False):
+    """
+    returns (u, v, weights, arcs, labels) of a weighted text edge list;
+    arcs[e] is True for an arc u -> v, directed is the default for lines
+    without a fourth column
+    """
+    ends, weights, arcs, labels = scan_edges(source, True, directed)
+    pairs = np.frombuffer(ends, dtype=np.dtype('l')).astype(np.int64).reshape(-1, 2)
+    return (pairs[:, 0], pairs[:, 1], np.frombuffer(weights, dtype=np.float64).copy(),
+            np.frombuffer(arcs, dtype=np.uint8).astype(bool), labels)
+
+def save_binary(path, u, v):
+    """
+    writes endpoints as an (E, 2) .npy file for load_binary
+    """
+    np.save(path, np.column_stack([np.asarray(u, dtype=np.int64), np.asarray(v, dtype=np.int64)]))
+
+def load_binary(path):
+    """
+    returns (u, v) views of a memory-mapped (E, 2) .npy edge list
+    """
+    pairs = np.load(path, mmap_mode="r")
+    if pairs.ndim != 2 or pairs.shape[1] != 2:
+        raise ValueError("Binary edge list must have shape (E, 2)")
+    return pairs[:, 0], pairs[:, 1]
+
+def load_graph(source):
+    """
+    returns csr_graph of a text (optionally gzipped) or .npy edge list
+    """
+    if isinstance(source, str) and source.endswith(".npy"):
+        u, v = load_binary(source)
+        return csr_graph.from_edges(u, v)
+    u, v, labels = read_edges(source)
+    return csr_graph.from_edges(u, v, labels)
@@ -5,6 +5,10 @@ Works for multigraphs as well.
 In order to make work for multigraphs, I used lists instead of sets to
 construct an adjacency table that could have multiple bridges between
 two vertices.  
+The walk is found with Hierholzer's algorithm over integer vertex and
+edge ids, each edge flagged once used, so it takes O(V+E) time.
+Given a file, e.g. python euler_walk.py edges.txt.gz, the graph is read
+as an edge list instead (see edge_list.py for the formats).
 
 EXAMPLES:
 
@@ -34,17 +38,13 @@ EXAMPLES:
 >>> A -> B -> C -> A -> D -> C
 """
 
-from collections import Counter
+import sys
+import numpy as np
+from edge_list import csr_graph, load_graph
+from feasibility import feasibility
 
 class euler_walk(object):
     
-    #creates deepcopy of original dic: set() structure
-    def deepcopy(self, dic):
-        copy = dict().fromkeys(dic)
-        for k, v in dic.iteritems():
-            copy[k] = v[:]
-        return copy
-    
     #constructs graph given command line user inputs
     def define_graph(self):
         vertices = [s for s in raw_input("Enter all vertices as chars sep by ' ': ").strip().split()]
@@ -60,64 +60,126 @@ class euler_walk(object):
             raise ValueError("Euler walk is not possible")
         return odd_v
     
-    #depth first search to validate connectedness of graph
-    def dfs(self, graph, start):
-        visited = []
+    #numbers vertices and edges of the adjacency lists, pairing the k-th v in the
+    #list of u with the k-th u in the list of v (a loop is listed twice at its vertex);
+    #returns the graph in compressed rows (edge_list.csr_graph): the neighbours of
+    #vertex i are targets[offsets[i]:offsets[i+1]], reached along edges edge_ids[...]
+    def index_graph(self, graph):
+        vertices = list(graph)
+        n = len(vertices)
+        index = {v: i for i, v in enumerate(vertices)}
+        #pending[u * n + w]: last edge u-w created at u and not yet met at w, with
+        #earlier ones chained through below, so no per-edge containers are built
+        pending = {}
+        below = []
+        offsets, targets, edge_ids = [0], [], []
+        for u, v_label in enumerate(vertices):
+            for w_label in graph[v_label]:
+                w = index.get(w_label)
+                if w is None:
+                    raise ValueError("Unknown vertex %s adjacent to %s" % (w_label, v_label))
+                key = u * n + w if u <= w else w * n + u
+                e = pending.get(key)
+                if u > w or (u == w and e is not None):
+                    if e is None:
+                        raise ValueError("%s is adjacent to %s but not conversely" % (v_label, w_label))
+                    if below[e] < 0:
+                        del pending[key]
+                    else:
+                        pending[key] = below[e]
+                else:
+                    below.append(-1 if e is None else e)
+                    e = len(below) - 1
+                    pending[key] = e
+                targets.append(w)
+                edge_ids.append(e)
+            offsets.append(len(targets))
+        if pending:
+            raise ValueError("Adjacency lists are not symmetric")
+        return csr_graph(np.array(offsets, dtype=np.int64), np.array(targets, dtype=np.int64),
+                         np.array(edge_ids, dtype=np.int64), len(below), vertices)
+    
+    #hierholzer algo for euler walk in O(V+E): follow unused edges from the top of the
+    #stack, and once a vertex has none left pop it onto the walk; each vertex keeps a
+    #pointer to its next unchecked slot so every slot is looked at once
+    def hierholzer(self, offsets, targets, edge_ids, num_edges, start):
+        used = bytearray(num_edges)
+        pointer = list(offsets[:-1])
         stack = [start]
+        walk = []
         while stack:
-            vertex = stack.pop()
-            if vertex not in visited:
-                visited.append(vertex)
-                common =  list((Counter(graph[vertex]) & Counter(visited)).elements())
-                lst = graph[vertex]
-                for e in common:
-                    lst.remove(e)
-                stack.extend(lst)
-        return visited
+            v = stack[-1]
+            i, end = pointer[v], offsets[v + 1]
+            while i < end and used[edge_ids[i]]:
+                i += 1
+            if i == end:
+                pointer[v] = i
+                walk.append(stack.pop())
+            else:
+                used[edge_ids[i]] = 1
+                pointer[v] = i + 1
+                stack.append(targets[i])
+        walk.reverse()
+        return walk
     
-    #modifies graph by removing vertices with no connecting bridges
-    def mod_graph(self, graph, visited, v, start):
-        graph[start].remove(v)
-        graph[v].remove(start)
-        graph = {k: v for k, v in graph.items() if v}
-        visited.append(v)
-        return visited, graph
-
-    #fleury algo for euler walk
-    def fleury(self, graph, start):
-        visited = [start]
-        while graph:
-            adjacent = graph[start]
-            for v in adjacent:
-                new_graph = self.deepcopy(graph)
-                new_graph[start].remove(v)
-                new_graph[v].remove(start)
-                l = sum(1 for k in new_graph if new_graph[k])
-                if l == 0:
-                    visited, graph = self.mod_graph(graph, visited, v, start)
-                    break
-                else:
-                    if len(self.dfs(new_graph, v)) == l:
-                        visited, graph = self.mod_graph(graph, visited, v, start)
-                        start = v
-                        break
-        return visited
+    #euler walk from start over vertex labels, raises ValueError if some edge is
+    #unreachable from start, i.e. the edges do not form one connected component
+    def find_walk(self, graph, start):
+        G = self.index_graph(graph)
+        return self.walk_csr(G, G.labels.index(start))
+    
+    #euler walk of a csr_graph, starting at an odd vertex if there are two and at the
+    #first vertex with edges otherwise (or at start); the feasibility report rejects odd
+    #parity and disconnected graphs in one union-find pass before walking. A directed
+    #graph walks its out-arcs only, from the vertex with a spare out-arc if any. A graph
+    #without edges (or without vertices, as from an empty file) has the empty walk []
+    def walk_csr(self, G, start = None):
+        if G.num_vertices == 0 or G.num_edges == 0:
+            return []
+        report = feasibility(G)
+        if not report["feasible"]:
+            raise ValueError("Euler walk is not possible: " + report["reason"])
+        if start is None:
+            if G.directed:
+                #the vertex with one more out-arc than in-arcs, if any
+                odd_v = np.nonzero(G.degrees() - G.in_degrees() == 1)[0]
+            else:
+                odd_v = G.odd_vertices()
+            active = np.nonzero(G.degrees())[0]
+            start = int(odd_v[0]) if len(odd_v) else (int(active[0]) if len(active) else 0)
+        offsets, targets, edge_ids = G.rows()
+        walk = self.hierholzer(offsets, targets, edge_ids, G.num_edges, start)
+        if len(walk) != G.num_edges + 1:
+            raise ValueError("Euler walk is not possible: graph is not connected")
+        return [G.labels[i] for i in walk]
+    
+    #walks an edge list file (text, gzip or .npy, '-' for stdin) given on the command line
+    def main_file(self, source):
+        walk = self.walk_csr(load_graph(source))
+        print "One possible Euler-Walk:"
+        print " -> ".join(map(str, walk))
+        return ""
     
     def main(self):
         graph = self.define_graph()
         odd_v = self.validate_euler(graph)
         if len(odd_v) == 0:
-            start, end = graph.keys()[0], graph.keys()[0]
+            #an isolated vertex cannot start a walk over the edges
+            start = next((v for v in graph if graph[v]), graph.keys()[0])
+            end = start
         else:
             start, end = odd_v
-        walk = self.fleury(graph, start)
+        walk = self.find_walk(graph, start)
         assert(start == walk[0] and end == walk[-1])
         print "One possible Euler-Walk:"
         print " -> ".join(map(str, walk))
         return ""
 
 if __name__ == "__main__":
-    euler_walk().main()
+    if len(sys.argv) > 1:
+        euler_walk().main_file(sys.argv[1])
+    else:
+        euler_walk().main()
 
 
 
@@ -0,0 +1,173 @@
+"""
+EULER WALK FEASIBILITY
+Decides whether a csr_graph has an Euler walk before any walk is tried,
+in one pass over the edges.
+
+A walk over every edge exists exactly when 0 or 2 vertices have odd
+degree and all vertices with edges lie in one connected component.
+Components come from a union-find (disjoint set forest) with path
+compression and union by rank, so the check costs O(E a(V)) time and
+O(V) memory on top of the graph.
+
+feasibility returns a report, a dict with keys
+    feasible : bool
+    reason : str explaining why not, None if feasible
+    odd_vertices : labels of odd degree
+    components : number of components among vertices with edges
+    membership : (n,) component of every vertex numbered from 0, -1 for
+                 vertices without edges
+    start, end : labels where a walk starts and ends, None if infeasible
+
+For a directed graph the degrees must balance instead, and arcs must lie
+in one weak component (see directed_feasibility).
+
+EXAMPLES:
+
+>>> import numpy as np
+>>> from edge_list import csr_graph
+>>> from feasibility import feasibility
+>>> G = csr_graph.from_edges(np.array([0, 1, 3]), np.array([1, 2, 4]), list("ABCDE"))
+>>> report = feasibility(G)
+>>> report["feasible"], report["components"], report["membership"].tolist()
+(False, 2, [0, 0, 0, 1, 1])
+>>> report["reason"]
+'4 vertices of odd degree: A C D E'
+"""
+
+from __future__ import print_function
+from array import array
+import numpy as np
+
+#edges handed to the union loop at a time, bounding the Python ints alive
+CHUNK = 1 << 20
+
+class union_find(object):
+    def __init__(self, n):
+        """
+        parent : array
+            parent of each element, roots are their own parent
+        rank : bytearray
+            upper bound on the height of the tree below each root
+        """
+        self.parent = array('l', xrange(n))
+        self.rank = bytearray(n)
+        self.count = n
+
+    def find(self, x):
+        """
+        returns root of x, pointing every element on the path at it
+        """
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        """
+        merges the sets of x and y, the lower rank tree under the higher
+        returns True if they were different sets
+        """
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        rank = self.rank
+        if rank[x] < rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        if rank[x] == rank[y]:
+            rank[x] += 1
+        self.count -= 1
+        return True
+
+    def roots(self):
+        """
+        returns (n,) array of the root of every element
+        """
+        return np.array([self.find(x) for x in xrange(len(self.parent))], dtype=np.int64)
+
+def components(G):
+    """
+    returns (count, membership) of the components among vertices with
+    edges (weak components if G is directed), numbered by first vertex
+    """
+    n = G.num_vertices
+    degrees = G.degrees()
+    sets = union_find(n)
+    sources = np.repeat(np.arange(n), degrees)
+    #an undirected edge appears at both endpoints, union it once
+    once = np.nonzero(sources != G.targets if G.directed else sources < G.targets)[0]
+    for chunk in xrange(0, len(once), CHUNK):
+        slots = once[chunk:chunk + CHUNK]
+        for x, y in zip(sources[slots].tolist(), G.targets[slots].tolist()):
+            sets.union(x, y)
+    active = degrees > 0
+    if G.directed:
+        active |= G.in_degrees() > 0
+    membership = np.full(n, -1, dtype=np.int64)
+    roots = sets.roots()[active]
+    unique, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    renumber = np.argsort(np.argsort(first))
+    membership[active] = renumber[inverse]
+    return len(unique), membership
+
+def feasibility(G):
+    """
+    returns feasibility report of an Euler walk over csr_graph G
+    """
+    if G.directed:
+        return directed_feasibility(G)
+    n = G.num_vertices
+    odd = G.odd_vertices()
+    count, membership = components(G)
+    report = {"odd_vertices": [G.labels[i] for i in odd], "components": count,
+              "membership": membership, "feasible": False, "reason": None,
+              "start": None, "end": None}
+    if len(odd) not in (0, 2):
+        report["reason"] = "%d vertices of odd degree: %s" % (
+            len(odd), " ".join(map(str, report["odd_vertices"])))
+    elif count > 1:
+        report["reason"] = "edges form %d connected components" % count
+    else:
+        report["feasible"] = True
+        if len(odd):
+            report["start"], report["end"] = report["odd_vertices"]
+        else:
+            start = np.nonzero(membership >= 0)[0]
+            start = G.labels[start[0]] if len(start) else (G.labels[0] if n else None)
+            report["start"] = report["end"] = start
+    return report
+
+def directed_feasibility(G):
+    """
+    returns feasibility report of a directed Euler walk over csr_graph G:
+    every vertex balanced (out-degree = in-degree), or one with one more
+    out-arc (the start) and one with one more in-arc (the end), and all arcs
+    in one weak component; "unbalanced" replaces "odd_vertices" and holds
+    (key, value) of label : out-degree - in-degree
+    """
+    n = G.num_vertices
+    balance = G.degrees() - G.in_degrees()
+    unbalanced = np.nonzero(balance)[0]
+    count, membership = components(G)
+    report = {"unbalanced": dict((G.labels[i], int(balance[i])) for i in unbalanced),
+              "components": count, "membership": membership, "feasible": False,
+              "reason": None, "start": None, "end": None}
+    heads = np.nonzero(balance == 1)[0]
+    tails = np.nonzero(balance == -1)[0]
+    if not (len(unbalanced) == 0 or (len(unbalanced) == 2 and len(heads) == 1 and len(tails) == 1)):
+        report["reason"] = "%d unbalanced vertices: %s" % (len(unbalanced), " ".join(
+            "%s(%+d)" % (G.labels[i], balance[i]) for i in unbalanced))
+    elif count > 1:
+        report["reason"] = "arcs form %d weakly connected components" % count
+    else:
+        report["feasible"] = True
+        if len(unbalanced):
+            report["start"], report["end"] = G.labels[heads[0]], G.labels[tails[0]]
+        else:
+            start = np.nonzero(membership >= 0)[0]
+            start = G.labels[start[0]] if len(start) else (G.labels[0] if n else None)
+            report["start"] = report["end"] = start
+    return report
@@ -0,0 +1,106 @@
+"""
+POLY RING BENCHMARK
+
+Times poly_ring.mult with each method on random polynomials of growing
+size, and multipoint evaluation with Horner against the remainder tree,
+then reports the crossover sizes used for KARATSUBA_CUTOFF, NTT_CUTOFF
+and MULTIPOINT_CUTOFF in poly_ring.py.  Evaluation always runs to twice
+MULTIPOINT_CUTOFF points so that it crosses over (a couple of minutes);
+Horner, linear in the points, is timed on HORNER_SAMPLE of them and scaled.
+
+TO RUN:
+$ python bench_poly_ring.py               # p = 998244353 = 119 * 2^23 + 1
+$ python bench_poly_ring.py 65537 4096    # prime, largest size
+"""
+from __future__ import print_function
+import random
+import sys
+import time
+from poly_ring import poly_ring, MULTIPOINT_CUTOFF
+
+#points Horner's rule is timed on
+HORNER_SAMPLE = 128
+
+def best_time(f, repeat = 3):
+    """
+    returns fastest wall time of repeat calls of f
+    """
+    best = None
+    for _ in xrange(repeat):
+        start = time.time()
+        f()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def crossover(sizes, slow, fast):
+    """
+    returns first size from which fast stays faster than slow
+    """
+    for i, n in enumerate(sizes):
+        pairs = [(slow[m], fast[m]) for m in sizes[i:] if m in slow and m in fast]
+        if pairs and all(f < s for s, f in pairs):
+            return n
+    return None
+
+def bench_mult(R, sizes):
+    """
+    returns (key, value) of method : (key, value) of size : seconds
+    """
+    times = dict((m, {}) for m in ["schoolbook", "karatsuba", "ntt"])
+    print("%8s %12s %12s %12s" % ("size", "schoolbook", "karatsuba", "ntt"))
+    for n in sizes:
+        a = [random.randrange(R.p) for _ in xrange(n)]
+        b = [random.randrange(R.p) for _ in xrange(n)]
+        row = []
+        for method in ["schoolbook", "karatsuba", "ntt"]:
+            if method == "schoolbook" and n > 2048:
+                row.append("-")
+                continue
+            if method == "ntt" and not R.ntt_supported(2 * n - 1):
+                row.append("-")
+                continue
+            t = best_time(lambda: R.mult(a, b, method))
+            times[method][n] = t
+            row.append("%.6f" % t)
+        print("%8d %12s %12s %12s" % tuple([n] + row))
+    return times
+
+def bench_eval(R, sizes):
+    """
+    returns (horner, tree) of (key, value) of size : seconds, Horner's
+    scaled from HORNER_SAMPLE points
+    """
+    horner, tree = {}, {}
+    print("%8s %12s %12s" % ("points", "horner", "tree"))
+    for n in sizes:
+        f = [random.randrange(R.p) for _ in xrange(n)]
+        xs = [random.randrange(R.p) for _ in xrange(n)]
+        sample = xs[:HORNER_SAMPLE]
+        horner[n] = best_time(lambda: [R.evaluate(f, x) for x in sample]) * n / len(sample)
+        tree[n] = best_time(lambda: R.remainder_tree(f, R.subproduct_tree(xs), xs), 1)
+        print("%8d %12.6f %12.6f" % (n, horner[n], tree[n]))
+    return horner, tree
+
+if __name__ == "__main__":
+    p = int(sys.argv[1]) if len(sys.argv) > 1 else 998244353
+    largest = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    random.seed(152)
+    R = poly_ring(p)
+    sizes = [2 ** k for k in xrange(3, largest.bit_length()) if 2 ** k <= largest]
+    sizes = sorted(set(sizes + [3 * s // 2 for s in sizes if 3 * s // 2 <= largest]))
+
+    print("MULTIPLICATION OVER Z_%d" % p)
+    times = bench_mult(R, sizes)
+    print()
+    print("karatsuba beats schoolbook from", crossover(sizes, times["schoolbook"], times["karatsuba"]))
+    print("ntt beats karatsuba from", crossover(sizes, times["karatsuba"], times["ntt"]))
+    print()
+
+    print("MULTIPOINT EVALUATION OVER Z_%d" % p)
+    top = max(largest, 2 * MULTIPOINT_CUTOFF)
+    eval_sizes = [2 ** k for k in xrange(6, top.bit_length()) if 2 ** k <= top]
+    eval_sizes = sorted(set(eval_sizes + [3 * s // 2 for s in eval_sizes if 3 * s // 2 <= top]))
+    horner, tree = bench_eval(R, eval_sizes)
+    print()
+    print("remainder tree beats horner from", crossover(eval_sizes, horner, tree))
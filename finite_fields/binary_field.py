@@ -0,0 +1,182 @@
+"""
+BINARY FINITE FIELDS GF(2^n)
+
+Elements of GF(2^n) packed into ints: bit i is the coefficient of x^i.
+
+* Sum is XOR
+* For n <= 16 products and inverses are exp/log table lookups
+* For larger n products are a 4-bit windowed carry-less multiply followed
+  by a byte-at-a-time reduction with a table precomputed per modulus,
+  and inverses use the binary extended Euclidean algorithm
+
+poly selects this backend automatically for every order 2^n, n > 1.
+
+TO RUN:
+>>> from binary_field import binary_field
+>>> F = binary_field(0b10011)    # 1 + x + x^4, GF(16)
+>>> F.mult(0b0110, 0b0011)       # (x + x^2)(1 + x)
+10
+>>> F.inverse(10)
+12
+"""
+from __future__ import print_function
+
+class binary_field(object):
+    def __init__(self, modulus, tables = None):
+        """
+        modulus : int
+            packed irreducible polynomial of degree n
+
+        tables : bool
+            use exp/log tables for mult and inverse; requires x to be
+            primitive modulo the irreducible polynomial; by default used
+            for n <= 16 whenever x is primitive
+
+        reduce_table : lst
+            reduce_table[t] = t x^n mod modulus for every byte t
+        """
+        self.modulus = modulus
+        self.n = modulus.bit_length() - 1
+        self.q = 1 << self.n
+        self.mask = self.q - 1
+        self.reduce_table = [self.slow_reduce(t << self.n) for t in xrange(256)]
+        self.exp, self.log = None, None
+        if tables:
+            self.make_tables()
+        elif tables is None and self.n <= 16:
+            try:
+                self.make_tables()
+            except ValueError:
+                pass
+
+    def slow_reduce(self, a):
+        """
+        returns a mod modulus one bit at a time
+        """
+        n = self.n
+        while a.bit_length() > n:
+            a ^= self.modulus << (a.bit_length() - 1 - n)
+        return a
+
+    def reduce(self, a):
+        """
+        returns a mod modulus, clearing 8 high bits per step
+        """
+        n, table = self.n, self.reduce_table
+        while a >> n:
+            s = max(0, a.bit_length() - n - 8)
+            t = a >> (n + s)
+            a = (a ^ (t << (n + s))) ^ (table[t] << s)
+        return a
+
+    def clmul(self, a, b):
+        """
+        returns carry-less product of a and b, 4 bits of b at a time
+        """
+        window = [0] * 16
+        for i in xrange(1, 16):
+            window[i] = window[i & (i - 1)] ^ (a << ((i & -i).bit_length() - 1))
+        result, shift = 0, 0
+        while b:
+            result ^= window[b & 15] << shift
+            b >>= 4
+            shift += 4
+        return result
+
+    def make_tables(self):
+        """
+        builds exp/log tables with x as generator, exp stored twice over
+        raises ValueError if x is not primitive
+        """
+        exp = [0] * (2 * self.q)
+        log = [0] * self.q
+        a = 1
+        for k in xrange(self.q - 1):
+            if a == 1 and k:
+                raise ValueError("x is not primitive modulo the irreducible polynomial")
+            exp[k] = a
+            log[a] = k
+            a = self.reduce(a << 1)
+        exp[self.q - 1:2 * (self.q - 1)] = exp[:self.q - 1]
+        self.exp, self.log = exp, log
+
+    def add(self, a, b):
+        """
+        returns sum of packed elements
+        """
+        return a ^ b
+
+    def mult(self, a, b):
+        """
+        returns product of packed elements
+        """
+        if not a or not b:
+            return 0
+        if self.exp is not None:
+            return self.exp[self.log[a] + self.log[b]]
+        return self.reduce(self.clmul(a, b))
+
+    def square(self, a):
+        """
+        returns a^2
+        """
+        return self.mult(a, a)
+
+    def inverse(self, a):
+        """
+        returns multiplicative inverse, binary extended Euclid on
+        (a, modulus) keeping g1 a = u and g2 a = v modulo the modulus
+        raises ZeroDivisionError for zero element
+        """
+        if not a:
+            raise ZeroDivisionError("zero element has no multiplicative inverse")
+        if self.exp is not None:
+            return self.exp[(self.q - 1) - self.log[a]]
+        u, v, g1, g2 = a, self.modulus, 1, 0
+        while u != 1:
+            j = u.bit_length() - v.bit_length()
+            if j < 0:
+                u, v, g1, g2 = v, u, g2, g1
+                j = -j
+            u ^= v << j
+            g1 ^= g2 << j
+            if not u:
+                raise ValueError("element not invertible, modulus is reducible")
+        return self.reduce(g1)
+
+    def div(self, a, b):
+        """
+        returns a / b
+        raises ZeroDivisionError if b is zero
+        """
+        return self.mult(a, self.inverse(b))
+
+    def power(self, a, e):
+        """
+        returns a^e by square and multiply
+        """
+        if e < 0:
+            a, e = self.inverse(a), -e
+        result = 1
+        while e:
+            if e & 1:
+                result = self.mult(result, a)
+            a = self.mult(a, a)
+            e >>= 1
+        return result
+
+    def pack(self, p):
+        """
+        returns packed element of polynomial in list structure, reduced
+        """
+        a = 0
+        for i, c in enumerate(p):
+            if int(c) % 2:
+                a |= 1 << i
+        return self.reduce(a)
+
+    def unpack(self, a):
+        """
+        returns list structure of packed element without trailing zeros
+        """
+        return [(a >> i) & 1 for i in xrange(a.bit_length())]
@@ -0,0 +1,214 @@
+"""
+FINITE FIELDS BATCH ARITHMETIC
+
+Vectorized arithmetic on NumPy arrays of finite field elements.
+
+* Elements are packed integers: the coefficient list [c0, c1, ..., c(n-1)]
+  of c0 + c1 x + ... + c(n-1) x^(n-1) is stored as
+  c0 + c1 p + ... + c(n-1) p^(n-1)
+* encode reduces coefficient lists of degree >= n through poly.simplified;
+  packed operands outside 0 ... q-1 raise ValueError
+* Products, inverses and quotients use the exp/log tables of
+  poly(tables = True), sums use digitwise addition modulo p
+  (plain XOR in characteristic 2)
+
+TO RUN:
+>>> import numpy as np
+>>> from field_array import field_array
+>>> F = field_array("49")
+>>> a = F.encode([[1, 3], [2, 5]])
+>>> b = F.encode([[2, 5], [1]])
+>>> F.decode(F.mult(a, b))
+[[6, 2], [2, 5]]
+>>> F.decode(F.div(a, b))
+[[3, 5], [2, 5]]
+"""
+from __future__ import print_function
+import numpy as np
+from finite_fields import poly
+
+class field_array(object):
+    def __init__(self, order = "4"):
+        """
+        order : str
+            specifies order of finite field
+
+        p, n, q : int
+            characteristic, extension degree and order of finite field
+
+        exp : np.array
+            exp[k] is packed element g^k for primitive element g, stored
+            twice over so that sums of two logs never need a modulo
+
+        log : np.array
+            log[a] is discrete log of packed element a, log[0] is unused
+        """
+        field = poly(order = order, tables = True)
+        self.field = field
+        self.order = order
+        self.irr_poly = field.irr_poly[order]
+        self.p = self.irr_poly[1]
+        self.n = self.irr_poly[2]
+        self.q = self.p ** self.n
+
+        exp_keys = field.zech[0]
+        exp = np.array([self.encode(list(key)) for key in exp_keys], dtype=np.int64)
+        self.exp = np.concatenate([exp, exp])
+        self.log = np.zeros(self.q, dtype=np.int64)
+        self.log[exp] = np.arange(self.q - 1, dtype=np.int64)
+
+    def encode(self, p):
+        """
+        returns packed integer of polynomial, or array of packed integers
+        for a list of polynomials or a 2-D array with one polynomial per row
+        polynomials of degree >= n are reduced by the irreducible polynomial
+        """
+        if isinstance(p, np.ndarray) and p.ndim == 2:
+            if p.shape[1] <= self.n:
+                places = self.p ** np.arange(p.shape[1], dtype=np.int64)
+                return (p.astype(np.int64) % self.p).dot(places)
+            return np.array([self.encode(i) for i in p.tolist()], dtype=np.int64)
+        if len(p) and isinstance(p[0], (list, tuple, np.ndarray)):
+            return np.array([self.encode(list(i)) for i in p], dtype=np.int64)
+        coefs = [int(c) % self.p for c in p]
+        if len(coefs) > self.n:
+            coefs = [int(c) % self.p for c in self.field.simplified(coefs)]
+        packed = 0
+        for c in reversed(coefs):
+            packed = packed * self.p + c
+        return packed
+
+    def check(self, *arrays):
+        """
+        returns operands as int64 arrays
+        raises ValueError if a packed element lies outside 0 ... q-1
+        """
+        checked = []
+        for a in arrays:
+            a = np.asarray(a, dtype=np.int64)
+            if a.size and (a.min() < 0 or a.max() >= self.q):
+                raise ValueError("packed elements of GF(%d) must lie in 0 ... %d" % (self.q, self.q - 1))
+            checked.append(a)
+        return checked if len(checked) > 1 else checked[0]
+
+    def decode(self, a):
+        """
+        returns list structure of packed element, or list of list
+        structures for an array of packed elements
+        """
+        if np.ndim(a):
+            return [self.decode(i) for i in np.asarray(a).tolist()]
+        p = []
+        a = int(a)
+        while a:
+            p.append(a % self.p)
+            a //= self.p
+        return p
+
+    def elements(self):
+        """
+        returns every packed element of finite field
+        """
+        return np.arange(self.q, dtype=np.int64)
+
+    def random(self, size, nonzero = False):
+        """
+        returns array of uniformly random packed elements
+        """
+        low = 1 if nonzero else 0
+        return np.random.randint(low, self.q, size=size).astype(np.int64)
+
+    def add(self, a, b):
+        """
+        returns elementwise sum by adding base-p digits modulo p
+        """
+        a, b = self.check(a, b)
+        if self.p == 2:
+            return a ^ b
+        if self.n == 1:
+            return (a + b) % self.p
+        result = np.zeros(np.broadcast(a, b).shape, dtype=np.int64)
+        place = 1
+        for _ in xrange(self.n):
+            result += ((a // place + b // place) % self.p) * place
+            place *= self.p
+        return result
+
+    def sum(self, a, axis = -1):
+        """
+        returns field sum of packed elements along axis
+        """
+        a = self.check(a)
+        if self.p == 2:
+            return np.bitwise_xor.reduce(a, axis=axis)
+        if self.n == 1:
+            return a.sum(axis=axis) % self.p
+        result = 0
+        place = 1
+        for _ in xrange(self.n):
+            result = result + ((a // place) % self.p).sum(axis=axis) % self.p * place
+            place *= self.p
+        return np.asarray(result, dtype=np.int64)
+
+    def neg(self, a):
+        """
+        returns elementwise additive inverse
+        """
+        a = self.check(a)
+        if self.p == 2:
+            return a.copy()
+        if self.n == 1:
+            return (-a) % self.p
+        result = np.zeros(a.shape, dtype=np.int64)
+        place = 1
+        for _ in xrange(self.n):
+            result += ((-(a // place)) % self.p) * place
+            place *= self.p
+        return result
+
+    def sub(self, a, b):
+        """
+        returns elementwise difference
+        """
+        return self.add(a, self.neg(b))
+
+    def mult(self, a, b):
+        """
+        returns elementwise product by adding discrete logs
+        """
+        a, b = self.check(a, b)
+        product = self.exp[self.log[a] + self.log[b]]
+        return np.where((a == 0) | (b == 0), 0, product)
+
+    def inverse(self, a):
+        """
+        returns elementwise multiplicative inverse
+        raises ZeroDivisionError if any element is zero
+        """
+        a = self.check(a)
+        if np.any(a == 0):
+            raise ZeroDivisionError("zero element has no multiplicative inverse")
+        return self.exp[(self.q - 1) - self.log[a]]
+
+    def div(self, a, b):
+        """
+        returns elementwise quotient a / b
+        raises ZeroDivisionError if any element of b is zero
+        """
+        a, b = self.check(a, b)
+        if np.any(b == 0):
+            raise ZeroDivisionError("division by zero element")
+        quotient = self.exp[self.log[a] + (self.q - 1) - self.log[b]]
+        return np.where(a == 0, 0, quotient)
+
+    def power(self, a, k):
+        """
+        returns elementwise a^k for integer exponent k
+        """
+        a = self.check(a)
+        if k < 0:
+            return self.power(self.inverse(a), -k)
+        powered = self.exp[(self.log[a] * k) % (self.q - 1)]
+        if k == 0:
+            return np.ones(a.shape, dtype=np.int64)
+        return np.where(a == 0, 0, powered)
@@ -0,0 +1,207 @@
+"""
+MATRICES OVER FINITE FIELDS
+
+Dense linear algebra over GF(q) on NumPy arrays of packed elements
+(see field_array for the packing).
+
+* Every method accepts one matrix of shape (m, n) or a stack of shape
+  (k, m, n); a stack is reduced in one pass, each matrix keeping its own
+  pivot row, so thousands of small matrices cost one vectorized loop over
+  columns rather than thousands of Python loops
+* rref, rank, det, inverse, nullspace, solve and dot
+* Arithmetic is field_array's, so prime and prime-power orders share code
+
+TO RUN:
+>>> import numpy as np
+>>> from field_matrix import field_matrix
+>>> M = field_matrix("5")
+>>> A = np.array([[1, 2], [3, 4]])
+>>> int(M.det(A))
+3
+>>> M.dot(A, M.inverse(A)).tolist()
+[[1, 0], [0, 1]]
+>>> M.rank(np.array([[1, 2], [2, 4]]))
+1
+"""
+from __future__ import print_function
+import numpy as np
+from field_array import field_array
+
+class field_matrix(object):
+    def __init__(self, order = "4"):
+        """
+        order : str
+            specifies order of finite field
+
+        F : field_array
+            elementwise arithmetic of the field
+        """
+        self.order = order
+        self.F = field_array(order)
+        self.q = self.F.q
+
+    def stack(self, A):
+        """
+        returns (k, m, n) int64 copy of A and whether A was a single matrix
+        """
+        A = self.F.check(A)
+        if A.ndim == 2:
+            return A[None].copy(), True
+        if A.ndim != 3:
+            raise ValueError("expected a matrix (m, n) or a stack (k, m, n)")
+        return A.copy(), False
+
+    def identity(self, n, k = None):
+        """
+        returns n x n identity, or a stack of k of them
+        """
+        I = np.eye(n, dtype=np.int64)
+        return I if k is None else np.repeat(I[None], k, axis=0)
+
+    def random(self, m, n, k = None):
+        """
+        returns uniformly random m x n matrix, or a stack of k of them
+        """
+        shape = (m, n) if k is None else (k, m, n)
+        return self.F.random(shape)
+
+    def dot(self, A, B):
+        """
+        returns matrix product A B, broadcasting over stacks; a vector B
+        is taken as a column and a vector is returned
+        """
+        F = self.F
+        A, B = F.check(A), F.check(B)
+        if B.ndim == 1:
+            return self.dot(A, B[:, None])[..., 0]
+        products = F.mult(A[..., :, :, None], B[..., None, :, :])
+        return F.sum(products, axis=-2)
+
+    def eliminate(self, A, reduced = True):
+        """
+        returns (E, pivots, rank, det) for a stack A of shape (k, m, n)
+            E : echelon form (reduced row echelon form if reduced)
+            pivots : (k, n) bool, True at pivot columns
+            rank : (k,) ranks
+            det : (k,) determinants of the leading square blocks, only
+                  meaningful for square matrices
+        """
+        F = self.F
+        E = A.copy()
+        k, m, n = E.shape
+        rows = np.arange(m)
+        r = np.zeros(k, dtype=np.int64)
+        det = np.ones(k, dtype=np.int64)
+        pivots = np.zeros((k, n), dtype=bool)
+        for c in xrange(n):
+            candidates = (E[:, :, c] != 0) & (rows[None, :] >= r[:, None])
+            found = np.nonzero(candidates.any(axis=1))[0]
+            if not len(found):
+                continue
+            rr = r[found]
+            piv = np.argmax(candidates[found], axis=1)
+            #swap pivot row into place, each swap negates the determinant
+            swap = piv != rr
+            top, bottom = E[found, rr].copy(), E[found, piv].copy()
+            E[found, rr], E[found, piv] = bottom, top
+            det[found[swap]] = F.neg(det[found[swap]])
+            #scale pivot row to a leading 1
+            lead = E[found, rr, c]
+            det[found] = F.mult(det[found], lead)
+            E[found, rr] = F.mult(E[found, rr], F.inverse(lead)[:, None])
+            #clear column c in the other rows (only below if not reduced)
+            factor = E[found, :, c].copy()
+            factor[np.arange(len(found)), rr] = 0
+            if not reduced:
+                factor[rows[None, :] < rr[:, None]] = 0
+            update = F.mult(factor[:, :, None], E[found, rr][:, None, :])
+            E[found] = F.sub(E[found], update)
+            pivots[found, c] = True
+            r[found] += 1
+        det[r < min(m, n)] = 0
+        return E, pivots, r, det
+
+    def rref(self, A):
+        """
+        returns reduced row echelon form of A
+        """
+        S, single = self.stack(A)
+        E = self.eliminate(S)[0]
+        return E[0] if single else E
+
+    def rank(self, A):
+        """
+        returns rank of A, an array of ranks for a stack
+        """
+        S, single = self.stack(A)
+        r = self.eliminate(S, reduced = False)[2]
+        return int(r[0]) if single else r
+
+    def det(self, A):
+        """
+        returns determinant of square A, an array of them for a stack
+        """
+        S, single = self.stack(A)
+        if S.shape[1] != S.shape[2]:
+            raise ValueError("determinant needs a square matrix")
+        d = self.eliminate(S, reduced = False)[3]
+        return d[0] if single else d
+
+    def inverse(self, A):
+        """
+        returns inverse of square A, or a stack of inverses
+        raises ZeroDivisionError if any matrix is singular
+        """
+        S, single = self.stack(A)
+        k, n, m = S.shape
+        if n != m:
+            raise ValueError("inverse needs a square matrix")
+        augmented = np.concatenate([S, self.identity(n, k)], axis=2)
+        E, _, r, _ = self.eliminate(augmented)
+        if np.any(r < n) or np.any(E[:, np.arange(n), np.arange(n)] != 1):
+            raise ZeroDivisionError("singular matrix has no inverse")
+        inv = E[:, :, n:]
+        return inv[0] if single else inv
+
+    def is_invertible(self, A):
+        """
+        returns True where A is invertible
+        """
+        S, single = self.stack(A)
+        d = self.eliminate(S, reduced = False)[3]
+        return bool(d[0]) if single else d != 0
+
+    def nullspace(self, A):
+        """
+        returns basis of {v : A v = 0} as rows of a (d, n) array, or a list
+        of such arrays for a stack
+        """
+        S, single = self.stack(A)
+        E, pivots, r, _ = self.eliminate(S)
+        n = S.shape[2]
+        bases = []
+        for E_i, piv_i, r_i in zip(E, pivots, r):
+            pivot_cols = np.nonzero(piv_i)[0]
+            free = np.nonzero(~piv_i)[0]
+            basis = np.zeros((len(free), n), dtype=np.int64)
+            for j, f in enumerate(free):
+                basis[j, f] = 1
+                #x_pivot = -E[row, f] for each pivot row
+                basis[j, pivot_cols] = self.F.neg(E_i[:r_i, f])
+            bases.append(basis)
+        return bases[0] if single else bases
+
+    def solve(self, A, b):
+        """
+        returns one solution x of A x = b, or None if inconsistent
+        """
+        A = self.F.check(A)
+        b = self.F.check(b)
+        m, n = A.shape
+        E, pivots, r, _ = self.eliminate(np.concatenate([A, b.reshape(m, 1)], axis=1)[None])
+        E, pivots, r = E[0], pivots[0], int(r[0])
+        if pivots[n]:
+            return None
+        x = np.zeros(n, dtype=np.int64)
+        x[np.nonzero(pivots[:n])[0]] = E[:r, n]
+        return x
@@ -2,9 +2,13 @@
 FINITE FIELDS ARITHMETIC
 By Vincent Nguyen
 
-* Support finite fields of orders:
-    4, 5, 7, 8, 9, 16, 25, 27, 32, 49
-* Irreducible polynomials stored in hash table
+* Support finite fields of every prime-power order
+* Irreducible polynomials stored in hash table, built once per process;
+  orders other than 4, 5, 7, 8, 9, 16, 25, 27, 32, 49 get a primitive
+  polynomial found by irreducible.irr_poly (optionally cached on disk)
+* Orders 2^n use the bit-packed binary_field backend automatically
+* Optional exp/log/Zech logarithm tables (tables = True) turn
+  multiplication, inversion and division into O(1) lookups
 
 * Future todos:
     Can choose irreducible polynomials
@@ -36,12 +40,41 @@ QUOTIENT: 1 + x
 from __future__ import print_function
 from itertools import product
 from collections import OrderedDict
+from irreducible import irr_poly as find_irr_poly, prime_factors, to_bits
+from binary_field import binary_field
+from reduction import poly_divmod, barrett
+
+#(irreducible polynomial, modulo, degree-1 of element)
+#other prime-power orders are added on first use
+_irr_poly = OrderedDict([('4',([1, 1, 1], 2, 2)),
+                         ('5',([5], 5, 1)),
+                         ('7', ([7], 7, 1)),
+                         ('8', ([1, 1, 0, 1], 2, 3)),
+                         ('9', ([1, 0, 1], 3, 2)),
+                         ('16', ([1, 1, 0, 0, 1], 2, 4)),
+                         ('25', ([3, 3, 1], 5, 2)),
+                         ('27', ([1, 0, 2, 1], 3, 3)),
+                         ('32', ([1, 0, 1, 0, 0, 1], 2, 5)),
+                         ('49', ([3, 2, 1], 7, 2))])
+
+#(key, value) of finite field order : all elements in finite field
+_tables = {}
+
+#(key, value) of finite field order : barrett reducer for simplified
+_reducers = {}
+
+#(key, value) of finite field order 2^n : bit-packed binary_field backend
+_binary_fields = {}
+
+#(key, value) of finite field order : (exp, log, zech) tables
+#built once per order and shared by every poly instance
+_zech_tables = {}
 
 class poly(object):
-    def __init__(self, order = "4", p1 = [], p2 = []):
+    def __init__(self, order = "4", p1 = [], p2 = [], tables = False, cache_file = None):
         """
         order : str
-            specifies order of finite field
+            specifies order of finite field, any prime power
             
         p1 : lst
             polynomial representation in list structure
@@ -56,25 +89,48 @@ class poly(object):
         table : dict
             (key, value) of translated elements for finite field order :
             respective list structure of element
+
+        tables : bool
+            if True, mult, add, find_mult_inverse and quotient are served
+            from exp/log/Zech logarithm tables built once per order
+
+        binary : binary_field
+            backend for orders 2^n, selected automatically; list inputs are
+            packed into ints and results unpacked back into lists
+
+        cache_file : str
+            optional JSON file caching irreducible polynomials of orders
+            that are not hard-coded
         """
-        self.order = order
+        self.order = order = str(order)
         self.p1 = p1
         self.p2 = p2
         
-        #(irreducible polynomial, modulo, degree-1 of element)
-        self.irr_poly = OrderedDict([('4',([1, 1, 1], 2, 2)),
-                         ('5',([5], 5, 1)),
-                         ('7', ([7], 7, 1)),
-                         ('8', ([1, 1, 0, 1], 2, 3)),
-                         ('9', ([1, 0, 1], 3, 2)),
-                         ('16', ([1, 1, 0, 0, 1], 2, 4)),
-                         ('25', ([3, 3, 1], 5, 2)),
-                         ('27', ([1, 0, 2, 1], 3, 3)),
-                         ('32', ([1, 0, 1, 0, 0, 1], 2, 5)),
-                         ('49', ([3, 2, 1], 7, 2))])
+        if order not in _irr_poly:
+            _irr_poly[order] = find_irr_poly(order, cache_file)
+        self.irr_poly = _irr_poly
+
+        #orders 2^n run on ints with XOR sums and carry-less products
+        self.binary = None
+        irr, p, n = _irr_poly[order]
+        if p == 2 and n > 1:
+            if order not in _binary_fields:
+                _binary_fields[order] = binary_field(to_bits(irr))
+            self.binary = _binary_fields[order]
     
-        self.table = self.make_table()
+        self.zech = None
+        if tables:
+            self.zech = self.make_zech_tables()
         
+    @property
+    def table(self):
+        """
+        returns all elements in finite field, enumerated once per order
+        """
+        if self.order not in _tables:
+            _tables[self.order] = self.make_table()
+        return _tables[self.order]
+
     def get_table(self):
         """
         returns get_table 
@@ -101,17 +157,24 @@ class poly(object):
         """
         returns simplified result
         """
-        #divide by irreducible polynomial
-        reduced = self.div(p, self.irr_poly[self.order][0])[1]
-        #apply modulo
-        modded = [i % self.irr_poly[self.order][1] for i in reduced]
-        return modded
+        irr, mod, n = self.irr_poly[self.order]
+        if n == 1:
+            return self.div(p, irr)[1]
+        #Barrett reduction by irreducible polynomial, mu precomputed per order
+        if self.order not in _reducers:
+            _reducers[self.order] = barrett(irr, mod)
+        return _reducers[self.order].reduce(p)
     
     def add(self, p1, p2):
         """
         returns sum of two polynomials
         Hackish fix for zero elements since they are empty due to self.degree popping
         """
+        if self.binary is not None:
+            b = self.binary
+            return b.unpack(b.add(b.pack(p1), b.pack(p2)))
+        if self.zech is not None:
+            return self.table_add(p1, p2)
         if len(p1) == 0:
             p1 = [0]
         if len(p2) == 0:
@@ -133,6 +196,11 @@ class poly(object):
         """
         if p2 is None:
             return None
+        if self.binary is not None:
+            b = self.binary
+            return b.unpack(b.mult(b.pack(p1), b.pack(p2)))
+        if self.zech is not None:
+            return self.table_mult(p1, p2)
         if len(p1) == 0:
             p1 = [0]
         if len(p2) == 0:
@@ -141,40 +209,20 @@ class poly(object):
         for i, j in enumerate(p1):
             for k, l in enumerate(p2):
                 product[i+k] += j*l
-        return map(int, self.simplified(product))
+        return self.simplified(product)
 
     def div(self, N, D):
         """
-        http://rosettacode.org/wiki/Polynomial_long_division#Python
+        returns (quotient, remainder) of N / D by exact long division over
+        Z_p using the inverse of the leading coefficient of D
+        for prime orders D is [p] and the remainder is just N mod p
         """
-        dD = self.degree(D)
-        dN = self.degree(N)
-        
-        #if just degree 0 on numerator than always return numerator
-        if dN == 0 and dD != 0:
-            return None, N
-        
-        #only for orders 5 and 7 since they consist of just natural numbers
-        if (dD and dN) == 0 or self.order == (5 or 7):
-            if len(D) == 0:
-                D = [0]
+        p = self.irr_poly[self.order][1]
+        if self.degree(list(D)) == 0:
             if len(N) == 0:
                 N = [0]
             return None, [N[0] % D[0]]
-        if dD < 0: raise ZeroDivisionError
-        if dN >= dD:
-            q = [0] * dN
-            while dN >= dD:
-                d = [0]*(dN - dD) + D
-                mult = q[dN - dD] = N[-1] / float(d[-1])
-                d = [coeff*mult for coeff in d]
-                N = [( coeffN - coeffd ) for coeffN, coeffd in zip(N, d)]
-                dN = self.degree(N)
-            r = N
-        else:
-            q = [0]
-            r = N
-        return q, r
+        return poly_divmod(N, D, p)
     
     def translate(self, p):
         """
@@ -223,6 +271,12 @@ class poly(object):
         """
         returns multiplicative inverse of polynomial or None for zero element
         """
+        if self.binary is not None:
+            b = self.binary
+            a = b.pack(p)
+            return b.unpack(b.inverse(a)) if a else None
+        if self.zech is not None:
+            return self.table_inverse(p)
         for i in self.table:
             prod = self.mult(p,i)
             while prod and prod[-1] == 0:
@@ -231,6 +285,151 @@ class poly(object):
                 return self.simplified(i)
                 break
         return None
+
+    def quotient(self, p1, p2):
+        """
+        returns p1 / p2 or None when p2 is the zero element
+        """
+        if self.binary is not None:
+            b = self.binary
+            a2 = b.pack(p2)
+            return b.unpack(b.div(b.pack(p1), a2)) if a2 else None
+        if self.zech is not None:
+            return self.table_quotient(p1, p2)
+        return self.mult(p1, self.find_mult_inverse(p2))
+
+    def element_key(self, p):
+        """
+        returns hashable tuple of polynomial without trailing zeros
+        """
+        key = [int(n) for n in p]
+        while key and key[-1] == 0:
+            key.pop()
+        return tuple(key)
+
+    def power(self, p, e):
+        """
+        returns p^e by square and multiply
+        """
+        result, base = [1], list(p)
+        while e:
+            if e & 1:
+                result = self.mult(result, list(base))
+            base = self.mult(base, list(base))
+            e >>= 1
+        return result
+
+    def primitive_element(self):
+        """
+        returns an element whose powers run through every nonzero element,
+        trying x first since searched irreducible polynomials are primitive
+        """
+        q = int(self.order)
+        if q == 2:
+            return [1]
+        divisors = [(q - 1) // r for r in prime_factors(q - 1)]
+        n = self.irr_poly[self.order][2]
+        def candidates():
+            yield [0, 1] if n > 1 else [2]
+            for i in self.table[1:]:
+                yield i
+        for i in candidates():
+            g = self.element_key(i)
+            if all(self.element_key(self.power(g, d)) != (1,) for d in divisors):
+                return list(g)
+        return None
+
+    def make_zech_tables(self):
+        """
+        returns (exp, log, zech) tables of finite field order
+            exp : lst
+                exp[n] is element key of g^n for primitive element g
+            log : dict
+                (key, value) of element key : n such that g^n = element
+            zech : lst
+                zech[n] is log(1 + g^n) or None when 1 + g^n = 0
+        """
+        if self.order in _zech_tables:
+            return _zech_tables[self.order]
+        q = int(self.order)
+        b = self.binary
+        if b is not None and b.exp is not None:
+            #binary backend already holds exp/log tables with x as generator
+            exp = [tuple(b.unpack(b.exp[k])) for k in xrange(q - 1)]
+            log = dict((key, n) for n, key in enumerate(exp))
+            zech = [b.log[b.exp[k] ^ 1] if b.exp[k] != 1 else None for k in xrange(q - 1)]
+            _zech_tables[self.order] = (exp, log, zech)
+            return _zech_tables[self.order]
+        g = self.primitive_element()
+        exp, power = [], [1]
+        for _ in xrange(q - 1):
+            exp.append(self.element_key(power))
+            power = self.mult(power, list(g))
+        log = dict((key, n) for n, key in enumerate(exp))
+        zech = []
+        for key in exp:
+            s = self.element_key(self.add([1], list(key)))
+            zech.append(log[s] if s else None)
+        _zech_tables[self.order] = (exp, log, zech)
+        return _zech_tables[self.order]
+
+    def element_log(self, p):
+        """
+        returns discrete log of polynomial or None for zero element
+        """
+        log = self.zech[1]
+        key = self.element_key(p)
+        if key and key not in log:
+            key = self.element_key(self.simplified(list(key)))
+        return log[key] if key else None
+
+    def table_add(self, p1, p2):
+        """
+        returns sum of two polynomials using Zech logarithms
+        g^a + g^b = g^a(1 + g^(b-a)) = g^(a + zech[b-a])
+        """
+        exp, zech = self.zech[0], self.zech[2]
+        a, b = self.element_log(p1), self.element_log(p2)
+        if a is None:
+            return [] if b is None else list(exp[b])
+        if b is None:
+            return list(exp[a])
+        z = zech[(b - a) % len(exp)]
+        if z is None:
+            return []
+        return list(exp[(a + z) % len(exp)])
+
+    def table_mult(self, p1, p2):
+        """
+        returns product of two polynomials by adding discrete logs
+        """
+        exp = self.zech[0]
+        a, b = self.element_log(p1), self.element_log(p2)
+        if a is None or b is None:
+            return []
+        return list(exp[(a + b) % len(exp)])
+
+    def table_inverse(self, p):
+        """
+        returns multiplicative inverse by negating discrete log
+        """
+        exp = self.zech[0]
+        a = self.element_log(p)
+        if a is None:
+            return None
+        return list(exp[-a % len(exp)])
+
+    def table_quotient(self, p1, p2):
+        """
+        returns quotient of two polynomials by subtracting discrete logs
+        """
+        exp = self.zech[0]
+        a, b = self.element_log(p1), self.element_log(p2)
+        if b is None:
+            return None
+        if a is None:
+            return []
+        return list(exp[(a - b) % len(exp)])
             
     def main(self):
         #simplifies representation of polynomial (only applicable for user input since dropdowns
@@ -242,7 +441,7 @@ class poly(object):
         product = self.mult(_p1, _p2)
         mult_inverse1 = self.find_mult_inverse(_p1)
         mult_inverse2 = self.find_mult_inverse(_p2)
-        quotient = self.mult(_p1, mult_inverse2)
+        quotient = self.quotient(_p1, _p2)
         
         print("======================================")
         print("ARITHMETIC IN FINITE FIELD OF ORDER %s" % self.order)
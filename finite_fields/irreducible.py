@@ -0,0 +1,426 @@
+"""
+IRREDUCIBLE POLYNOMIAL SEARCH
+
+Finds the modulus for GF(p^n) of any prime-power order.
+
+* Ben-Or's test: monic f of degree n is irreducible over Z_p iff
+  gcd(x^(p^i) - x, f) = 1 for i = 1 ... n/2, which rejects the usual
+  reducible candidate (one with a small factor) after a few steps
+* Over Z_2 polynomials are packed into ints so that arithmetic is
+  shift and XOR
+* Primitive moduli (x generates the multiplicative group) are preferred,
+  so the Zech tables of poly can use x as primitive element
+* Results are cached process-wide, and optionally in a JSON file given by
+  cache_file or the FINITE_FIELDS_CACHE environment variable; entries read
+  back from disk are re-checked, and writers take an flock on
+  cache_file + ".lock" so concurrent processes keep each other's entries
+
+Polynomials are coefficient lists, constant term first, as in poly.
+
+TO RUN:
+>>> from irreducible import irr_poly
+>>> irr_poly("16")
+([1, 1, 0, 0, 1], 2, 4)
+>>> irr_poly(3**10)[0]
+[2, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+>>> from irreducible import prime_power
+>>> prime_power(2**521 - 1) == (2**521 - 1, 1), prime_power(3**200)
+(True, (3, 200))
+"""
+from __future__ import print_function
+import json
+import os
+from fractions import gcd
+import random
+from numbers import Integral
+from itertools import combinations, islice
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+#(key, value) of finite field order : (irreducible polynomial, modulo, degree)
+_cache = {}
+
+def is_prime(n):
+    """
+    returns True if n is prime (deterministic Miller-Rabin below 3.3 * 10^24)
+    """
+    if n < 2:
+        return False
+    small = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+    for p in small:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in small:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in xrange(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def pollard_rho(n):
+    """
+    returns a nontrivial factor of odd composite n (Brent's variant of
+    Pollard's rho, batching 128 gcds into one)
+    """
+    c = 1
+    while True:
+        y, r, q, g = 2, 1, 1, 1
+        while g == 1:
+            x = y
+            for _ in xrange(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in xrange(min(128, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += 128
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+        if g != n:
+            return g
+        c += 1
+
+def prime_factors(n):
+    """
+    returns sorted list of distinct prime factors of n, trial division by
+    small primes and Pollard's rho on composite cofactors
+    """
+    factors = set()
+    for d in [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]:
+        if n % d == 0:
+            factors.add(d)
+            while n % d == 0:
+                n //= d
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors.add(m)
+            continue
+        d = pollard_rho(m)
+        stack.extend([d, m // d])
+    return sorted(factors)
+
+def integer_root(q, n):
+    """
+    returns floor of the nth root of q
+    """
+    #newton steps from above, starting over the root since q < 2^(n (bits // n + 1));
+    #they decrease strictly until the floor is reached
+    r = 1 << (q.bit_length() // n + 1)
+    while True:
+        s = ((n - 1) * r + q // r ** (n - 1)) // n
+        if s >= r:
+            return int(r)
+        r = s
+
+def prime_power(q):
+    """
+    returns (p, n) such that q = p^n with p prime
+    raises ValueError if q is not a prime power
+    """
+    q = int(q)
+    if q < 2:
+        raise ValueError("Finite field order must be a prime power")
+    if is_prime(q):
+        return q, 1
+    for n in xrange(q.bit_length(), 1, -1):
+        p = integer_root(q, n)
+        if p > 1 and p ** n == q and is_prime(p):
+            return p, n
+    raise ValueError("Finite field order must be a prime power")
+
+def trim(a):
+    """
+    returns polynomial without trailing zero coefficients
+    """
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+def poly_mod(a, f, p):
+    """
+    returns a mod f over Z_p for monic f
+    """
+    a = trim([c % p for c in a])
+    df = len(f) - 1
+    while len(a) - 1 >= df:
+        c, shift = a[-1], len(a) - 1 - df
+        if c:
+            for i in xrange(df):
+                a[shift + i] = (a[shift + i] - c * f[i]) % p
+        a.pop()
+        trim(a)
+    return a
+
+def poly_mulmod(a, b, f, p):
+    """
+    returns a * b mod f over Z_p
+    """
+    if not a or not b:
+        return []
+    product = [0] * (len(a) + len(b) - 1)
+    for i, j in enumerate(a):
+        if j:
+            for k, l in enumerate(b):
+                product[i + k] += j * l
+    return poly_mod(product, f, p)
+
+def poly_powmod(a, e, f, p):
+    """
+    returns a^e mod f over Z_p by square and multiply
+    """
+    result, base = [1], poly_mod(list(a), f, p)
+    while e:
+        if e & 1:
+            result = poly_mulmod(result, base, f, p)
+        base = poly_mulmod(base, base, f, p)
+        e >>= 1
+    return result
+
+def poly_sub(a, b, p):
+    """
+    returns a - b over Z_p
+    """
+    n = max(len(a), len(b))
+    a, b = a + [0] * (n - len(a)), b + [0] * (n - len(b))
+    return trim([(i - j) % p for i, j in zip(a, b)])
+
+def poly_gcd(a, b, p):
+    """
+    returns monic gcd of a and b over Z_p
+    """
+    a, b = trim(list(a)), trim(list(b))
+    while b:
+        inv = pow(b[-1], p - 2, p)
+        b = [c * inv % p for c in b]
+        a, b = b, poly_mod(a, b, p)
+    if a:
+        inv = pow(a[-1], p - 2, p)
+        a = [c * inv % p for c in a]
+    return a
+
+def to_bits(f):
+    """
+    returns int with bit i set for each odd coefficient of x^i
+    """
+    bits = 0
+    for i, c in enumerate(f):
+        if c % 2:
+            bits |= 1 << i
+    return bits
+
+def bits_mulmod(a, b, f, n):
+    """
+    returns a * b mod f over Z_2 for packed polynomials, deg f = n
+    """
+    result = 0
+    top = 1 << n
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a <<= 1
+        if a & top:
+            a ^= f
+    return result
+
+def bits_powmod(a, e, f, n):
+    """
+    returns a^e mod f over Z_2 for packed polynomials
+    """
+    result = 1
+    while e:
+        if e & 1:
+            result = bits_mulmod(result, a, f, n)
+        a = bits_mulmod(a, a, f, n)
+        e >>= 1
+    return result
+
+def bits_gcd(a, b):
+    """
+    returns gcd of packed polynomials over Z_2
+    """
+    while b:
+        db = b.bit_length()
+        while a.bit_length() >= db:
+            a ^= b << (a.bit_length() - db)
+        a, b = b, a
+    return a
+
+def has_root(f, p):
+    """
+    returns True if f has a root in Z_p, i.e. a linear factor
+    """
+    for a in xrange(min(p, 64)):
+        value = 0
+        for c in reversed(f):
+            value = (value * a + c) % p
+        if value == 0:
+            return True
+    return False
+
+def is_irreducible(f, p):
+    """
+    returns True if monic f is irreducible over Z_p (Ben-Or's test)
+    """
+    n = len(f) - 1
+    if n < 1:
+        return False
+    if n == 1:
+        return True
+    if has_root(f, p):
+        return False
+    if p == 2:
+        fb, h = to_bits(f), 2
+        for _ in xrange(n // 2):
+            h = bits_mulmod(h, h, fb, n)
+            if bits_gcd(fb, h ^ 2) != 1:
+                return False
+        return True
+    x, h = [0, 1], [0, 1]
+    for _ in xrange(n // 2):
+        #h = x^(p^i) mod f
+        h = poly_powmod(h, p, f, p)
+        if len(poly_gcd(f, poly_sub(h, x, p), p)) != 1:
+            return False
+    return True
+
+def is_primitive(f, p, factors = None):
+    """
+    returns True if irreducible f is primitive, i.e. x has order p^n - 1
+    factors : lst
+        prime factors of p^n - 1 when already known
+    """
+    n = len(f) - 1
+    q = p ** n
+    if q == 2:
+        return True
+    for r in factors or prime_factors(q - 1):
+        if p == 2:
+            if bits_powmod(2, (q - 1) // r, to_bits(f), n) == 1:
+                return False
+        elif poly_powmod([0, 1], (q - 1) // r, f, p) == [1]:
+            return False
+    return True
+
+def search_irr_poly(p, n, primitive = True, budget = 1024):
+    """
+    returns first monic irreducible (primitive if requested) polynomial of
+    degree n over Z_p, trying up to budget sparse candidates per weight
+    before dense ones drawn from a generator seeded by p and n, so that
+    the answer is reproducible even when p is huge
+    """
+    factors = prime_factors(p ** n - 1) if primitive else None
+    for weight in xrange(1, n + 1):
+        for f in islice(candidates(p, n, weight), budget):
+            if is_irreducible(f, p) and (not primitive or is_primitive(f, p, factors)):
+                return f
+    rng = random.Random(p * 1000003 + n)
+    while True:
+        f = [rng.randrange(1, p)] + [rng.randrange(p) for _ in xrange(n - 1)] + [1]
+        if is_irreducible(f, p) and (not primitive or is_primitive(f, p, factors)):
+            return f
+
+def candidates(p, n, weight):
+    """
+    yields monic degree n polynomials with nonzero constant term and
+    exactly weight nonzero coefficients among x^1 ... x^(n-1)
+    """
+    for positions in combinations(xrange(1, n), weight - 1):
+        for coefs in nonzero_coefs(p, weight):
+            f = [0] * n + [1]
+            f[0] = coefs[0]
+            for i, c in zip(positions, coefs[1:]):
+                f[i] = c
+            yield f
+
+def nonzero_coefs(p, k):
+    """
+    yields every k-tuple of nonzero residues mod p, lazily so that a huge
+    p never materializes xrange(1, p) the way itertools.product would
+    """
+    if k == 0:
+        yield ()
+        return
+    for c in xrange(1, p):
+        for rest in nonzero_coefs(p, k - 1):
+            yield (c,) + rest
+
+def load_cache(cache_file):
+    """
+    returns (key, value) of order : irreducible polynomial stored on disk
+    """
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    with open(cache_file) as f:
+        return json.load(f)
+
+def save_cache(cache_file, order, f):
+    """
+    adds irreducible polynomial of order to JSON cache file, holding an
+    exclusive lock across the read-modify-write where flock is available
+    """
+    with open(cache_file + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            stored = load_cache(cache_file)
+            stored[str(order)] = f
+            tmp = "%s.%d.tmp" % (cache_file, os.getpid())
+            with open(tmp, "w") as out:
+                json.dump(stored, out, sort_keys = True)
+            os.rename(tmp, cache_file)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+def valid_irr_poly(f, p, n):
+    """
+    returns True if f is a monic irreducible polynomial of degree n over Z_p
+    """
+    return (isinstance(f, list) and len(f) == n + 1 and f[-1] == 1
+            and all(isinstance(c, Integral) and 0 <= c < p for c in f)
+            and is_irreducible(f, p))
+
+def irr_poly(order, cache_file = None):
+    """
+    returns (irreducible polynomial, modulo, degree) for finite field order
+    in the format of poly.irr_poly; prime orders p give ([p], p, 1)
+    entries of the disk cache that are not irreducible of degree n are
+    ignored and replaced
+    raises ValueError if order is not a prime power
+    """
+    order = str(order)
+    if order in _cache:
+        return _cache[order]
+    p, n = prime_power(order)
+    if n == 1:
+        _cache[order] = ([p], p, 1)
+        return _cache[order]
+    cache_file = cache_file or os.environ.get("FINITE_FIELDS_CACHE")
+    stored = load_cache(cache_file)
+    f = stored.get(order)
+    if not valid_irr_poly(f, p, n):
+        f = search_irr_poly(p, n)
+        if cache_file:
+            save_cache(cache_file, order, f)
+    _cache[order] = (f, p, n)
+    return _cache[order]
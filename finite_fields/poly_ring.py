@@ -0,0 +1,366 @@
+"""
+POLYNOMIAL RING GF(p)[x]
+
+Arithmetic on large polynomials over Z_p in the coefficient list structure
+of poly (constant term first), p prime.
+
+* mult dispatches on size: schoolbook below KARATSUBA_CUTOFF coefficients,
+  Karatsuba above it, and a number-theoretic transform above NTT_CUTOFF
+  whenever 2^k | p - 1 for a transform length 2^k covering the product
+* divmod uses Newton iteration on the reversed divisor above
+  NEWTON_CUTOFF, so division costs a constant number of products
+* multipoint_eval and interpolate walk a subproduct tree, costing
+  O(M(n) log n) instead of O(n^2)
+
+Crossovers come from bench_poly_ring.py; rerun it on new hardware.
+
+TO RUN:
+>>> from poly_ring import poly_ring
+>>> R = poly_ring(7)
+>>> R.mult([1, 1], [6, 1])          # (1 + x)(6 + x) = 6 + 0x + x^2
+[6, 0, 1]
+>>> R.multipoint_eval([1, 2, 3], [0, 1, 2])
+[1, 6, 3]
+>>> R.interpolate([0, 1, 2], [1, 6, 3])
+[1, 2, 3]
+"""
+from __future__ import print_function
+from reduction import trim, poly_divmod
+from irreducible import is_prime, prime_factors
+
+#crossover points in number of coefficients of the shorter factor,
+#measured by bench_poly_ring.py on Z_998244353 under CPython 2.7:
+#karatsuba wins from 32-96, ntt from 128-192, and the remainder tree
+#only overtakes Horner between 8192 and 16384 points
+KARATSUBA_CUTOFF = 48
+NTT_CUTOFF = 160
+NEWTON_CUTOFF = 128
+#points per remainder tree leaf, and points from which the tree is used
+LEAF_CUTOFF = 64
+MULTIPOINT_CUTOFF = 12288
+
+def padded_sum(a, b):
+    """
+    returns coefficientwise sum of two lists of any lengths
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    s = list(a)
+    for i, c in enumerate(b):
+        s[i] += c
+    return s
+
+class poly_ring(object):
+    def __init__(self, p):
+        """
+        p : int
+            prime characteristic
+
+        ntt_order : int
+            largest k such that 2^k divides p - 1, bounding NTT lengths
+
+        root : int
+            generator of the multiplicative group of Z_p
+        """
+        if not is_prime(p):
+            raise ValueError("poly_ring needs a prime characteristic")
+        self.p = p
+        self.ntt_order = 0
+        while (p - 1) % (2 << self.ntt_order) == 0:
+            self.ntt_order += 1
+        self.root = self.primitive_root()
+        self._roots = {}
+
+    def primitive_root(self):
+        """
+        returns smallest generator of (Z/pZ)^x
+        """
+        p = self.p
+        if p == 2:
+            return 1
+        factors = prime_factors(p - 1)
+        g = 2
+        while any(pow(g, (p - 1) // r, p) == 1 for r in factors):
+            g += 1
+        return g
+
+    def normalize(self, a):
+        """
+        returns coefficients reduced mod p without trailing zeros
+        """
+        return trim([c % self.p for c in a])
+
+    def add(self, a, b):
+        """
+        returns a + b
+        """
+        return self.normalize(padded_sum(a, b))
+
+    def sub(self, a, b):
+        """
+        returns a - b
+        """
+        return self.add(a, [-c for c in b])
+
+    def schoolbook(self, a, b):
+        """
+        returns a * b by the double loop of poly.mult, unreduced
+        """
+        if not a or not b:
+            return []
+        product = [0] * (len(a) + len(b) - 1)
+        for i, j in enumerate(a):
+            if j:
+                for k, l in enumerate(b):
+                    product[i + k] += j * l
+        return product
+
+    def karatsuba(self, a, b):
+        """
+        returns a * b with three half-size products per level, unreduced
+        """
+        if len(a) < len(b):
+            a, b = b, a
+        if len(b) < KARATSUBA_CUTOFF:
+            return self.schoolbook(a, b)
+        m = len(a) // 2
+        if len(b) <= m:
+            #unbalanced: split only the longer factor
+            low = self.karatsuba(a[:m], b)
+            high = self.karatsuba(a[m:], b)
+            product = low + [0] * (len(a) + len(b) - 1 - len(low))
+            for i, c in enumerate(high):
+                product[m + i] += c
+            return product
+        a0, a1, b0, b1 = a[:m], a[m:], b[:m], b[m:]
+        z0 = self.karatsuba(a0, b0)
+        z2 = self.karatsuba(a1, b1)
+        z1 = self.karatsuba(padded_sum(a0, a1), padded_sum(b0, b1))
+        product = [0] * (len(a) + len(b) - 1)
+        for i, c in enumerate(z0):
+            product[i] += c
+            z1[i] -= c
+        for i, c in enumerate(z2):
+            product[i + 2 * m] += c
+            z1[i] -= c
+        for i, c in enumerate(z1):
+            if i + m < len(product):
+                product[i + m] += c
+        return product
+
+    def roots_of_unity(self, k):
+        """
+        returns (omega, omega^-1) of order 2^k in Z_p
+        """
+        if k not in self._roots:
+            p = self.p
+            w = pow(self.root, (p - 1) >> k, p)
+            self._roots[k] = (w, pow(w, p - 2, p))
+        return self._roots[k]
+
+    def ntt(self, a, k, invert = False):
+        """
+        transforms a of length 2^k in place (iterative radix-2)
+        """
+        p, n = self.p, len(a)
+        j = 0
+        for i in xrange(1, n):
+            bit = n >> 1
+            while j & bit:
+                j ^= bit
+                bit >>= 1
+            j |= bit
+            if i < j:
+                a[i], a[j] = a[j], a[i]
+        length = 2
+        level = 1
+        while length <= n:
+            w = self.roots_of_unity(level)[1 if invert else 0]
+            half = length >> 1
+            twiddles = [1] * half
+            for i in xrange(1, half):
+                twiddles[i] = twiddles[i - 1] * w % p
+            for start in xrange(0, n, length):
+                for i in xrange(half):
+                    u = a[start + i]
+                    v = a[start + i + half] * twiddles[i] % p
+                    a[start + i] = (u + v) % p
+                    a[start + i + half] = (u - v) % p
+            length <<= 1
+            level += 1
+        if invert:
+            inv_n = pow(n, p - 2, p)
+            for i in xrange(n):
+                a[i] = a[i] * inv_n % p
+        return a
+
+    def ntt_mult(self, a, b):
+        """
+        returns a * b through the number-theoretic transform
+        """
+        size = len(a) + len(b) - 1
+        k = max(1, (size - 1).bit_length())
+        n = 1 << k
+        fa = [c % self.p for c in a] + [0] * (n - len(a))
+        fb = [c % self.p for c in b] + [0] * (n - len(b))
+        self.ntt(fa, k)
+        self.ntt(fb, k)
+        p = self.p
+        for i in xrange(n):
+            fa[i] = fa[i] * fb[i] % p
+        self.ntt(fa, k, invert = True)
+        return fa[:size]
+
+    def ntt_supported(self, size):
+        """
+        returns True if a transform covering size coefficients exists mod p
+        """
+        return size > 1 and (size - 1).bit_length() <= self.ntt_order
+
+    def mult(self, a, b, method = None):
+        """
+        returns a * b, method one of "schoolbook", "karatsuba", "ntt",
+        chosen by size when None
+        """
+        a, b = self.normalize(a), self.normalize(b)
+        if not a or not b:
+            return []
+        if method is None:
+            short = min(len(a), len(b))
+            if short >= NTT_CUTOFF and self.ntt_supported(len(a) + len(b) - 1):
+                method = "ntt"
+            elif short >= KARATSUBA_CUTOFF:
+                method = "karatsuba"
+            else:
+                method = "schoolbook"
+        if method == "ntt":
+            if not self.ntt_supported(len(a) + len(b) - 1):
+                raise ValueError("Z_%d has no root of unity for this NTT length" % self.p)
+            return self.normalize(self.ntt_mult(a, b))
+        if method == "karatsuba":
+            return self.normalize(self.karatsuba(a, b))
+        return self.normalize(self.schoolbook(a, b))
+
+    def inverse_series(self, f, k):
+        """
+        returns g with f g = 1 mod x^k by Newton iteration, f[0] != 0
+        """
+        p = self.p
+        g = [pow(f[0], p - 2, p)]
+        precision = 1
+        while precision < k:
+            precision = min(2 * precision, k)
+            #g = g (2 - f g) mod x^precision
+            fg = self.mult(f[:precision], g)[:precision]
+            correction = [-c for c in fg]
+            correction += [0] * (1 - len(correction))
+            correction[0] += 2
+            g = self.mult(g, correction)[:precision]
+        return self.normalize(g)
+
+    def divmod(self, a, b):
+        """
+        returns (quotient, remainder) of a / b
+        raises ZeroDivisionError if b is zero
+        """
+        a, b = self.normalize(a), self.normalize(b)
+        if not b:
+            raise ZeroDivisionError("division by zero polynomial")
+        if len(a) < len(b):
+            return [], a
+        if len(b) < NEWTON_CUTOFF or len(a) - len(b) < NEWTON_CUTOFF:
+            q, r = poly_divmod(a, b, self.p)
+            return self.normalize(q), r
+        #reversed quotient = rev(a) / rev(b) mod x^(deg a - deg b + 1)
+        k = len(a) - len(b) + 1
+        inv = self.inverse_series(b[::-1], k)
+        q = self.mult(a[::-1][:k], inv)[:k]
+        q = q + [0] * (k - len(q))
+        q = self.normalize(q[::-1])
+        r = self.sub(a, self.mult(q, b))
+        return q, r
+
+    def mod(self, a, b):
+        """
+        returns a mod b
+        """
+        return self.divmod(a, b)[1]
+
+    def evaluate(self, a, x):
+        """
+        returns a(x) by Horner's rule
+        """
+        value = 0
+        for c in reversed(a):
+            value = (value * x + c) % self.p
+        return value
+
+    def derivative(self, a):
+        """
+        returns formal derivative of a
+        """
+        return self.normalize([i * c for i, c in enumerate(a)][1:])
+
+    def subproduct_tree(self, points):
+        """
+        returns levels of the subproduct tree, levels[0] holds x - x_i and
+        the last level holds prod (x - x_i)
+        """
+        level = [[-x % self.p, 1] for x in points]
+        levels = [level]
+        while len(level) > 1:
+            level = [self.mult(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                     for i in xrange(0, len(level), 2)]
+            levels.append(level)
+        return levels
+
+    def remainder_tree(self, a, levels, points):
+        """
+        returns a(x_i) for every leaf of the subproduct tree, descending
+        until a node covers at most LEAF_CUTOFF points and finishing those
+        by Horner on the node remainder
+        """
+        remainders = [self.mod(a, levels[-1][0])]
+        depth = len(levels) - 1
+        while depth > 0 and (1 << depth) > LEAF_CUTOFF:
+            depth -= 1
+            remainders = [self.mod(remainders[i // 2], m) for i, m in enumerate(levels[depth])]
+        width = 1 << depth
+        return [self.evaluate(remainders[i // width], x) for i, x in enumerate(points)]
+
+    def multipoint_eval(self, a, points):
+        """
+        returns [a(x) for x in points]; Horner below MULTIPOINT_CUTOFF
+        points, remainder tree above
+        """
+        a = self.normalize(a)
+        if len(points) < MULTIPOINT_CUTOFF:
+            return [self.evaluate(a, x) for x in points]
+        return self.remainder_tree(a, self.subproduct_tree(points), points)
+
+    def interpolate(self, points, values):
+        """
+        returns polynomial of degree < n through (points[i], values[i])
+        raises ValueError for repeated points
+        """
+        p = self.p
+        if len(set(x % p for x in points)) != len(points):
+            raise ValueError("interpolation points must be distinct mod p")
+        if not points:
+            return []
+        levels = self.subproduct_tree(points)
+        #lagrange weights values[i] / M'(x_i)
+        scale = self.multipoint_eval(self.derivative(levels[-1][0]), points)
+        level = [[v * pow(s, p - 2, p) % p] for v, s in zip(values, scale)]
+        #combine upwards: f = f_left m_right + f_right m_left
+        for depth in xrange(len(levels) - 1):
+            moduli = levels[depth]
+            combined = []
+            for i in xrange(0, len(level), 2):
+                if i + 1 < len(level):
+                    combined.append(self.add(self.mult(level[i], moduli[i + 1]),
+                                             self.mult(level[i + 1], moduli[i])))
+                else:
+                    combined.append(level[i])
+            level = combined
+        return self.normalize(level[0])
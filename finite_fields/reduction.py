@@ -0,0 +1,109 @@
+"""
+POLYNOMIAL DIVISION AND REDUCTION OVER Z_p
+
+Exact integer arithmetic on coefficient lists (constant term first), p prime.
+
+* poly_divmod: long division that multiplies by the precomputed inverse of
+  the leading coefficient of the divisor, working in place on one
+  remainder buffer and one preallocated quotient buffer
+* barrett: precomputes mu = floor(x^(2n) / f) once per modulus f of
+  degree n, after which any a of degree < 2n reduces with two truncated
+  products and no division
+  (q = floor(floor(a / x^n) mu / x^n), r = a - q f is exact over a field)
+
+poly keeps one barrett per order for simplified.
+
+TO RUN:
+>>> from reduction import poly_divmod, barrett
+>>> poly_divmod([1, 0, 0, 0, 1], [3, 2, 1], 7)
+([1, 5, 1], [5, 4])
+>>> barrett([3, 2, 1], 7).reduce([1, 0, 0, 0, 1])
+[5, 4]
+"""
+from __future__ import print_function
+
+def trim(a):
+    """
+    returns polynomial without trailing zero coefficients
+    """
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+def poly_divmod(N, D, p, inv = None):
+    """
+    returns (quotient, remainder) of N / D over Z_p
+    inv : int
+        inverse of the leading coefficient of D mod p when already known
+    raises ZeroDivisionError if D is zero mod p
+    """
+    D = trim([c % p for c in D])
+    dD = len(D) - 1
+    if dD < 0:
+        raise ZeroDivisionError("division by zero polynomial")
+    if inv is None:
+        inv = pow(D[dD], p - 2, p)
+    #remainder buffer, coefficients reduced mod p only when read
+    r = list(N)
+    trim(r)
+    dN = len(r) - 1
+    if dN < dD:
+        return [0], trim([c % p for c in r])
+    q = [0] * (dN - dD + 1)
+    for i in xrange(dN - dD, -1, -1):
+        c = r[i + dD] % p * inv % p
+        q[i] = c
+        if c:
+            for j in xrange(dD):
+                r[i + j] -= c * D[j]
+    del r[dD:]
+    return q, trim([c % p for c in r])
+
+def poly_mulmod_p(a, b, p, low = None, high = None):
+    """
+    returns coefficients low ... high-1 of a * b over Z_p (all by default)
+    """
+    size = len(a) + len(b) - 1 if a and b else 0
+    low = 0 if low is None else low
+    high = size if high is None else min(high, size)
+    if high <= low:
+        return []
+    product = [0] * (high - low)
+    for i, c in enumerate(a):
+        if not c:
+            continue
+        for k in xrange(max(0, low - i), min(len(b), high - i)):
+            product[i + k - low] += c * b[k]
+    return [c % p for c in product]
+
+class barrett(object):
+    def __init__(self, f, p):
+        """
+        f : lst
+            modulus polynomial of degree n >= 1 over Z_p
+
+        mu : lst
+            floor(x^(2n) / f), precomputed once per modulus
+        """
+        self.p = p
+        self.f = trim([c % p for c in f])
+        self.n = len(self.f) - 1
+        if self.n < 1:
+            raise ValueError("Barrett reduction needs a modulus of degree >= 1")
+        self.inv = pow(self.f[-1], p - 2, p)
+        self.mu = poly_divmod([0] * (2 * self.n) + [1], self.f, p, self.inv)[0]
+
+    def reduce(self, a):
+        """
+        returns a mod f over Z_p, by long division if deg a >= 2n
+        """
+        p, n = self.p, self.n
+        a = trim([c % p for c in a])
+        if len(a) <= n:
+            return a
+        if len(a) > 2 * n:
+            return poly_divmod(a, self.f, p, self.inv)[1]
+        q = poly_mulmod_p(a[n:], self.mu, p, low = n)
+        qf = poly_mulmod_p(q, self.f, p, high = n)
+        qf += [0] * (n - len(qf))
+        return trim([(c - d) % p for c, d in zip(a[:n], qf)])
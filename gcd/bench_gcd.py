@@ -0,0 +1,107 @@
+"""
+GCD BENCHMARK
+
+Times gcd of random operands of growing bit length with the old recursion,
+the Euclid loop, the binary GCD, Lehmer's algorithm and the standard
+library (math.gcd, or fractions.gcd on Python 2), and xgcd with Euclid
+against Lehmer, then reports the crossover sizes used for LEHMER_CUTOFF
+and LEHMER_XGCD_CUTOFF in lehmer.py.  The recursion fails with '-' once it
+needs more frames than the recursion limit.
+
+TO RUN:
+$ python bench_gcd.py              # 256 ... 16384 bits
+$ python bench_gcd.py 65536        # largest bit length
+"""
+from __future__ import print_function
+import random
+import sys
+import time
+try:
+    from math import gcd as library_gcd
+except ImportError:
+    from fractions import gcd as library_gcd
+from gcd import euclid_for, euclid_back
+from lehmer import binary_gcd, lehmer_gcd, lehmer_xgcd
+
+def recursive_gcd(a, q):
+    r = a%q
+    if r == 0:
+        return q
+    return recursive_gcd(q, r)
+
+def euclid_gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+def euclid_xgcd(a, b):
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def best_time(f, repeat = 3):
+    """
+    returns fastest mean wall time of repeat rounds of f over all pairs,
+    None if f runs out of stack
+    """
+    best = None
+    for _ in xrange(repeat):
+        start = time.time()
+        try:
+            f()
+        except RuntimeError:
+            return None
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def crossover(sizes, slow, fast):
+    """
+    returns first size from which fast stays faster than slow
+    """
+    for i, n in enumerate(sizes):
+        pairs = [(slow[m], fast[m]) for m in sizes[i:] if slow.get(m) and fast.get(m)]
+        if pairs and all(f < s for s, f in pairs):
+            return n
+    return None
+
+def bench(methods, sizes, pairs = 10):
+    """
+    returns (key, value) of method : (key, value) of size : seconds per pair
+    """
+    times = dict((name, {}) for name, _ in methods)
+    print("%8s" % "bits" + "".join("%12s" % name for name, _ in methods))
+    for n in sizes:
+        operands = [(random.getrandbits(n) | 1 << (n - 1), random.getrandbits(n) | 1 << (n - 1))
+                    for _ in xrange(pairs)]
+        row = []
+        for name, f in methods:
+            t = best_time(lambda: [f(a, b) for a, b in operands])
+            times[name][n] = t / pairs if t is not None else None
+            row.append("%.6f" % times[name][n] if t is not None else "-")
+        print("%8d" % n + "".join("%12s" % x for x in row))
+    return times
+
+if __name__ == "__main__":
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 16384
+    random.seed(152)
+    sizes = [2 ** k for k in xrange(8, largest.bit_length()) if 2 ** k <= largest]
+    sizes = sorted(set(sizes + [3 * s // 2 for s in sizes if 3 * s // 2 <= largest]))
+
+    print("GCD")
+    times = bench([("recursion", recursive_gcd), ("euclid", euclid_gcd), ("binary", binary_gcd),
+                   ("lehmer", lehmer_gcd), ("library", library_gcd)], sizes)
+    print()
+    print("lehmer beats euclid from", crossover(sizes, times["euclid"], times["lehmer"]))
+    print("lehmer beats library gcd from", crossover(sizes, times["library"], times["lehmer"]))
+    print()
+
+    print("EXTENDED GCD")
+    times = bench([("backsolve", lambda a, b: euclid_back(euclid_for(a, b))),
+                   ("euclid", euclid_xgcd), ("lehmer", lehmer_xgcd)], sizes)
+    print()
+    print("lehmer beats euclid from", crossover(sizes, times["euclid"], times["lehmer"]))
@@ -0,0 +1,191 @@
+"""
+CHINESE REMAINDER THEOREM
+Solves systems of congruences x = r_i mod m_i for many pairs at once.
+
+With pairwise coprime moduli, M = m_1 ... m_k and M_i = M / m_i, the
+solution is x = sum r_i c_i M_i mod M, where c_i is the inverse of M_i
+modulo m_i.  Everything runs on a product tree of the moduli, so k
+congruences cost a few products of tree size rather than k^2 big
+multiplications:
+    * the remainder tree of M over the squares m_i^2 gives
+      M mod m_i^2 = m_i (M_i mod m_i), for all i in one descent
+    * the c_i are inverses modulo the small m_i
+    * the sum is gathered up the tree, a node's value being
+      left * (right moduli) + right * (left moduli)
+
+Moduli sharing factors are merged pairwise up the same tree instead, with
+the extended Euclidean algorithm: x = r1 mod m1 and x = r2 mod m2 have a
+solution modulo lcm(m1, m2) exactly when gcd(m1, m2) divides r2 - r1,
+and ValueError is raised otherwise.
+
+crt_basis keeps the tree and the c_i of one set of moduli, so many residue
+vectors, an (N, k) array, are solved together with NumPy object arrays.
+
+TO RUN:
+>>> from crt import crt, crt_basis
+>>> crt([2, 3, 2], [3, 5, 7])
+(23, 105)
+>>> crt([3, 5], [4, 6])
+(11, 12)
+>>> crt([1, 2], [4, 6])
+Traceback (most recent call last):
+...
+ValueError: Congruences x = 1 mod 4 and x = 2 mod 6 are inconsistent
+>>> B = crt_basis([3, 5, 7])
+>>> B.solve([[2, 3, 2], [1, 1, 1], [2, 4, 6]], symmetric=True).tolist()
+[23, 1, -1]
+"""
+
+from __future__ import print_function
+import numpy as np
+from gcd import xgcd, mod_inverse
+
+def product_tree(values):
+    """
+    returns levels of a product tree: the values, then products of pairs
+    (an odd last value carried up as is), up to a list of the product
+    """
+    levels = [list(values)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([level[i] * level[i + 1] for i in xrange(0, len(level) - 1, 2)]
+                      + level[len(level) - 1:] * (len(level) % 2))
+    return levels
+
+def remainder_tree(x, tree):
+    """
+    returns x mod every leaf of a product tree, reducing modulo each node
+    on the way down
+    """
+    remainders = [x % tree[-1][0]] if tree[-1] else []
+    for level in reversed(tree[:-1]):
+        remainders = [remainders[i // 2] % m for i, m in enumerate(level)]
+    return remainders
+
+def crt_pair(r1, m1, r2, m2):
+    """
+    returns (x, lcm(m1, m2)) with x = r1 mod m1 and x = r2 mod m2
+    raises ValueError if the congruences are inconsistent
+    """
+    g, p, _ = xgcd(m1, m2)
+    if (r2 - r1) % g:
+        raise ValueError("Congruences x = %d mod %d and x = %d mod %d are inconsistent"
+                         % (r1, m1, r2, m2))
+    lcm = m1 // g * m2
+    #p m1 = g mod m2, so r1 + m1 p (r2 - r1) / g = r2 mod m2
+    return (r1 + m1 * (p * ((r2 - r1) // g) % (m2 // g))) % lcm, lcm
+
+def check(residues, moduli):
+    """
+    returns (residues, moduli) as lists of ints, residues reduced
+    raises ValueError for lengths that differ or moduli below 1
+    """
+    moduli = [int(m) for m in moduli]
+    if len(residues) != len(moduli):
+        raise ValueError("Need one residue per modulus")
+    if any(m < 1 for m in moduli):
+        raise ValueError("Moduli must be positive")
+    return [int(r) % m for r, m in zip(residues, moduli)], moduli
+
+def coprime_coefficients(tree):
+    """
+    returns c_i = (M / m_i)^-1 mod m_i for the leaves m_i of a product tree
+    raises ValueError if two moduli share a factor
+    """
+    moduli = tree[0]
+    squares = remainder_tree(tree[-1][0], product_tree([m * m for m in moduli]))
+    return [mod_inverse(s // m, m) for s, m in zip(squares, moduli)]
+
+def gather(values, tree):
+    """
+    returns sum of values[i] * M / m_i over the leaves m_i of a product
+    tree, combining up the tree
+    """
+    for level in tree[:-1]:
+        values = [values[i] * level[i + 1] + values[i + 1] * level[i]
+                  for i in xrange(0, len(level) - 1, 2)] + values[len(level) - 1:] * (len(level) % 2)
+    return values[0]
+
+def merge(residues, moduli):
+    """
+    returns (x, lcm) of congruences with any moduli, merged pairwise up a
+    tree
+    raises ValueError if they are inconsistent
+    """
+    pairs = zip(residues, moduli)
+    while len(pairs) > 1:
+        pairs = [crt_pair(r1, m1, r2, m2) for (r1, m1), (r2, m2) in zip(pairs[0::2], pairs[1::2])] \
+            + pairs[len(pairs) - 1:] * (len(pairs) % 2)
+    return pairs[0] if pairs else (0, 1)
+
+def symmetric_residue(x, M):
+    """
+    returns x mod M in -M/2 ... M/2
+    """
+    x %= M
+    return x - M if 2 * x > M else x
+
+def crt(residues, moduli, symmetric = False):
+    """
+    returns (x, M) with x = residues[i] mod moduli[i] for all i, M the lcm
+    of the moduli and x in 0...M-1 (-M/2...M/2 if symmetric)
+    raises ValueError if the congruences are inconsistent
+    """
+    residues, moduli = check(residues, moduli)
+    if not moduli:
+        return 0, 1
+    tree = product_tree(moduli)
+    try:
+        coefficients = coprime_coefficients(tree)
+    except ValueError:
+        x, M = merge(residues, moduli)
+    else:
+        M = tree[-1][0]
+        x = gather([r * c % m for r, c, m in zip(residues, coefficients, moduli)], tree) % M
+    return (symmetric_residue(x, M) if symmetric else x), M
+
+class crt_basis(object):
+    def __init__(self, moduli):
+        """
+        moduli : lst
+            moduli of the congruences, pairwise coprime for the fast path;
+            otherwise residue vectors are merged one at a time
+
+        tree : lst
+            product tree of the moduli, modulus its root
+
+        coefficients : lst
+            (M / m_i)^-1 mod m_i, None if two moduli share a factor
+        """
+        _, self.moduli = check([0] * len(moduli), moduli)
+        self.tree = product_tree(self.moduli)
+        self.modulus = self.tree[-1][0] if self.moduli else 1
+        try:
+            self.coefficients = coprime_coefficients(self.tree) if self.moduli else []
+        except ValueError:
+            self.coefficients = None
+            self.modulus = merge([0] * len(self.moduli), self.moduli)[1]
+
+    def solve(self, residues, symmetric = False):
+        """
+        returns x of one residue vector (k,), or an (N,) object array of
+        solutions for an (N, k) array of residue vectors
+        raises ValueError if some vector is inconsistent
+        """
+        residues = np.asarray(residues, dtype=object)
+        single = residues.ndim == 1
+        residues = np.atleast_2d(residues)
+        if residues.shape[1] != len(self.moduli):
+            raise ValueError("Need one residue per modulus")
+        if self.coefficients is None:
+            x = np.array([merge([int(r) % m for r, m in zip(row, self.moduli)], self.moduli)[0]
+                          for row in residues], dtype=object)
+        else:
+            #r_i c_i mod m_i for all rows at once, then gathered column pairs
+            moduli = np.array(self.moduli, dtype=object)
+            values = residues * np.array(self.coefficients, dtype=object) % moduli
+            columns = [values[:, i] for i in xrange(values.shape[1])]
+            x = gather(columns, self.tree) % self.modulus
+        if symmetric:
+            x = np.where((2 * x > self.modulus).astype(bool), x - self.modulus, x)
+        return x[0] if single else x
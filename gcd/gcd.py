@@ -5,34 +5,64 @@ Euclid GCD
 by Vincent Nguyen
 ==================
 
-Computes the greatest common divisor beteween two integers between 2 and 2**16+1, the
-Fermet prime.  Returns the GCD and integers m and n such that ma+nb = GCD
+Computes the greatest common divisor between two integers, by default a and
+2**16+1, the Fermat prime.  Returns the GCD and integers m and n such that
+ma+nb = GCD, and the inverse of a modulo b when the GCD is 1.
+
+The extended Euclidean algorithm runs as a loop keeping only the last two
+rows of coefficients, so it takes constant memory (besides the size of the
+ints) and no recursion, for ints of any size and any modulus.  batch_inverse
+inverts k values modulo m with Montgomery's trick: one extended Euclid on the
+product of all k values plus 3k multiplications.  NumPy arrays are combined
+in a product tree, one vectorized multiplication per level, when products
+modulo m fit in int64.  gcd and xgcd switch to Lehmer's algorithm
+(lehmer.py) for operands of thousands of bits.
 
 Inputs
 ------------------
 a: int
-    Integer between 2 and 65537
+    Any integer
     Ex.) 37
+b: int
+    Modulus, optional command line argument, default 65537
+
+TO RUN:
+$ python gcd.py            # modulus 2**16+1
+$ python gcd.py 1000000007
 
 Examples
 ------------------
 a: 4
->> GCD(4, 2) = 2 = 1 x 2 + 0 x 4
+>> GCD(4, 65537) = 1 = -16384 x 4 + 1 x 65537
+>> (4)(49153) = 1
 
+>>> from gcd import gcd, xgcd, mod_inverse, batch_inverse
+>>> gcd(2 ** 9000 * 3, 2 ** 8000 * 9) == 3 * 2 ** 8000
+True
+>>> xgcd(240, 46)
+(2, -9, 47)
+>>> mod_inverse(3, 2**127 - 1) * 3 % (2**127 - 1)
+1L
+>>> batch_inverse([2, 3, 4, 5], 7)
+[4, 5, 2, 3]
 """
 
 from random import randint
+import sys
+import numpy as np
+from lehmer import lehmer_gcd, lehmer_xgcd, LEHMER_CUTOFF, LEHMER_XGCD_CUTOFF
 
 def euclid_for(a, q):
+    """
+    returns list of (a, b, q, r) with a = b*q + r for every division step
+    """
     coefs = []
-    def gcd(a, q): 
-        b, r = a/q, a%q
+    while True:
+        b, r = divmod(a, q)
         coefs.append((a, b, q, r))
-        if r != 0:
-            return gcd(q, r)
-    gcd(a, q)
-    #assert(coefs[-1][2] == 1)
-    return coefs
+        if r == 0:
+            return coefs
+        a, q = q, r
 
 def euclid_back(eqs):
     if len(eqs) == 1:
@@ -44,18 +74,117 @@ def euclid_back(eqs):
     assert(t[0] == t[1]*t[2]+t[3]*t[4])
     return t
 
+def gcd(a, b):
+    """
+    returns gcd(a, b) >= 0, by Lehmer's algorithm for large operands
+    """
+    if max(abs(a), abs(b)).bit_length() >= LEHMER_CUTOFF:
+        return lehmer_gcd(a, b)
+    a, b = abs(a), abs(b)
+    while b:
+        a, b = b, a % b
+    return a
+
+def xgcd(a, b):
+    """
+    returns (g, x, y) with g = gcd(a, b) >= 0 and x*a + y*b = g, by
+    Lehmer's algorithm for large operands
+    """
+    if max(abs(a), abs(b)).bit_length() >= LEHMER_XGCD_CUTOFF:
+        return lehmer_xgcd(a, b)
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    if a < 0:
+        return -a, -x0, -y0
+    return a, x0, y0
+
+def mod_inverse(a, m):
+    """
+    returns x in 0...m-1 with a*x = 1 mod m
+    raises ValueError if a and m are not coprime
+    """
+    if m < 1:
+        raise ValueError("Modulus must be positive")
+    g, x, _ = xgcd(a % m, m)
+    if g != 1:
+        raise ValueError("%d has no inverse mod %d" % (a, m))
+    return x % m
+
+def not_invertible(values, m):
+    """
+    returns ValueError naming the first of values sharing a factor with m
+    """
+    for a in values:
+        if xgcd(int(a) % m, m)[0] != 1:
+            return ValueError("%d has no inverse mod %d" % (a, m))
+    return ValueError("Values have no inverses mod %d" % m)
+
+def batch_inverse(values, m):
+    """
+    returns inverses mod m of all values, a list or for a NumPy integer
+    array an array of the same shape, by Montgomery's trick
+    raises ValueError if some value is not coprime to m
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu" and (m - 1) ** 2 < 2 ** 63:
+        return tree_inverse(values, m)
+    values = [a % m for a in values]
+    #prefix[i] is the product of values[:i]
+    prefix = []
+    product = 1
+    for a in values:
+        prefix.append(product)
+        product = product * a % m
+    try:
+        inverse = mod_inverse(product, m)
+    except ValueError:
+        raise not_invertible(values, m)
+    inverses = [0] * len(values)
+    for i in xrange(len(values) - 1, -1, -1):
+        inverses[i] = inverse * prefix[i] % m
+        inverse = inverse * values[i] % m
+    return inverses
+
+def tree_inverse(values, m):
+    """
+    returns int64 array of inverses mod m of an integer array, multiplying
+    pairs up a product tree and handing inverses back down it, level by level
+    """
+    shape = values.shape
+    level = np.mod(values.ravel(), m).astype(np.int64)
+    size = len(level)
+    if not size:
+        return level.reshape(shape)
+    #pad to a power of two with ones
+    width = 1 << (size - 1).bit_length()
+    level = np.concatenate([level, np.ones(width - size, dtype=np.int64)])
+    levels = [level]
+    while len(level) > 1:
+        level = level[0::2] * level[1::2] % m
+        levels.append(level)
+    try:
+        inverse = np.array([mod_inverse(int(level[0]), m)], dtype=np.int64)
+    except ValueError:
+        raise not_invertible(values.ravel(), m)
+    for level in reversed(levels[:-1]):
+        #the inverse of a left child is the inverse of the pair times the right one
+        children = np.empty(len(level), dtype=np.int64)
+        children[0::2] = inverse * level[1::2] % m
+        children[1::2] = inverse * level[0::2] % m
+        inverse = children
+    return inverse[:size].reshape(shape)
+
 if __name__ == "__main__":
     a = int(raw_input("a: "))
-    b = 2**16+1
-
-    if a > 1 and a < 2**16 + 1:
-        eqs = euclid_for(a, b)
-        tup = euclid_back(eqs)
-        print
-        print "GCD(%d, %d) = %d = %d x %d + %d x %d" % \
-            (a, b, eqs[-1][2], tup[1], tup[2], tup[3], tup[4])
-        prime = tup[1]
-        if prime < 0:
-             prime += 2**16+1
-        assert(prime * tup[2] % tup[4] == 1 and prime > 1 and prime < 2**16+1)
-        print "(%d)(%d) = 1" % (a, prime)
\ No newline at end of file
+    b = int(sys.argv[1]) if len(sys.argv) > 1 else 2**16+1
+
+    g, x, y = xgcd(a, b)
+    print
+    print "GCD(%d, %d) = %d = %d x %d + %d x %d" % (a, b, g, x, a, y, b)
+    if g == 1:
+        prime = x % b
+        assert(prime * a % b == 1 % b)
+        print "(%d)(%d) = 1" % (a, prime)
@@ -0,0 +1,126 @@
+"""
+LEHMER GCD
+GCD and extended GCD of integers with thousands of digits.
+
+Euclid's algorithm does one full bignum division per quotient.  Lehmer's
+algorithm runs Euclid on the leading WORD bits of both operands only, as
+small ints, while the remainders keep more than WORD/2 bits,
+where its quotients almost always agree with those of the full operands,
+and collects them in a 2x2 matrix [[A, B], [C, D]].  One matrix product
+with the full operands then replaces the whole run of divisions.  The
+matrix has determinant +-1, so even a wrongly guessed quotient keeps the
+gcd; a step that fails to shrink the operands is redone as one full
+division.  Once the operands fit in one word, the binary GCD (shifts and
+subtractions) finishes.
+
+gcd.py and coprimes.py dispatch here for operands of LEHMER_CUTOFF bits or
+more (LEHMER_XGCD_CUTOFF with cofactors, whose updates Lehmer batches too);
+below that, plain Euclid is faster in Python, whose loop overhead eats most
+of what the matrix products save.  The binary GCD alone is slower than
+Euclid at every size in Python.  bench_gcd.py times
+these against the recursion and the standard library gcd.
+
+EXAMPLES:
+
+>>> from lehmer import lehmer_gcd, lehmer_xgcd, binary_gcd
+>>> a, b = 3 ** 1000 * 2 ** 10, 6 ** 700
+>>> lehmer_gcd(a, b) == 2 ** 10 * 3 ** 700
+True
+>>> g, x, y = lehmer_xgcd(a, b)
+>>> x * a + y * b == g
+True
+>>> binary_gcd(240, 46)
+2
+"""
+
+#bits of the leading words the quotients are guessed from
+WORD = 120
+
+#operand sizes in bits from which Lehmer's algorithm beats plain Euclid,
+#without and with cofactors (see bench_gcd.py)
+LEHMER_CUTOFF = 6144
+LEHMER_XGCD_CUTOFF = 1024
+
+def binary_gcd(u, v):
+    """
+    returns gcd(u, v) >= 0 by Stein's binary algorithm
+    """
+    u, v = abs(u), abs(v)
+    if not u or not v:
+        return u | v
+    #common factors of two, then odd u and v
+    shift = ((u | v) & -(u | v)).bit_length() - 1
+    u >>= (u & -u).bit_length() - 1
+    while v:
+        v >>= (v & -v).bit_length() - 1
+        if u > v:
+            u, v = v, u
+        v -= u
+    return u << shift
+
+def lehmer_step(u, v):
+    """
+    returns matrix (A, B, C, D) of the quotients of u >= v guessed from
+    their leading WORD bits, the identity if none can be guessed
+    """
+    shift = max(u.bit_length() - WORD, 0)
+    x, y = u >> shift, v >> shift
+    half = WORD // 2
+    A, B, C, D = 1, 0, 0, 1
+    while y >> half:
+        q = x // y
+        x, y = y, x - q * y
+        A, C = C, A - q * C
+        B, D = D, B - q * D
+    return A, B, C, D
+
+def lehmer_gcd(u, v):
+    """
+    returns gcd(u, v) >= 0 by Lehmer's algorithm
+    """
+    u, v = abs(u), abs(v)
+    if u < v:
+        u, v = v, u
+    while v >> WORD:
+        A, B, C, D = lehmer_step(u, v)
+        x, y = abs(A * u + B * v), abs(C * u + D * v)
+        if B and max(x, y) < u:
+            u, v = (x, y) if x > y else (y, x)
+        else:
+            u, v = v, u % v
+    return binary_gcd(u, v)
+
+def lehmer_xgcd(a, b):
+    """
+    returns (g, x, y) with g = gcd(a, b) >= 0 and x*a + y*b = g, by Lehmer's
+    algorithm tracking the cofactor of a only; y comes from one division
+    """
+    u, v = abs(a), abs(b)
+    #s, t: cofactors of |a| in u and v
+    s, t = 1, 0
+    if u < v:
+        u, v = v, u
+        s, t = 0, 1
+    while v >> WORD:
+        A, B, C, D = lehmer_step(u, v)
+        x, y = A * u + B * v, C * u + D * v
+        if B and max(abs(x), abs(y)) < u:
+            s, t = A * s + B * t, C * s + D * t
+            if x < 0:
+                x, s = -x, -s
+            if y < 0:
+                y, t = -y, -t
+            u, v, s, t = (x, y, s, t) if x > y else (y, x, t, s)
+        else:
+            q, r = divmod(u, v)
+            u, v = v, r
+            s, t = t, s - q * t
+    while v:
+        q, r = divmod(u, v)
+        u, v = v, r
+        s, t = t, s - q * t
+    if a < 0:
+        s = -s
+    if not b:
+        return u, s, 0
+    return u, s, (u - s * a) // b
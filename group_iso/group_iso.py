@@ -1,4 +1,13 @@
-from itertools import combinations, product
+import os
+import sys
+import numpy as np
+from linear_groups import linear_group
+from projective import projective_action
+from subgroups import subgroup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cycle_products"))
+from permutation import perm
+from perm_batch import signs
 
 #nxn matrix
 n = 2
@@ -9,56 +18,51 @@ q = 5
 #det
 d = 1
 
-#elements in \ZZ_5
-elements = [-2, -1, 0, 1, 2]
-basis = [c for c in combinations(elements, n**n)]
-
-#matrix elements in SL(2, \ZZ_5)
-matrices = []
-for b in basis:
-	for p in product(b, repeat=n**n):
-		#det(p) = d for SL
-		if (p[0]*p[3]-p[1]*p[2])%5 == d:
-			matrices.append(p)
-
-matrices = list(set(matrices))
+#matrix elements in SL(2, \ZZ_5), det(p) = d for SL, built row by row
+#with entries written as -2 ... 2
+SL = linear_group("SL", n, q)
+elements = SL.elements()
+matrices = [tuple(p) for p in (elements.reshape(-1, n*n).astype(int) + q//2) % q - q//2]
 assert((q**2 - 1)*(q**2 - q)/(q-1) == len(matrices))
 
-#2-component vectors over \ZZ_5
-line1 = [(1,0),(2,0),(-2,0),(-1,0)] #y = 0
-line2 = [(0,1),(0,2),(0,-2),(0,-1)] #x = 0
-line3 = [(1,1),(2,2),(-2,-2),(-1,-1)] #y = x
-line4 = [(1,2),(2,-1),(-2,1),(-1,-2)] #y = 2x
-line5 = [(1,-2),(2,1),(-2,-1),(-1,2)] #y = -2x
-line6 = [(1,-1),(2,-2),(-2,2),(-1,1)] #y = -x
-
-def line_perm(m_on_line, line_x):
-	return True if m_on_line in line_x else False
-
-#subgroup G \in SL(2, \ZZ_5) s.t. G \cong S_3, cosets
-for m in matrices:
-
-	#effect of m on different vector subspaces
-	Mline1 = (m[0] * line1[0][0] + m[1] * line1[0][1], m[2] * line1[0][0] + m[3] * line1[0][1])
-	Mline2 = (m[0] * line2[0][0] + m[1] * line2[0][1], m[2] * line2[0][0] + m[3] * line2[0][1])
-	Mline3 = (m[0] * line3[0][0] + m[1] * line3[0][1], m[2] * line3[0][0] + m[3] * line3[0][1])
-	Mline4 = (m[0] * line4[0][0] + m[1] * line4[0][1], m[2] * line4[0][0] + m[3] * line4[0][1])
-	Mline5 = (m[0] * line5[0][0] + m[1] * line5[0][1], m[2] * line5[0][0] + m[3] * line5[0][1])
-	Mline6 = (m[0] * line6[0][0] + m[1] * line6[0][1], m[2] * line6[0][0] + m[3] * line6[0][1])
-
-	if Mline1 in line2 and Mline2 in line3 and Mline3 in line1:
-		print "(123)", m
-
-	if Mline1 in line3 and Mline3 in line2 and Mline2 in line1:
-		print "(132)", m
-
-	if Mline1 in line2 and Mline3 in line3 and Mline2 in line1:
-		print "(12)(3)", m
-
-	if Mline2 in line3 and Mline1 in line1 and Mline3 in line2:
-		print "(1)(23)", m
-
-	if Mline2 in line2 and Mline1 in line3 and Mline3 in line1:
-		print "(2)(13)", m
-
-
+#SL(2, \ZZ_5) permuting the 6 lines through 0 of \ZZ_5^2, numbered as
+#X.points: (0,1) x = 0, (1,0) y = 0, (1,1) y = x, (1,2), (1,3), (1,4)
+X = projective_action(SL)
+P = X.permutations(elements)
+
+#lines y = 0, x = 0, y = x as 1, 2, 3
+lines = [1, 0, 2]
+
+#subgroup G \in SL(2, \ZZ_5) s.t. G \cong S_3, cosets: the elements
+#permuting lines 1, 2, 3 among themselves, with the permutation they
+#induce written with its fixed lines
+stabilizer = []
+for A, m, p in zip(elements, matrices, P):
+	images = [lines.index(i) if i in lines else None for i in p[lines]]
+	if None not in images:
+		stabilizer.append(A)
+	if None not in images and images != range(3):
+		cycles = perm(images).cycles(fixed = True)
+		print "".join("(" + "".join(str(i) for i in c) + ")" for c in cycles), m
+
+#the stabilizer of lines 1, 2, 3 has order 12 (S_3 on the lines, kernel
+#+-I), and its left cosets gH send the three lines to the 10 other triples
+H = subgroup(SL, stabilizer)
+assert(H.order() == 12)
+representatives, cosets = H.cosets()
+assert(len(representatives) == 10)
+for g in representatives:
+	print "coset", tuple((g.reshape(-1).astype(int) + q//2) % q - q//2)
+
+#PSL(2, \ZZ_5) \cong A_5: faithful on the 6 lines, so a group of order 60,
+#and its 24 elements of order 5 make 6 Sylow 5-subgroups, so it is simple
+report = projective_action(linear_group("PSL", 2, 5)).summary()
+assert(len(report["kernel"]) == 1 and report["image_size"] == 60)
+assert(report["orders"][5] == 24)
+
+#PSL(2, \FF_4) \cong A_5: faithful on the 5 lines of \FF_4^2 by even
+#permutations, so its image is all 60 of A_5
+X4 = projective_action(linear_group("PSL", 2, 4))
+report = X4.summary()
+assert(X4.degree == 5 and len(report["kernel"]) == 1 and report["image_size"] == 60)
+assert(all((signs(P4) == 1).all() for _, P4 in X4.blocks()))
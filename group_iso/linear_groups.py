@@ -0,0 +1,311 @@
+"""
+LINEAR GROUPS OVER FINITE FIELDS
+Enumerates GL(n, q), SL(n, q), PGL(n, q) and PSL(n, q) for any n and prime
+power q, each element exactly once, and samples them uniformly.
+
+Matrices are built row by row.  Row k of an invertible matrix is any
+vector outside the span of rows 0...k-1, which holds q^k vectors, so a
+prefix of k rows has q^n - q^k continuations and no candidate is ever
+rejected.  For SL the determinant is linear in the last row,
+det = sum x_j C_j with C_j the cofactors of the first n-1 rows, so the
+last rows with det = 1 form an affine hyperplane of q^(n-1) vectors,
+solved for the first coordinate with C_j != 0.  The projective groups
+take one representative of each class of scalar multiples:
+    * PGL: the first nonzero entry of the first row is 1
+    * PSL: multiplying by the d = gcd(n, q-1) scalars of SL permutes the
+      first nonzero entry of the first row, which is taken least among
+      them
+Prefixes are extended for many matrices at once with NumPy, in blocks of
+at most BLOCK_ELEMENTS finished matrices, so groups like SL(3, 7)
+(5.6 million elements) stream in bounded memory.
+
+Entries are packed field elements 0...q-1 (see field_array), in the
+smallest unsigned type; vectors pack as base-q integers, first
+coordinate most significant, and pack turns matrices into int64 keys.
+
+TO RUN:
+>>> from linear_groups import linear_group
+>>> G = linear_group("SL", 2, 5)
+>>> G.order(), len(G.elements())
+(120, 120)
+>>> linear_group("PSL", 2, 5).order(), linear_group("PGL", 3, 4).order()
+(60, 60480)
+>>> A = linear_group("GL", 3, 7).random(4, seed=1)
+>>> linear_group("GL", 3, 7).M.det(A).all()
+True
+"""
+
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+from fractions import gcd
+from itertools import product
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finite_fields"))
+from field_matrix import field_matrix
+
+#largest block of matrices built at once
+BLOCK_ELEMENTS = 1 << 18
+
+KINDS = ("GL", "SL", "PGL", "PSL")
+
+class linear_group(object):
+    def __init__(self, kind = "SL", n = 2, q = 5):
+        """
+        kind : str
+            "GL", "SL", "PGL" or "PSL"
+
+        n, q : int
+            matrix size and field order, q a prime power
+
+        M, F : field_matrix, field_array
+            matrix and elementwise arithmetic of GF(q)
+
+        vectors : np.array
+            (q^n, n) coordinates of every packed vector
+
+        scalars : np.array
+            scalars of SL(n, q), the d-th roots of unity, d = gcd(n, q-1)
+        """
+        if kind not in KINDS:
+            raise ValueError("kind must be one of %s" % ", ".join(KINDS))
+        if n < 1:
+            raise ValueError("matrix size must be positive")
+        self.kind = kind
+        self.n = n
+        self.M = field_matrix(str(q))
+        self.F = self.M.F
+        self.q = self.F.q
+        self.special = kind in ("SL", "PSL")
+        self.projective = kind in ("PGL", "PSL")
+        self.dtype = np.uint8 if self.q <= 256 else np.uint16
+        places = self.q ** np.arange(n - 1, -1, -1, dtype=np.int64)
+        self.places = places
+        self.vectors = (np.arange(self.q ** n, dtype=np.int64)[:, None] // places) % self.q
+        d = gcd(n, self.q - 1)
+        self.scalars = self.F.exp[np.arange(d) * ((self.q - 1) // d)]
+
+    def order(self):
+        """
+        returns number of elements
+        """
+        q, n = self.q, self.n
+        size = 1
+        for i in xrange(n):
+            size *= q ** n - q ** i
+        if self.special or self.projective:
+            size //= q - 1
+        if self.kind == "PSL":
+            size //= gcd(n, q - 1)
+        return size
+
+    def choices(self, k):
+        """
+        returns number of ways to extend a k-row prefix by one row
+        """
+        q, n = self.q, self.n
+        if self.special and k == n - 1:
+            return q ** (n - 1)
+        if k == 0 and self.kind == "PGL":
+            return (q ** n - 1) // (q - 1)
+        if k == 0 and self.kind == "PSL":
+            return (q ** n - 1) // len(self.scalars)
+        return q ** n - q ** k
+
+    def leading(self, V):
+        """
+        returns first nonzero entry of every row of V, 0 for zero rows
+        """
+        nonzero = V != 0
+        first = np.argmax(nonzero, axis=-1)
+        return np.where(nonzero.any(axis=-1), np.take_along_axis(V, first[..., None], -1)[..., 0], 0)
+
+    def first_rows(self):
+        """
+        returns mask of the packed vectors allowed as first row
+        """
+        lead = self.leading(self.vectors)
+        if self.kind == "PGL":
+            return lead == 1
+        if self.kind == "PSL":
+            #least of the leading entries lambda a over the scalars lambda
+            orbit = self.F.mult(lead[:, None], self.scalars[None, :])
+            return (lead != 0) & (lead == orbit.min(axis=1))
+        return lead != 0
+
+    def span(self, prefix):
+        """
+        returns (N, q^k) packed vectors spanned by each prefix of k rows
+        """
+        N, k = prefix.shape
+        F = self.F
+        coefficients = np.array(list(product(range(self.q), repeat=k)), dtype=np.int64).reshape(self.q ** k, k)
+        rows = self.vectors[prefix]
+        combos = F.sum(F.mult(coefficients[None, :, :, None], rows[:, None, :, :]), axis=2)
+        return combos.dot(self.places)
+
+    def last_rows(self, prefix):
+        """
+        returns (N, q^(n-1)) packed last rows completing each prefix of n-1
+        rows to determinant 1
+        """
+        F, M = self.F, self.M
+        N, k = prefix.shape
+        n = self.n
+        rows = self.vectors[prefix]
+        #signed cofactors of the last row
+        cofactors = np.ones((N, n), dtype=np.int64)
+        if n > 1:
+            for j in xrange(n):
+                minor = np.delete(rows, j, axis=2)
+                cofactors[:, j] = M.det(minor)
+                if (n - 1 + j) % 2:
+                    cofactors[:, j] = F.neg(cofactors[:, j])
+        pivot = np.argmax(cofactors != 0, axis=1)
+        free = np.array(list(product(range(self.q), repeat=n - 1)), dtype=np.int64).reshape(self.q ** (n - 1), n - 1)
+        others = np.array([[j for j in xrange(n) if j != p] for p in xrange(n)], dtype=np.int64)[pivot]
+        X = np.zeros((N, len(free), n), dtype=np.int64)
+        X[np.arange(N)[:, None, None], np.arange(len(free))[None, :, None], others[:, None, :]] = free[None]
+        partial = F.sum(F.mult(X, cofactors[:, None, :]), axis=2)
+        lead = cofactors[np.arange(N), pivot]
+        X[np.arange(N), :, pivot] = F.mult(F.sub(np.ones_like(partial), partial), F.inverse(lead)[:, None])
+        return X.dot(self.places)
+
+    def extend(self, prefix):
+        """
+        returns (N * choices(k), k+1) prefixes one row longer
+        """
+        N, k = prefix.shape
+        if self.special and k == self.n - 1:
+            rows = self.last_rows(prefix)
+            return np.concatenate([np.repeat(prefix, rows.shape[1], axis=0), rows.reshape(-1, 1)], axis=1)
+        allowed = np.ones((N, self.q ** self.n), dtype=bool)
+        allowed[np.arange(N)[:, None], self.span(prefix)] = False
+        if k == 0:
+            allowed &= self.first_rows()[None, :]
+        index, rows = np.nonzero(allowed)
+        return np.concatenate([prefix[index], rows[:, None]], axis=1)
+
+    def grow(self, prefix):
+        """
+        returns generator of blocks of packed complete matrices extending
+        the prefixes
+        """
+        N, k = prefix.shape
+        if k == self.n:
+            yield prefix
+            return
+        remaining = 1
+        for i in xrange(k, self.n):
+            remaining *= self.choices(i)
+        chunk = max(BLOCK_ELEMENTS // remaining, 1)
+        for start in xrange(0, N, chunk):
+            for block in self.grow(self.extend(prefix[start:start + chunk])):
+                yield block
+
+    def blocks(self):
+        """
+        returns generator of (m, n, n) arrays of elements, every element
+        in exactly one block
+        """
+        for block in self.grow(np.zeros((1, 0), dtype=np.int64)):
+            yield self.vectors[block].astype(self.dtype)
+
+    def elements(self):
+        """
+        returns (order, n, n) array of all elements
+        """
+        return np.concatenate(list(self.blocks()))
+
+    def __iter__(self):
+        for block in self.blocks():
+            for A in block:
+                yield A
+
+    def canonical(self, A):
+        """
+        returns representatives of invertible matrices A in the group: the
+        projective groups scale each by the scalar its class is listed by
+        """
+        A = np.asarray(A, dtype=np.int64)
+        if not self.projective:
+            return A
+        F = self.F
+        #a zero first row (singular A) is left as it is
+        lead = self.leading(A[..., 0, :])
+        lead = np.where(lead == 0, 1, lead)
+        if self.kind == "PGL":
+            scale = F.inverse(lead)
+        else:
+            orbit = F.mult(lead[..., None], self.scalars)
+            scale = self.scalars[np.argmin(orbit, axis=-1)]
+        return F.mult(A, scale[..., None, None])
+
+    def contains(self, A):
+        """
+        returns True where A is an element as listed
+        """
+        A = np.asarray(A, dtype=np.int64)
+        det = self.M.det(A)
+        inside = det == 1 if self.special else det != 0
+        if self.projective:
+            inside &= (self.canonical(A) == A).all(axis=(-2, -1))
+        return inside
+
+    def mult(self, A, B):
+        """
+        returns product A B, broadcasting over stacks
+        """
+        return self.canonical(self.M.dot(A, B))
+
+    def inverse(self, A):
+        """
+        returns inverse of A, or of a stack
+        """
+        return self.canonical(self.M.inverse(A))
+
+    def identity(self):
+        """
+        returns identity matrix
+        """
+        return self.M.identity(self.n)
+
+    def random(self, k, seed = None):
+        """
+        returns (k, n, n) uniformly random elements: uniform invertible
+        matrices by rejection, for SL with the first row divided by the
+        determinant, for the projective groups made canonical
+        """
+        rng = np.random.RandomState(seed)
+        F, n = self.F, self.n
+        found = []
+        count = 0
+        while count < k:
+            A = rng.randint(0, self.q, size=(2 * (k - count) + 4, n, n)).astype(np.int64)
+            det = self.M.det(A)
+            A, det = A[det != 0], det[det != 0]
+            if self.special:
+                A[:, 0, :] = F.mult(A[:, 0, :], F.inverse(det)[:, None])
+            found.append(A)
+            count += len(A)
+        return self.canonical(np.concatenate(found)[:k]).astype(self.dtype)
+
+    def pack(self, A):
+        """
+        returns int64 key of every matrix, its entries read as base-q digits
+        raises ValueError if q^(n^2) overflows int64
+        """
+        if self.q ** (self.n * self.n) >= 2 ** 63:
+            raise ValueError("Matrices of GF(%d)^%dx%d do not pack into int64" % (self.q, self.n, self.n))
+        A = np.asarray(A, dtype=np.int64)
+        places = self.q ** np.arange(self.n * self.n - 1, -1, -1, dtype=np.int64)
+        return A.reshape(A.shape[:-2] + (-1,)).dot(places)
+
+    def unpack(self, keys):
+        """
+        returns matrices of int64 keys from pack
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        places = self.q ** np.arange(self.n * self.n - 1, -1, -1, dtype=np.int64)
+        return ((keys[..., None] // places) % self.q).reshape(keys.shape + (self.n, self.n)).astype(self.dtype)
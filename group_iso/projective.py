@@ -0,0 +1,123 @@
+"""
+PROJECTIVE ACTION
+Permutation representation of a matrix group on the points of projective
+space P^(n-1)(F_q), the lines through 0 of F_q^n.
+
+Each line is named by its canonical vector, the one whose first nonzero
+entry is 1, and numbered in the order of its packed code (see
+linear_groups); one lookup table from every packed vector to the number
+of its line replaces any search, so the images of all points under a
+stack of k matrices, k (q^n - 1)/(q - 1) vectors A v, are numbered with
+one matrix product and one fancy index.
+
+Rows of the result are zero-based permutations as in perm_batch, and the
+action is a homomorphism, AB acting as B then A like compose(A, B).
+summary runs over a whole group, block by block: its kernel (the scalar
+matrices it contains), the size of the image and the number of elements
+of every cycle type and element order.
+
+TO RUN:
+>>> from linear_groups import linear_group
+>>> from projective import projective_action
+>>> X = projective_action(linear_group("PSL", 2, 5))
+>>> X.points.tolist()
+[[0, 1], [1, 0], [1, 1], [1, 2], [1, 3], [1, 4]]
+>>> report = X.summary()
+>>> len(report["kernel"]), report["image_size"], sorted(report["orders"].items())
+(1, 60, [(1, 1), (2, 15), (3, 20), (5, 24)])
+"""
+
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+from collections import Counter
+from fractions import gcd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cycle_products"))
+from perm_batch import cycle_types, identity
+
+#matrices acted out at once, bounding the (k, points, n) images
+BLOCK_MATRICES = 1 << 14
+
+class projective_action(object):
+    def __init__(self, group):
+        """
+        group : linear_group
+            matrices acting on column vectors, v -> A v
+
+        points : np.array
+            (m, n) canonical vectors of the m = (q^n - 1)/(q - 1) lines
+
+        index : np.array
+            (q^n,) number of the line of every packed vector, -1 for 0
+        """
+        self.group = group
+        F = group.F
+        vectors = group.vectors
+        lead = group.leading(vectors)
+        canonical = lead == 1
+        self.points = vectors[canonical]
+        codes = np.nonzero(canonical)[0]
+        self.index = np.full(len(vectors), -1, dtype=np.int64)
+        nonzero = np.nonzero(lead)[0]
+        scaled = F.mult(vectors[nonzero], F.inverse(lead[nonzero])[:, None])
+        self.index[nonzero] = np.searchsorted(codes, scaled.dot(group.places))
+        self.degree = len(self.points)
+
+    def permutations(self, A):
+        """
+        returns (k, m) zero-based permutations of the points under the
+        matrices of a (k, n, n) stack, or (m,) for one matrix
+        """
+        F = self.group.F
+        A = np.asarray(A, dtype=np.int64)
+        single = A.ndim == 2
+        A = A.reshape((-1,) + A.shape[-2:])
+        P = np.empty((len(A), self.degree), dtype=np.int64)
+        for start in xrange(0, len(A), BLOCK_MATRICES):
+            block = A[start:start + BLOCK_MATRICES]
+            #images[k, i] = A_k points[i], an integer product mod p over a prime field
+            if F.n == 1:
+                images = np.matmul(block, self.points.T).swapaxes(1, 2) % F.p
+            else:
+                images = F.sum(F.mult(block[:, None, :, :], self.points[None, :, None, :]), axis=-1)
+            P[start:start + len(block)] = self.index[images.dot(self.group.places)]
+        return P[0] if single else P
+
+    def blocks(self):
+        """
+        returns generator of (elements, permutations) over the group's blocks
+        """
+        for block in self.group.blocks():
+            yield block, self.permutations(block)
+
+    def summary(self):
+        """
+        returns dict of the action of the whole group with keys
+            kernel : (j, n, n) elements fixing every point
+            image_size : number of distinct permutations, |G| / |kernel|
+            cycle_types : (key, value) of tuple of cycle lengths, decreasing,
+                          fixed points included : number of elements
+            orders : (key, value) of element order in the image : number
+                     of elements
+        """
+        kernel = []
+        types = Counter()
+        for block, P in self.blocks():
+            kernel.append(block[(P == identity(1, self.degree)).all(axis=1)])
+            #histogram rows compared as raw bytes sort far faster than np.unique(axis=0)
+            H = np.ascontiguousarray(cycle_types(P, False))
+            _, first, counts = np.unique(H.view(np.dtype((np.void, H.strides[0]))).ravel(),
+                                         return_index=True, return_counts=True)
+            for row, count in zip(H[first].tolist(), counts.tolist()):
+                types[tuple(L for L in xrange(len(row) - 1, 0, -1) for _ in xrange(row[L]))] += count
+        kernel = np.concatenate(kernel)
+        orders = Counter()
+        for cycle_type, count in types.items():
+            order = 1
+            for L in set(cycle_type):
+                order = order * L // gcd(order, L)
+            orders[order] += count
+        return {"kernel": kernel, "image_size": self.group.order() // len(kernel),
+                "cycle_types": dict(types), "orders": dict(orders)}
@@ -0,0 +1,348 @@
+"""
+SUBGROUPS AND COSETS
+Finds the subgroups of a matrix group (see linear_groups) generated by a
+few elements, and lists left, right and double cosets.
+
+Matrices are handled by their int64 keys from linear_group.pack, so a
+subgroup is a set of integers: closure grows the generated group from
+the identity by multiplying the newest elements by every generator, one
+NumPy product per round, and keeps only the products not yet in the set,
+one hash lookup each.
+
+find_subgroups searches generator tuples for a target order, a
+presentation, or both.  A presentation names the generators a, b, c, ...
+and lists relators, words equal to the identity, with capital letters
+for inverses:
+    S_3 = <a, b | aa, bbb, abab>
+Tuples satisfying every relator generate a quotient of the presented
+group, so with its order given as well the subgroups found are
+isomorphic to it.  Each generator is first restricted to the elements
+satisfying its one-letter relators (and g^order = 1 for an order), then
+tuples are checked against the whole presentation many at a time and
+only the survivors are closed.  Small groups are searched exhaustively;
+samples draws random tuples instead.  The tuples are split into tasks
+over a process pool, which rebuilds the group once per worker.
+
+cosets labels each element g by the least key of gH (or Hg), which names
+its coset, and double_cosets labels g by the least key of HgK; both walk
+the group in blocks.
+
+TO RUN:
+>>> from linear_groups import linear_group
+>>> from subgroups import find_subgroups, subgroup
+>>> G = linear_group("PSL", 2, 5)
+>>> found = find_subgroups(G, order=6, relators=["aa", "bbb", "abab"], processes=1)
+>>> len(found), [H.order() for H in found[:3]]
+(10, [6, 6, 6])
+>>> H = found[0]
+>>> reps, members = H.cosets()
+>>> len(reps), members.shape
+(10, (10, 6))
+>>> K = find_subgroups(G, order=5, rank=1, processes=1)[0]
+>>> [len(D) for D in H.double_cosets(K)[1]]
+[30, 30]
+"""
+
+from __future__ import print_function
+import itertools
+import multiprocessing
+import numpy as np
+from linear_groups import linear_group
+
+#matrix products formed at once by closure, cosets and the tuple checks
+BLOCK_PRODUCTS = 1 << 16
+
+def parse_relator(word, letters = "abcdefghijklmnopqrstuvwxyz"):
+    """
+    returns list of (generator number, exponent 1 or -1) of a word such
+    as "abAB"
+    raises ValueError for characters that are not letters
+    """
+    word = word.replace(" ", "").replace("*", "")
+    if not word.isalpha():
+        raise ValueError("Relator %r is not a word in letters" % word)
+    return [(letters.index(c.lower()), 1 if c.islower() else -1) for c in word]
+
+def identity(group):
+    """
+    returns the identity as listed in the group (a scalar matrix for PSL)
+    """
+    return group.canonical(group.identity()).astype(group.dtype)
+
+def evaluate(group, word, generators):
+    """
+    returns (N, n, n) values of a parsed word at N tuples of generators,
+    generators[j] the (N, n, n) stack of the j-th
+    """
+    N = len(generators[0])
+    inverses = {}
+    value = np.repeat(identity(group)[None].astype(np.int64), N, axis=0)
+    for j, sign in word:
+        if sign < 0 and j not in inverses:
+            inverses[j] = group.inverse(generators[j])
+        value = group.mult(value, generators[j] if sign > 0 else inverses[j])
+    return value
+
+def power(group, A, e):
+    """
+    returns A^e for a stack A and e >= 0, by square and multiply
+    """
+    result = np.repeat(identity(group)[None].astype(np.int64), len(A), axis=0)
+    base = np.asarray(A, dtype=np.int64)
+    while e:
+        if e & 1:
+            result = group.mult(result, base)
+        base = group.mult(base, base)
+        e >>= 1
+    return result
+
+def closure(group, generators, limit = None):
+    """
+    returns sorted int64 keys of the subgroup generated by a stack of
+    matrices, or None as soon as it has more than limit elements
+    """
+    generators = np.asarray(generators, dtype=np.int64).reshape((-1, group.n, group.n))
+    start = group.pack(identity(group))
+    seen = set([int(start)])
+    frontier = np.array([start], dtype=np.int64)
+    step = max(BLOCK_PRODUCTS // max(len(generators), 1), 1)
+    while len(frontier):
+        fresh = []
+        for i in xrange(0, len(frontier), step):
+            A = group.unpack(frontier[i:i + step]).astype(np.int64)
+            keys = group.pack(group.mult(A[:, None], generators[None]))
+            for key in np.unique(keys).tolist():
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append(key)
+            if limit is not None and len(seen) > limit:
+                return None
+        frontier = np.array(fresh, dtype=np.int64)
+    return np.sort(np.fromiter(seen, dtype=np.int64, count=len(seen)))
+
+class subgroup(object):
+    def __init__(self, group, generators = None, keys = None):
+        """
+        group : linear_group
+            the whole group, whose elements are packed into keys
+
+        generators : np.array
+            (r, n, n) matrices generating the subgroup, or None with keys
+
+        keys : np.array
+            sorted int64 keys of the elements
+
+        members : set
+            the keys again, for membership in one lookup
+        """
+        self.group = group
+        self.generators = None if generators is None else np.asarray(generators).astype(group.dtype)
+        self.keys = closure(group, generators) if keys is None else np.sort(np.asarray(keys, dtype=np.int64))
+        self.members = set(self.keys.tolist())
+
+    def order(self):
+        """
+        returns number of elements
+        """
+        return len(self.keys)
+
+    def elements(self):
+        """
+        returns (order, n, n) array of the elements, in key order
+        """
+        return self.group.unpack(self.keys)
+
+    def contains(self, A):
+        """
+        returns True where the matrices of A are elements
+        """
+        keys = self.group.pack(self.group.canonical(A))
+        inside = np.array([key in self.members for key in np.ravel(keys).tolist()], dtype=bool)
+        return bool(inside[0]) if np.ndim(keys) == 0 else inside.reshape(np.shape(keys))
+
+    def labels(self, A, left = None, right = None):
+        """
+        returns (k,) least key of left * A * right over every element of
+        the stacks left and right, for a (k, n, n) stack A
+        """
+        G = self.group
+        A = np.asarray(A, dtype=np.int64)
+        I = identity(G)[None].astype(np.int64)
+        left = I if left is None else np.asarray(left, dtype=np.int64)
+        right = I if right is None else np.asarray(right, dtype=np.int64)
+        inner = G.mult(A[:, None], right[None])
+        keys = np.full(len(A), np.iinfo(np.int64).max, dtype=np.int64)
+        for L in left:
+            keys = np.minimum(keys, G.pack(G.mult(L, inner)).min(axis=1))
+        return keys
+
+    def walk(self, left = None, right = None):
+        """
+        returns generator of (block, labels) over the blocks of the whole
+        group, labels from labels(block, left, right)
+        """
+        size = (1 if left is None else len(left)) * (1 if right is None else len(right))
+        step = max(BLOCK_PRODUCTS // size, 1)
+        for block in self.group.blocks():
+            for i in xrange(0, len(block), step):
+                yield block[i:i + step], self.labels(block[i:i + step], left, right)
+
+    def cosets(self, side = "left"):
+        """
+        returns (representatives, members): (c, n, n) the first element of
+        each of the c cosets gH (or Hg for side "right") in the order the
+        group lists them, and (c, |H|) their sorted keys
+        """
+        if side not in ("left", "right"):
+            raise ValueError("side must be left or right")
+        H = self.elements().astype(np.int64)
+        G = self.group
+        seen = set()
+        representatives, members = [], []
+        for block, labels in self.walk(right=H) if side == "left" else self.walk(left=H):
+            for i, label in enumerate(labels.tolist()):
+                if label not in seen:
+                    seen.add(label)
+                    g = block[i].astype(np.int64)
+                    coset = G.mult(g, H) if side == "left" else G.mult(H, g)
+                    representatives.append(block[i])
+                    members.append(np.sort(G.pack(coset)))
+        return np.array(representatives), np.array(members)
+
+    def double_cosets(self, other = None):
+        """
+        returns (representatives, members) of the double cosets H g K of
+        this subgroup H and other K (H again by default): the first element
+        of each in the order the group lists them, and a list of their
+        sorted keys, of |H||K| / |H n gKg^-1| elements each
+        """
+        other = self if other is None else other
+        H = self.elements().astype(np.int64)
+        K = other.elements().astype(np.int64)
+        G = self.group
+        seen = set()
+        representatives, members = [], []
+        for block, labels in self.walk(left=H, right=K):
+            for i, label in enumerate(labels.tolist()):
+                if label not in seen:
+                    seen.add(label)
+                    g = block[i].astype(np.int64)
+                    representatives.append(block[i])
+                    members.append(np.unique(G.pack(G.mult(G.mult(H[:, None], g), K[None]))))
+        return np.array(representatives), members
+
+#state of a search, set once per worker by start_search
+_search = {}
+
+def start_search(spec, candidates, words, order):
+    """
+    sets the group (rebuilt from its kind, n, q), the candidate keys of
+    every generator, the parsed relators and the target order
+    """
+    _search.clear()
+    _search.update(group=linear_group(*spec), candidates=candidates, words=words, order=order)
+
+def search_task(task):
+    """
+    returns list of sorted key arrays of the subgroups generated by the
+    tuples of one task that satisfy every relator (and have the target
+    order): ("range", start, stop) takes the tuples whose first generator
+    is candidates[0][start:stop], ("sample", seed, count) random tuples
+    """
+    G, candidates = _search["group"], _search["candidates"]
+    words, order = _search["words"], _search["order"]
+    if task[0] == "range":
+        first = candidates[0][task[1]:task[2]]
+        grid = np.array(list(itertools.product(xrange(len(first)), *[xrange(len(c)) for c in candidates[1:]])),
+                        dtype=np.int64).reshape(-1, len(candidates))
+        tuples = np.stack([first[grid[:, 0]]] + [c[grid[:, j + 1]] for j, c in enumerate(candidates[1:])], axis=1)
+    else:
+        rng = np.random.RandomState(task[1])
+        tuples = np.stack([c[rng.randint(0, len(c), size=task[2])] for c in candidates], axis=1)
+    one = G.pack(identity(G))
+    found = []
+    #subgroups found so far holding each key
+    owners = {}
+    step = max(BLOCK_PRODUCTS // max(sum(len(w) for w in words), 1), 1)
+    for i in xrange(0, len(tuples), step):
+        chunk = tuples[i:i + step]
+        generators = [G.unpack(chunk[:, j]).astype(np.int64) for j in xrange(chunk.shape[1])]
+        good = np.ones(len(chunk), dtype=bool)
+        for word in words:
+            good &= G.pack(evaluate(G, word, generators)) == one
+        for keys in chunk[good].tolist():
+            #inside a subgroup of the target order already found, the tuple generates it or less
+            if order is not None and set.intersection(*[owners.get(k, set()) for k in keys]):
+                continue
+            H = closure(G, G.unpack(np.array(keys, dtype=np.int64)), order)
+            if H is None or (order is not None and len(H) != order):
+                continue
+            for k in H.tolist():
+                owners.setdefault(k, set()).add(len(found))
+            found.append(H)
+    return found
+
+def find_subgroups(group, order = None, relators = None, rank = 2, samples = None, seed = None,
+                   processes = None, chunksize = 1):
+    """
+    returns list of distinct subgroups generated by rank elements (the
+    number of letters in relators, if given) satisfying the relators and
+    of the given order, from every tuple or from samples random ones,
+    searched by a pool of processes (all cores by default; 1 searches in
+    this process)
+    raises ValueError if neither an order nor relators are given
+    """
+    if order is None and not relators:
+        raise ValueError("Need a target order or relators")
+    words = [parse_relator(r) for r in relators or []]
+    if words:
+        rank = max(j for w in words for j, _ in w) + 1
+    one = group.pack(identity(group))
+    #candidates for each generator, from its one-letter relators and order
+    elements = group.elements()
+    keys = group.pack(elements)
+    candidates = []
+    for j in xrange(rank):
+        good = np.ones(len(elements), dtype=bool)
+        for i in xrange(0, len(elements), BLOCK_PRODUCTS):
+            A = elements[i:i + BLOCK_PRODUCTS].astype(np.int64)
+            for word in words:
+                if all(g == j for g, _ in word):
+                    good[i:i + len(A)] &= group.pack(evaluate(group, word, [A] * rank)) == one
+            if order is not None:
+                good[i:i + len(A)] &= group.pack(power(group, A, order)) == one
+        candidates.append(keys[good])
+    if not all(len(c) for c in candidates):
+        return []
+    if samples is None:
+        rest = 1
+        for c in candidates[1:]:
+            rest *= len(c)
+        step = max(BLOCK_PRODUCTS // rest, 1)
+        tasks = [("range", i, i + step) for i in xrange(0, len(candidates[0]), step)]
+    else:
+        rng = np.random.RandomState(seed)
+        tasks = [("sample", rng.randint(2 ** 31), min(BLOCK_PRODUCTS, samples - i))
+                 for i in xrange(0, samples, BLOCK_PRODUCTS)]
+    spec = (group.kind, group.n, group.q)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes == 1:
+        start_search(spec, candidates, words, order)
+        results = itertools.imap(search_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, start_search, (spec, candidates, words, order))
+        results = pool.imap(search_task, tasks, chunksize)
+    try:
+        found = {}
+        for result in results:
+            for H in result:
+                found.setdefault(H.tobytes(), H)
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return [subgroup(group, keys=H) for _, H in sorted(found.items(), key=lambda item: item[1].tolist())]